@@ -7,6 +7,21 @@ __version__ = "0.0.5"
 
 from dataset_cat.crawler import Crawler
 from dataset_cat.tag_translator import TagTranslator, translate_and_format
-from dataset_cat.tag_translator_api import TagTranslatorAPI, translate_tag_request, get_supported_sources
+from dataset_cat.tag_translator_api import (
+    TagTranslatorAPI,
+    get_supported_sources,
+    get_translator_api,
+    translate_tag_request,
+    translate_tags_request,
+)
 
-__all__ = ["Crawler", "TagTranslator", "translate_and_format", "TagTranslatorAPI", "translate_tag_request", "get_supported_sources"]
+__all__ = [
+    "Crawler",
+    "TagTranslator",
+    "translate_and_format",
+    "TagTranslatorAPI",
+    "get_translator_api",
+    "translate_tag_request",
+    "translate_tags_request",
+    "get_supported_sources",
+]
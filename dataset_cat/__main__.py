@@ -35,6 +35,10 @@ def parse_arguments(args: Optional[List[str]] = None) -> argparse.Namespace:
 
     parser.add_argument("--share", action="store_true", help="Share the web UI publicly (using Gradio sharing)")
 
+    parser.add_argument(
+        "--metrics-port", type=int, default=None, help="Serve Prometheus metrics at /metrics on this port"
+    )
+
     return parser.parse_args(args)
 
 
@@ -57,6 +61,7 @@ def main(args: Optional[List[str]] = None) -> None:
         port=parsed_args.port,
         debug=parsed_args.debug,
         share=parsed_args.share,
+        metrics_port=parsed_args.metrics_port,
     )
 
 
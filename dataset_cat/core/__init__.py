@@ -2,8 +2,44 @@
 
 This package contains core functionality for dataset operations including:
 - actions: Custom processing actions for image datasets
+- async_bridge: Shared background event loop for async clients
+- bucketing: Aspect-ratio bucket selection, assignment and manifests
+- cache: Two-level (memory + SQLite) result cache
+- compression: Target-size compression with JPEG, WebP and AVIF format selection
+- derivatives: Multi-size variants from a single decode via a progressive downscale chain
+- exporters: Exporters that pack datasets into shards and other large files
+- file_items: Crawled items read lazily from their downloaded files
+- http_client: Shared HTTP/2 client for concurrent streaming downloads
+- image_ops: Pillow and OpenCV backends for resize, crop and mode conversion
+- jobs: Persistent background job queue with a shared resource budget
+- metrics: Prometheus-style counters, histograms and /metrics endpoint
+- packed_store: Memory-mapped packed image store with O(1) random access
+- prefetch: Background read-ahead for paginated listings
+- profiling: Per-stage timing reports with optional cProfile/tracemalloc sampling
+- progress: Per-stage progress and throughput tracking
+- smart_crop: Saliency and face-aware crop placement with cached focus maps
+- tag_dictionary: Offline Chinese-to-English tag dictionary
+- tag_index: Booru tag vocabulary for autocomplete and validation
 - utils: Utility functions and helpers
 """
 
 from dataset_cat.core.actions import *  # noqa
+from dataset_cat.core.async_bridge import *  # noqa
+from dataset_cat.core.bucketing import *  # noqa
+from dataset_cat.core.cache import *  # noqa
+from dataset_cat.core.compression import *  # noqa
+from dataset_cat.core.derivatives import *  # noqa
+from dataset_cat.core.exporters import *  # noqa
+from dataset_cat.core.file_items import *  # noqa
+from dataset_cat.core.http_client import *  # noqa
+from dataset_cat.core.image_ops import *  # noqa
+from dataset_cat.core.jobs import *  # noqa
+from dataset_cat.core.metrics import *  # noqa
+from dataset_cat.core.packed_store import *  # noqa
+from dataset_cat.core.prefetch import *  # noqa
+from dataset_cat.core.profiling import *  # noqa
+from dataset_cat.core.progress import *  # noqa
+from dataset_cat.core.smart_crop import *  # noqa
+from dataset_cat.core.tag_dictionary import *  # noqa
+from dataset_cat.core.tag_index import *  # noqa
 from dataset_cat.core.utils import *  # noqa
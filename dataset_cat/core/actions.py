@@ -5,26 +5,152 @@ providing additional functionality for image processing.
 """
 
 import io
+import logging
 import os
 import sys
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from PIL import Image
 
+from dataset_cat.core.bucketing import BucketAssignment, candidate_buckets, crop_plan, nearest_buckets, select_buckets
+from dataset_cat.core.compression import CODECS, TargetSizeCompressor
+from dataset_cat.core.config import config
+from dataset_cat.core.image_ops import Color, ImageOps, get_image_ops
+from dataset_cat.core.smart_crop import SmartCropper, get_smart_cropper
 from waifuc.action import FilterAction, ProcessAction
 from waifuc.model import ImageItem
 
+logger = logging.getLogger(__name__)
+
+
+def _get_cropper(smart_crop: Optional[bool]) -> Optional[SmartCropper]:
+    """Get the shared smart cropper if smart cropping is enabled and OpenCV is available."""
+    if not (config.get("processing.smart_crop.enabled", False) if smart_crop is None else smart_crop):
+        return None
+    try:
+        return get_smart_cropper()
+    except ImportError as e:
+        logger.warning(f"Smart crop is unavailable ({e}), falling back to center crops")
+        return None
+
+
+class AlignMinSizeAction(ProcessAction):
+    """Downscale images whose shorter side exceeds a size, keeping the aspect ratio.
+
+    Drop-in replacement for waifuc's action of the same name that resizes
+    through the configured image backend.
+    """
+
+    def __init__(self, min_size: int, backend: Optional[str] = None) -> None:
+        """Initialize the resize action.
+
+        Args:
+            min_size: Target length of the shorter side in pixels.
+            backend: Image backend name, defaults to ``processing.image_backend``.
+        """
+        self.min_size = min_size
+        self.ops: ImageOps = get_image_ops(backend)
+
+    def process(self, item: ImageItem) -> ImageItem:
+        """Process a single image item.
+
+        Args:
+            item: The image item to process.
+
+        Returns:
+            Image item whose shorter side is at most ``min_size``.
+        """
+        image = item.image
+        ratio = min(image.width, image.height) / self.min_size
+        if ratio <= 1:
+            return item
+        size = (int(image.width / ratio), int(image.height / ratio))
+        return ImageItem(self.ops.resize(image, size), item.meta)
+
+
+class AlignMaxSizeAction(ProcessAction):
+    """Downscale images whose longer side exceeds a size, keeping the aspect ratio.
+
+    Drop-in replacement for waifuc's action of the same name that resizes
+    through the configured image backend.
+    """
+
+    def __init__(self, max_size: int, backend: Optional[str] = None) -> None:
+        """Initialize the resize action.
+
+        Args:
+            max_size: Maximum length of the longer side in pixels.
+            backend: Image backend name, defaults to ``processing.image_backend``.
+        """
+        self.max_size = max_size
+        self.ops: ImageOps = get_image_ops(backend)
+
+    def process(self, item: ImageItem) -> ImageItem:
+        """Process a single image item.
+
+        Args:
+            item: The image item to process.
+
+        Returns:
+            Image item whose longer side is at most ``max_size``.
+        """
+        image = item.image
+        ratio = max(image.width, image.height) / self.max_size
+        if ratio <= 1:
+            return item
+        size = (int(image.width / ratio), int(image.height / ratio))
+        return ImageItem(self.ops.resize(image, size), item.meta)
+
+
+class ModeConvertAction(ProcessAction):
+    """Convert images to a color mode, flattening transparency onto a background.
+
+    Drop-in replacement for waifuc's action of the same name that converts
+    through the configured image backend.
+    """
+
+    def __init__(
+        self, mode: str = "RGB", force_background: Optional[Color] = "white", backend: Optional[str] = None
+    ) -> None:
+        """Initialize the conversion action.
+
+        Args:
+            mode: Target Pillow mode.
+            force_background: Color transparent pixels are composited onto, or None to drop alpha.
+            backend: Image backend name, defaults to ``processing.image_backend``.
+        """
+        self.mode = mode
+        self.force_background = force_background
+        self.ops: ImageOps = get_image_ops(backend)
+
+    def process(self, item: ImageItem) -> ImageItem:
+        """Process a single image item.
+
+        Args:
+            item: The image item to process.
+
+        Returns:
+            Image item in the target mode.
+        """
+        image = self.ops.convert(item.image, self.mode, self.force_background)
+        return item if image is item.image else ImageItem(image, item.meta)
+
 
 class CropToDivisibleAction(ProcessAction):
     """Custom action that crops images to dimensions divisible by a specified factor."""
 
-    def __init__(self, factor: int = 64) -> None:
+    def __init__(self, factor: int = 64, backend: Optional[str] = None, smart_crop: Optional[bool] = None) -> None:
         """Initialize the crop action.
 
         Args:
             factor: The factor by which image dimensions should be divisible.
+            backend: Image backend name, defaults to ``processing.image_backend``.
+            smart_crop: Whether to place the crop over salient content and faces instead of
+                the center, defaults to ``processing.smart_crop.enabled``.
         """
         self.factor = factor
+        self.ops: ImageOps = get_image_ops(backend)
+        self.cropper = _get_cropper(smart_crop)
 
     def process(self, item: ImageItem) -> ImageItem:
         """Process a single image item by cropping to divisible dimensions.
@@ -47,19 +173,114 @@ class CropToDivisibleAction(ProcessAction):
         if new_width == width and new_height == height:
             return item
 
-        # Calculate crop position (center crop)
-        left = (width - new_width) // 2
-        top = (height - new_height) // 2
-        right = left + new_width
-        bottom = top + new_height
+        # Calculate crop position (center crop unless smart cropping)
+        if self.cropper is not None:
+            box = self.cropper.crop_box(image, (new_width, new_height))
+        else:
+            left = (width - new_width) // 2
+            top = (height - new_height) // 2
+            box = (left, top, left + new_width, top + new_height)
 
         # Crop image
-        cropped_image = image.crop((left, top, right, bottom))
+        cropped_image = self.ops.crop(image, box)
 
         # Return new ImageItem
         return ImageItem(cropped_image, item.meta)
 
 
+class AspectRatioBucketAction(ProcessAction):
+    """Scale and crop images to aspect-ratio buckets of about equal pixel area.
+
+    Call :meth:`fit` with the dimensions of the whole dataset first to narrow
+    the candidate buckets down to the ones the dataset needs and to plan every
+    image's bucket in one vectorized pass. Items whose ``filename`` was planned
+    go to their planned bucket; any other item goes to the nearest bucket.
+    With smart cropping, the crop actually used replaces the planned center
+    crop in the assignment, so manifests record it.
+    """
+
+    def __init__(
+        self,
+        resolution: int = 1024,
+        step: Optional[int] = None,
+        max_buckets: Optional[int] = None,
+        min_bucket_size: Optional[int] = None,
+        backend: Optional[str] = None,
+        smart_crop: Optional[bool] = None,
+    ) -> None:
+        """Initialize the bucketing action.
+
+        Args:
+            resolution: Side of the square bucket; every bucket has about ``resolution ** 2`` pixels.
+            step: Bucket sides are multiples of this, defaults to ``processing.bucketing.step``.
+            max_buckets: Maximum number of buckets kept by :meth:`fit`, defaults to
+                ``processing.bucketing.max_buckets``; 0 means no limit.
+            min_bucket_size: Minimum number of images per bucket kept by :meth:`fit`,
+                defaults to ``processing.bucketing.min_bucket_size``.
+            backend: Image backend name, defaults to ``processing.image_backend``.
+            smart_crop: Whether to place crops over salient content and faces instead of
+                the center, defaults to ``processing.smart_crop.enabled``.
+        """
+        self.step = step or config.get("processing.bucketing.step", 64)
+        self.max_buckets = config.get("processing.bucketing.max_buckets", 0) if max_buckets is None else max_buckets
+        if min_bucket_size is None:
+            min_bucket_size = config.get("processing.bucketing.min_bucket_size", 1)
+        self.min_bucket_size = min_bucket_size
+        self.buckets = candidate_buckets(resolution, self.step)
+        self.assignment: Optional[BucketAssignment] = None
+        self._planned: Dict[str, int] = {}
+        self.ops: ImageOps = get_image_ops(backend)
+        self.cropper = _get_cropper(smart_crop)
+
+    def fit(self, keys: Sequence[str], widths: Sequence[int], heights: Sequence[int]) -> BucketAssignment:
+        """Choose the buckets for a dataset and assign every image to one.
+
+        Args:
+            keys: File names of the images, matched against item ``filename`` metadata.
+            widths: Image widths.
+            heights: Image heights.
+
+        Returns:
+            The assignment, which can write bucket manifests.
+        """
+        if len(keys):
+            self.buckets = select_buckets(widths, heights, self.buckets, self.max_buckets or None, self.min_bucket_size)
+        self.assignment = BucketAssignment(keys, widths, heights, self.buckets)
+        self._planned = {key: row for row, key in enumerate(self.assignment.keys)}
+        return self.assignment
+
+    def process(self, item: ImageItem) -> ImageItem:
+        """Process a single image item.
+
+        Args:
+            item: The image item to process.
+
+        Returns:
+            Image item at its bucket's resolution, with the bucket recorded in ``meta["bucket"]``.
+        """
+        image = item.image
+        filename = (item.meta or {}).get("filename", "")
+        row = self._planned.get(filename)
+        if row is not None and self.assignment is not None:
+            index = int(self.assignment.indices[row])
+        else:
+            index = int(nearest_buckets([image.width], [image.height], self.buckets)[0])
+        bucket = self.buckets[index]
+        scaled, crops = crop_plan([image.width], [image.height], bucket)
+        box = tuple(int(value) for value in crops[0])
+        # Analyze the source image so the focus map is shared by every bucket size
+        focus = self.cropper.focus(image) if self.cropper is not None else None
+        if tuple(scaled[0]) != image.size:
+            image = self.ops.resize(image, (int(scaled[0][0]), int(scaled[0][1])), Image.LANCZOS)
+        if tuple(bucket) != image.size:
+            if focus is not None:
+                box = focus.crop_box(image.size, (int(bucket[0]), int(bucket[1])))
+                if row is not None and self.assignment is not None:
+                    self.assignment.crops[row] = box
+            image = self.ops.crop(image, box)
+        return ImageItem(image, dict(item.meta or {}, bucket=[int(bucket[0]), int(bucket[1])]))
+
+
 class FileSizeFilterAction(FilterAction):
     """Custom filter action that filters images based on file size."""
 
@@ -99,24 +320,38 @@ class FileSizeFilterAction(FilterAction):
 
 
 class ImageCompressionAction(ProcessAction):
-    """Custom action for intelligent image compression to target file size."""
+    """Compress images to a target file size, choosing among JPEG, WebP and AVIF.
+
+    Each image is encoded with the format and quality that look best within the
+    target size, as found by :class:`~dataset_cat.core.compression.TargetSizeCompressor`.
+    Transparency is kept when the chosen format supports it. The choice is
+    recorded in ``meta["save_cfg"]`` and the file name's extension.
+    """
 
     def __init__(
         self,
         target_size_mb: float = 10.0,
         quality_range: Tuple[int, int] = (20, 95),
         convert_to_jpeg: bool = True,
+        formats: Optional[Sequence[str]] = None,
+        max_encodes: Optional[int] = None,
     ) -> None:
         """Initialize the image compression action.
 
         Args:
             target_size_mb: Target file size in megabytes.
-            quality_range: JPEG quality range (min_quality, max_quality).
-            convert_to_jpeg: Whether to convert non-JPEG formats to JPEG.
+            quality_range: Encoder quality range (min_quality, max_quality).
+            convert_to_jpeg: Whether images may be converted to another format. When False,
+                only the source format is searched and PNG sources are only optimized.
+            formats: Candidate formats, defaults to ``processing.compression.formats``.
+            max_encodes: Maximum encodes per image, defaults to ``processing.compression.max_encodes``.
         """
         self.target_size_bytes = target_size_mb * 1024 * 1024
         self.min_quality, self.max_quality = quality_range
         self.convert_to_jpeg = convert_to_jpeg
+        self.formats = formats
+        self.max_encodes = max_encodes
+        self._compressors: Dict[Optional[Tuple[str, ...]], TargetSizeCompressor] = {}
 
     def _estimate_file_size(self, image: Image.Image, format_type: str = "JPEG", quality: int = 85) -> int:
         """Estimate file size after saving.
@@ -160,52 +395,14 @@ class ImageCompressionAction(ProcessAction):
             buffer.close()
             return sys.maxsize  # Return max int if save fails
 
-    def _compress_jpeg(self, image: Image.Image) -> Tuple[Image.Image, int, int]:
-        """Use binary search to find appropriate JPEG quality.
-
-        Args:
-            image: PIL Image object to compress.
-
-        Returns:
-            Tuple of (compressed_image, final_quality, file_size).
-        """
-        low_quality = self.min_quality
-        high_quality = self.max_quality
-        best_quality = high_quality
-        best_image = image
-        best_size = sys.maxsize
-
-        # Ensure image is RGB mode
-        if image.mode != "RGB":
-            if image.mode in ("RGBA", "LA", "P"):
-                # Create white background
-                background = Image.new("RGB", image.size, (255, 255, 255))
-                if image.mode == "P":
-                    image = image.convert("RGBA")
-                if "transparency" in image.info:
-                    background.paste(image, mask=image.split()[-1])
-                else:
-                    background.paste(image)
-                image = background
-            else:
-                image = image.convert("RGB")
-
-        # Binary search for optimal quality
-        while low_quality <= high_quality:
-            mid_quality = (low_quality + high_quality) // 2
-            estimated_size = self._estimate_file_size(image, "JPEG", mid_quality)
-
-            if estimated_size <= self.target_size_bytes:
-                # File size is acceptable, try higher quality
-                best_quality = mid_quality
-                best_image = image.copy()
-                best_size = estimated_size
-                low_quality = mid_quality + 1
-            else:
-                # File too large, reduce quality
-                high_quality = mid_quality - 1
-
-        return best_image, best_quality, best_size
+    def _compressor(self, formats: Optional[Sequence[str]]) -> TargetSizeCompressor:
+        """Get the compressor searching the given formats, reusing it across images."""
+        key = tuple(formats) if formats is not None else None
+        if key not in self._compressors:
+            self._compressors[key] = TargetSizeCompressor(
+                int(self.target_size_bytes), formats, (self.min_quality, self.max_quality), self.max_encodes
+            )
+        return self._compressors[key]
 
     def process(self, item: ImageItem) -> ImageItem:
         """Process a single image item with compression.
@@ -216,53 +413,40 @@ class ImageCompressionAction(ProcessAction):
         Returns:
             Processed image item with compression applied.
         """
-        image = item.image.copy()
-        original_format = getattr(image, "format", "PNG") or "PNG"
-
-        # Check current file size first
-        current_size = self._estimate_file_size(image, original_format)
+        image = item.image
+        original_format = (getattr(image, "format", None) or "PNG").upper()
 
         # Return original if already smaller than target
-        if current_size <= self.target_size_bytes:
+        if self._estimate_file_size(image, original_format) <= self.target_size_bytes:
             return item
 
-        # Try JPEG compression
-        if self.convert_to_jpeg or original_format.upper() == "JPEG":
-            compressed_image, final_quality, _ = self._compress_jpeg(image)
-
-            # Update metadata
-            new_meta = item.meta.copy()
-
-            # Update filename extension to .jpg
+        if self.convert_to_jpeg or original_format in CODECS:
+            result = self._compressor(self.formats if self.convert_to_jpeg else [original_format]).compress(image)
+            if result is None:
+                return item
+            new_meta = dict(item.meta or {})
             if "filename" in new_meta:
-                filename = new_meta["filename"]
-                name, _ = os.path.splitext(filename)
-                new_meta["filename"] = f"{name}.jpg"
+                name, _ = os.path.splitext(new_meta["filename"])
+                new_meta["filename"] = f"{name}{result.extension}"
+            new_meta["save_cfg"] = dict(new_meta.get("save_cfg") or {}, **result.save_params())
+            return ImageItem(result.image, new_meta)
 
-            # Add save parameters
-            if "save_cfg" not in new_meta:
-                new_meta["save_cfg"] = {}
-            new_meta["save_cfg"]["format"] = "JPEG"
-            new_meta["save_cfg"]["quality"] = final_quality
-            new_meta["save_cfg"]["optimize"] = True
-
-            return ImageItem(compressed_image, new_meta)
-
-        # If not converting to JPEG, try PNG optimization (limited compression options)
-        else:
-            # PNG compression options are limited, mainly optimize
-            optimized_size = self._estimate_file_size(image, "PNG")
-            if optimized_size <= self.target_size_bytes:
-                new_meta = item.meta.copy()
-                if "save_cfg" not in new_meta:
-                    new_meta["save_cfg"] = {}
-                new_meta["save_cfg"]["format"] = "PNG"
-                new_meta["save_cfg"]["optimize"] = True
-                return ImageItem(image, new_meta)
-            else:
-                # PNG cannot reach target size, recommend converting to JPEG
-                return item  # Return original image
+        # PNG compression options are limited, mainly optimize
+        if self._estimate_file_size(image, "PNG") <= self.target_size_bytes:
+            new_meta = dict(item.meta or {})
+            new_meta["save_cfg"] = dict(new_meta.get("save_cfg") or {}, format="PNG", optimize=True)
+            return ImageItem(image, new_meta)
+        # PNG cannot reach target size
+        return item
 
 
 # Export all action classes
-__all__ = ["CropToDivisibleAction", "FileSizeFilterAction", "ImageCompressionAction"]
+__all__ = [
+    "AlignMaxSizeAction",
+    "AlignMinSizeAction",
+    "AspectRatioBucketAction",
+    "CropToDivisibleAction",
+    "FileSizeFilterAction",
+    "ImageCompressionAction",
+    "ModeConvertAction",
+]
@@ -0,0 +1,110 @@
+"""Long-lived asyncio event loop shared by synchronous callers.
+
+This module runs a single event loop on a daemon thread so that async clients
+(httpx, googletrans) keep their connection pools across calls, and so that
+synchronous code, including code already running inside another event loop
+such as Gradio's, can execute coroutines without creating a loop per call.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncBridge:
+    """Runs coroutines on a dedicated background event loop."""
+
+    def __init__(self, name: str = "dataset-cat-async") -> None:
+        """Start the background loop.
+
+        Args:
+            name: Name of the thread hosting the loop.
+        """
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        """Thread target that runs the loop until stopped."""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the bridge loop and block until it finishes.
+
+        Args:
+            coro: Coroutine to execute.
+            timeout: Maximum time to wait in seconds, or None to wait indefinitely.
+
+        Returns:
+            The coroutine's result.
+
+        Raises:
+            RuntimeError: If called from the bridge loop itself, which would deadlock.
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("AsyncBridge.run() cannot be called from the bridge loop; await the coroutine instead")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout)
+
+    def run_async(self, coro: Coroutine[Any, Any, T]) -> Awaitable[T]:
+        """Run a coroutine on the bridge loop and await it from the caller's loop.
+
+        When the caller is already on the bridge loop the coroutine is returned
+        unchanged so it runs inline.
+
+        Args:
+            coro: Coroutine to execute.
+
+        Returns:
+            An awaitable resolving to the coroutine's result.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            return coro
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def stop(self) -> None:
+        """Stop the background loop and wait for its thread to exit."""
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+
+
+_bridge: Optional[AsyncBridge] = None
+_bridge_lock = threading.Lock()
+
+
+def get_async_bridge() -> AsyncBridge:
+    """Get the process-wide async bridge, starting it on first use.
+
+    Returns:
+        The shared AsyncBridge instance.
+    """
+    global _bridge
+    with _bridge_lock:
+        if _bridge is None:
+            _bridge = AsyncBridge()
+        return _bridge
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the shared bridge loop from synchronous code.
+
+    Args:
+        coro: Coroutine to execute.
+        timeout: Maximum time to wait in seconds, or None to wait indefinitely.
+
+    Returns:
+        The coroutine's result.
+    """
+    return get_async_bridge().run(coro, timeout)
+
+
+__all__ = ["AsyncBridge", "get_async_bridge", "run_sync"]
@@ -0,0 +1,216 @@
+"""Aspect-ratio bucketing for training-ready resolutions.
+
+Bucketed training batches images that share a resolution, chosen from a set of
+buckets with roughly equal pixel area and different aspect ratios. This module
+derives a bucket set from a dataset's aspect-ratio distribution, assigns every
+image to the bucket that needs the least cropping and writes manifests so
+training loaders can batch by bucket without resizing at train time. All of it
+runs as vectorized NumPy passes over the image dimensions.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+MANIFEST_NAME = "buckets.json"
+MANIFEST_VERSION = 1
+
+
+def candidate_buckets(
+    resolution: int = 1024, step: int = 64, min_side: Optional[int] = None, max_side: Optional[int] = None
+) -> np.ndarray:
+    """Enumerate bucket resolutions with about ``resolution ** 2`` pixels.
+
+    Args:
+        resolution: Side of the square bucket; sets the target pixel area.
+        step: Both sides of every bucket are multiples of this.
+        min_side: Shortest allowed side, defaults to half the resolution.
+        max_side: Longest allowed side, defaults to twice the resolution.
+
+    Returns:
+        Integer array of shape (buckets, 2) with (width, height) rows, ordered by aspect ratio.
+    """
+    min_side = min_side or max(step, resolution // 2)
+    max_side = max_side or resolution * 2
+    area = resolution * resolution
+    widths = np.arange(-(-min_side // step) * step, max_side + 1, step)
+    heights = (area // widths) // step * step
+    buckets = np.stack([widths, heights], axis=1)
+    buckets = buckets[(heights >= min_side) & (heights <= max_side)]
+    # Include the transposed buckets so portrait and landscape are covered alike
+    buckets = np.unique(np.concatenate([buckets, buckets[:, ::-1]]), axis=0)
+    return buckets[np.argsort(buckets[:, 0] / buckets[:, 1], kind="stable")]
+
+
+def _log_ratios(widths: Any, heights: Any) -> np.ndarray:
+    return np.log(np.asarray(widths, dtype=np.float64) / np.asarray(heights, dtype=np.float64))
+
+
+def nearest_buckets(widths: Any, heights: Any, buckets: np.ndarray) -> np.ndarray:
+    """Find the bucket closest in aspect ratio to each image, which needs the least cropping.
+
+    Args:
+        widths: Image widths.
+        heights: Image heights.
+        buckets: (width, height) rows ordered by aspect ratio.
+
+    Returns:
+        Index into ``buckets`` for every image.
+    """
+    bucket_ratios = _log_ratios(buckets[:, 0], buckets[:, 1])
+    ratios = _log_ratios(widths, heights)
+    if len(buckets) == 1:
+        return np.zeros(len(ratios), dtype=np.intp)
+    upper = np.clip(np.searchsorted(bucket_ratios, ratios), 1, len(buckets) - 1)
+    lower = upper - 1
+    closer_to_lower = ratios - bucket_ratios[lower] <= bucket_ratios[upper] - ratios
+    return np.where(closer_to_lower, lower, upper)
+
+
+def select_buckets(
+    widths: Any,
+    heights: Any,
+    candidates: np.ndarray,
+    max_buckets: Optional[int] = None,
+    min_bucket_size: int = 1,
+) -> np.ndarray:
+    """Reduce candidate buckets to a set that fits a dataset.
+
+    Candidates no image maps to are dropped. Then, while there are more than
+    ``max_buckets`` buckets or one holds fewer than ``min_bucket_size`` images,
+    the least populated bucket is removed and its images move to their next
+    nearest bucket, so every bucket can fill a batch.
+
+    Args:
+        widths: Image widths.
+        heights: Image heights.
+        candidates: (width, height) rows ordered by aspect ratio, e.g. from :func:`candidate_buckets`.
+        max_buckets: Maximum number of buckets, or None for no limit.
+        min_bucket_size: Minimum number of images per bucket.
+
+    Returns:
+        The selected (width, height) rows, ordered by aspect ratio.
+    """
+    if len(np.asarray(widths)) == 0:
+        return candidates[:0]
+    active = np.arange(len(candidates))
+    while True:
+        counts = np.bincount(nearest_buckets(widths, heights, candidates[active]), minlength=len(active))
+        active = active[counts > 0]
+        counts = counts[counts > 0]
+        too_many = max_buckets is not None and len(active) > max_buckets
+        if len(active) <= 1 or not (too_many or counts.min() < min_bucket_size):
+            return candidates[active]
+        active = np.delete(active, np.argmin(counts))
+
+
+def crop_plan(widths: Any, heights: Any, bucket_sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute how each image is scaled and center-cropped to its bucket.
+
+    Images are scaled so they cover the bucket, then the overflow along one
+    axis is cropped evenly from both sides.
+
+    Args:
+        widths: Image widths.
+        heights: Image heights.
+        bucket_sizes: (width, height) row of the target bucket for every image.
+
+    Returns:
+        Tuple of (scaled (width, height) rows, crop (left, top, right, bottom) rows in scaled pixels).
+    """
+    widths = np.asarray(widths, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+    bucket_sizes = np.asarray(bucket_sizes, dtype=np.int64).reshape(-1, 2)
+    scale = np.maximum(bucket_sizes[:, 0] / widths, bucket_sizes[:, 1] / heights)
+    scaled = np.stack([np.round(widths * scale), np.round(heights * scale)], axis=1).astype(np.int64)
+    scaled = np.maximum(scaled, bucket_sizes)
+    offsets = (scaled - bucket_sizes) // 2
+    return scaled, np.concatenate([offsets, offsets + bucket_sizes], axis=1)
+
+
+class BucketAssignment:
+    """Bucket and crop of every image in a dataset."""
+
+    def __init__(self, keys: Sequence[str], widths: Any, heights: Any, buckets: np.ndarray) -> None:
+        """Assign images to the nearest of the given buckets.
+
+        Args:
+            keys: Image identifiers, e.g. output file names.
+            widths: Image widths.
+            heights: Image heights.
+            buckets: (width, height) rows ordered by aspect ratio.
+        """
+        self.keys = list(keys)
+        self.widths = np.asarray(widths, dtype=np.int64)
+        self.heights = np.asarray(heights, dtype=np.int64)
+        self.buckets = buckets
+        self.indices = nearest_buckets(self.widths, self.heights, buckets) if self.keys else np.zeros(0, np.intp)
+        self.scaled, self.crops = crop_plan(self.widths, self.heights, buckets[self.indices])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def counts(self) -> np.ndarray:
+        """Number of images per bucket."""
+        return np.bincount(self.indices, minlength=len(self.buckets))
+
+    def cropped_fraction(self) -> float:
+        """Share of the scaled pixels removed by cropping across the dataset."""
+        if not self.keys:
+            return 0.0
+        scaled_area = self.scaled.prod(axis=1).sum()
+        return float(1 - self.buckets[self.indices].prod(axis=1).sum() / scaled_area)
+
+    def write_manifests(
+        self, output_dir: Union[str, Path], keys: Optional[Union[Iterable[str], Mapping[str, str]]] = None
+    ) -> Path:
+        """Write ``buckets.json`` and one ``bucket-<w>x<h>.jsonl`` listing per bucket.
+
+        Each listing line holds an image's file name, source size and crop box
+        in scaled pixels.
+
+        Args:
+            output_dir: Directory receiving the manifests.
+            keys: Images to include, e.g. those that were written; defaults to all.
+                A mapping also gives the file name each image was saved under.
+
+        Returns:
+            Path of ``buckets.json``.
+        """
+        renamed = keys if isinstance(keys, Mapping) else {}
+        included = set(keys) if keys is not None else None
+        grouped: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+        for row, key in enumerate(self.keys):
+            if included is not None and key not in included:
+                continue
+            width, height = self.buckets[self.indices[row]].tolist()
+            grouped.setdefault((width, height), []).append(
+                {
+                    "file": renamed.get(key, key),
+                    "source_size": [int(self.widths[row]), int(self.heights[row])],
+                    "crop": self.crops[row].tolist(),
+                }
+            )
+        os.makedirs(output_dir, exist_ok=True)
+        index: Dict[str, Any] = {"version": MANIFEST_VERSION, "buckets": []}
+        for (width, height), items in sorted(grouped.items(), key=lambda entry: entry[0][0] / entry[0][1]):
+            name = f"bucket-{width}x{height}.jsonl"
+            with open(Path(output_dir) / name, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+            index["buckets"].append({"width": width, "height": height, "count": len(items), "manifest": name})
+        with open(Path(output_dir) / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        return Path(output_dir) / MANIFEST_NAME
+
+
+__all__ = [
+    "BucketAssignment",
+    "MANIFEST_NAME",
+    "candidate_buckets",
+    "crop_plan",
+    "nearest_buckets",
+    "select_buckets",
+]
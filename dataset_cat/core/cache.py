@@ -0,0 +1,173 @@
+"""Two-level result cache for expensive lookups.
+
+This module provides an in-process LRU cache backed by an optional on-disk
+SQLite store, with per-entry expiry and support for caching negative results
+(lookups that completed but found nothing).
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+# Default expiry for positive and negative results, in seconds
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 24 * 3600
+
+
+class CacheEntry(NamedTuple):
+    """A single cached value.
+
+    Attributes:
+        value: The cached string value.
+        negative: True if the value records a lookup that found no match.
+        expires_at: Unix timestamp after which the entry is stale.
+    """
+
+    value: str
+    negative: bool
+    expires_at: float
+
+
+class TwoLevelCache:
+    """In-memory LRU cache layered over a persistent SQLite table.
+
+    Reads check the memory layer first and fall back to SQLite, promoting
+    disk hits into memory. Writes go to both layers.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        max_memory_items: int = 2048,
+        ttl: float = DEFAULT_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            db_path: Path to the SQLite database file, or None for a memory-only cache.
+            max_memory_items: Maximum number of entries kept in the LRU layer.
+            ttl: Lifetime of positive entries in seconds.
+            negative_ttl: Lifetime of negative entries in seconds.
+        """
+        self.max_memory_items = max_memory_items
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if db_path is not None:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            # A single connection guarded by our lock is shared between threads
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, negative INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up a key in the cache.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            The cached entry, or None if absent or expired.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, negative, expires_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = CacheEntry(row[0], bool(row[1]), row[2])
+                    if entry.expires_at > now:
+                        self._remember(key, entry)
+                        self.hits += 1
+                        return entry
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self._conn.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str, negative: bool = False) -> CacheEntry:
+        """Store a value in both cache layers.
+
+        Args:
+            key: Cache key.
+            value: Value to store.
+            negative: Whether the value records a lookup that found no match.
+
+        Returns:
+            The stored entry.
+        """
+        expires_at = time.time() + (self.negative_ttl if negative else self.ttl)
+        entry = CacheEntry(value, negative, expires_at)
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, negative, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, value, int(negative), expires_at),
+                )
+                self._conn.commit()
+        return entry
+
+    def purge_expired(self) -> int:
+        """Remove expired entries from both layers.
+
+        Returns:
+            Number of entries removed from the persistent layer.
+        """
+        now = time.time()
+        with self._lock:
+            for key in [k for k, e in self._memory.items() if e.expires_at <= now]:
+                del self._memory[key]
+            if self._conn is None:
+                return 0
+            cursor = self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove all entries from both layers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM cache")
+                self._conn.commit()
+
+    def close(self) -> None:
+        """Close the persistent layer."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        """Insert an entry into the LRU layer, evicting the oldest if full. Caller holds the lock."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+
+__all__ = ["CacheEntry", "TwoLevelCache", "DEFAULT_TTL", "DEFAULT_NEGATIVE_TTL"]
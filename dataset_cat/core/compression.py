@@ -0,0 +1,264 @@
+"""Target-size compression across JPEG, WebP and AVIF.
+
+:class:`TargetSizeCompressor` finds, for each image, the encoding that looks
+best while fitting a byte budget. Every candidate format gets a quality search
+that models encoded size as log-linear in quality and interpolates between the
+closest encodings on either side of the target, which usually converges in
+three or four encodes instead of the seven of a plain binary search. The
+search starts from the quality chosen for the previous image, and the total
+number of encodes per image is capped by ``max_encodes``. The best fitting
+encoding of each format is decoded and the one closest to the source by PSNR
+wins. Transparency is kept by formats that support it, and formats that would
+drop it are only used for images without meaningful alpha.
+"""
+
+import io
+import logging
+import math
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, features
+
+from dataset_cat.core.config import config
+from dataset_cat.core.image_ops import Color, get_image_ops, has_alpha
+
+logger = logging.getLogger(__name__)
+
+
+class Codec:
+    """Encoder settings of a format the compressor can search."""
+
+    def __init__(
+        self, image_format: str, extension: str, alpha: bool, feature: Optional[str] = None, **save_params: Any
+    ) -> None:
+        """Describe a codec.
+
+        Args:
+            image_format: Pillow format name.
+            extension: File extension including the dot.
+            alpha: Whether the format stores transparency.
+            feature: Pillow feature the encoder depends on, checked with ``PIL.features.check``.
+            **save_params: Fixed ``Image.save`` arguments besides the quality.
+        """
+        self.image_format = image_format
+        self.extension = extension
+        self.alpha = alpha
+        self.feature = feature
+        self.save_params = save_params
+
+    @property
+    def available(self) -> bool:
+        """Whether this Pillow build can encode the format."""
+        return self.feature is None or bool(features.check(self.feature))
+
+    def encode(self, image: Image.Image, quality: int) -> bytes:
+        """Encode an image at a quality."""
+        buffer = io.BytesIO()
+        image.save(buffer, format=self.image_format, quality=quality, **self.save_params)
+        return buffer.getvalue()
+
+
+# Searchable formats; register additional codecs here
+CODECS: Dict[str, Codec] = {
+    "JPEG": Codec("JPEG", ".jpg", alpha=False, optimize=True),
+    "WEBP": Codec("WEBP", ".webp", alpha=True, feature="webp", method=4),
+    "AVIF": Codec("AVIF", ".avif", alpha=True, feature="avif", speed=8),
+}
+
+
+def available_formats(formats: Optional[Sequence[str]] = None) -> List[str]:
+    """Filter formats down to the known codecs this Pillow build can encode.
+
+    Args:
+        formats: Format names, defaults to ``processing.compression.formats``.
+
+    Returns:
+        Upper-case format names in the given order.
+    """
+    formats = formats or config.get("processing.compression.formats", ["JPEG", "WEBP", "AVIF"])
+    names = [name.upper().replace("JPG", "JPEG") for name in formats]
+    unknown = [name for name in names if name not in CODECS]
+    if unknown:
+        logger.warning(f"Unknown compression formats ignored: {', '.join(unknown)}")
+    return [name for name in dict.fromkeys(names) if name in CODECS and CODECS[name].available]
+
+
+def _psnr(reference: np.ndarray, data: bytes) -> float:
+    """PSNR of encoded bytes against the pixels they were encoded from."""
+    with Image.open(io.BytesIO(data)) as decoded:
+        pixels = np.asarray(decoded.convert("RGBA" if reference.shape[-1] == 4 else "RGB"), dtype=np.float32)
+    mse = float(np.mean((pixels - reference) ** 2))
+    return math.inf if mse == 0 else 10 * math.log10(255**2 / mse)
+
+
+class CompressionResult:
+    """Chosen encoding of an image."""
+
+    def __init__(self, image: Image.Image, image_format: str, quality: int, data: bytes, psnr: float) -> None:
+        """Store the encoding.
+
+        Args:
+            image: Image that was encoded, flattened if the format has no alpha.
+            image_format: Pillow format name.
+            quality: Encoder quality.
+            data: Encoded bytes.
+            psnr: PSNR of the decoded bytes against ``image``, in dB.
+        """
+        self.image = image
+        self.image_format = image_format
+        self.quality = quality
+        self.data = data
+        self.psnr = psnr
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def extension(self) -> str:
+        return CODECS[self.image_format].extension
+
+    def save_params(self) -> Dict[str, Any]:
+        """``Image.save`` arguments that reproduce the encoding."""
+        codec = CODECS[self.image_format]
+        return {"format": self.image_format, "quality": self.quality, **codec.save_params}
+
+
+class TargetSizeCompressor:
+    """Pick the format and quality that look best within a byte budget."""
+
+    def __init__(
+        self,
+        target_bytes: int,
+        formats: Optional[Sequence[str]] = None,
+        quality_range: Tuple[int, int] = (20, 95),
+        max_encodes: Optional[int] = None,
+        background: Color = "white",
+    ) -> None:
+        """Initialize the compressor.
+
+        Args:
+            target_bytes: Maximum encoded size.
+            formats: Candidate formats, defaults to ``processing.compression.formats``; formats this
+                Pillow build cannot encode are skipped.
+            quality_range: Lowest and highest quality searched.
+            max_encodes: Maximum encodes per image across all formats, defaults to
+                ``processing.compression.max_encodes``.
+            background: Color transparency is flattened onto for formats without alpha.
+
+        Raises:
+            ValueError: If none of the formats can be encoded.
+        """
+        self.target_bytes = target_bytes
+        self.formats = available_formats(formats)
+        if not self.formats:
+            raise ValueError(f"No encoder available for formats: {formats}")
+        self.min_quality, self.max_quality = quality_range
+        self.max_encodes = max_encodes or config.get("processing.compression.max_encodes", 12)
+        self.background = background
+        self.encodes = 0
+        # Quality chosen per format for the previous image, a good first guess for the next
+        self._last_quality: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _candidates(self, image: Image.Image) -> List[str]:
+        """Formats to search for an image, dropping those that would lose meaningful alpha."""
+        if not has_alpha(image):
+            return self.formats
+        alpha = image.convert("RGBA").getchannel("A")
+        if alpha.getextrema()[0] == 255:
+            return self.formats
+        keeping = [name for name in self.formats if CODECS[name].alpha]
+        return keeping or self.formats
+
+    def _prepare(self, image: Image.Image, codec: Codec) -> Image.Image:
+        """Convert an image to the mode the codec encodes, flattening alpha it cannot store."""
+        if codec.alpha and has_alpha(image):
+            return image if image.mode == "RGBA" else image.convert("RGBA")
+        return get_image_ops().convert(image, "RGB", self.background if has_alpha(image) else None)
+
+    def _search(
+        self, codec: Codec, image: Image.Image, budget: int
+    ) -> Tuple[Optional[Tuple[int, bytes]], Optional[Tuple[int, bytes]], int]:
+        """Find the highest quality whose encoding fits the target.
+
+        Args:
+            codec: Codec to search.
+            image: Image prepared for the codec.
+            budget: Maximum number of encodes.
+
+        Returns:
+            Tuple of ((quality, bytes) of the best fitting encoding or None,
+            (quality, bytes) of the smallest encoding seen, encodes used).
+        """
+        low, high = self.min_quality, self.max_quality
+        fitting: Optional[Tuple[int, bytes]] = None
+        too_large: Optional[Tuple[int, int]] = None
+        smallest: Optional[Tuple[int, bytes]] = None
+        quality = min(max(self._last_quality.get(codec.image_format, (low + high) // 2), low), high)
+        used = 0
+        while used < budget and low <= high:
+            data = codec.encode(image, quality)
+            used += 1
+            if smallest is None or len(data) < len(smallest[1]):
+                smallest = (quality, data)
+            if len(data) <= self.target_bytes:
+                fitting = (quality, data)
+                low = quality + 1
+            else:
+                too_large = (quality, len(data))
+                high = quality - 1
+            if low > high:
+                break
+            if fitting is not None and too_large is not None:
+                # Interpolate log(size) linearly between the bracketing encodings
+                (q0, data0), (q1, size1) = fitting, too_large
+                slope = (math.log(size1) - math.log(len(data0))) / (q1 - q0)
+                guess = q0 + (math.log(self.target_bytes) - math.log(len(data0))) / slope if slope > 0 else low
+                quality = int(min(max(round(guess), low), high))
+            elif fitting is not None:
+                quality = min(high, quality + max(1, (high - quality + 1) // 2))
+            else:
+                quality = max(low, quality - max(1, (quality - low + 1) // 2))
+        return fitting, smallest, used
+
+    def compress(self, image: Image.Image) -> Optional[CompressionResult]:
+        """Encode an image at the best quality that fits the target size.
+
+        Args:
+            image: Image to compress.
+
+        Returns:
+            The chosen encoding; if no format fits the target at the lowest quality, the
+            smallest encoding found. None if no encoding was made.
+        """
+        candidates = self._candidates(image)
+        remaining = self.max_encodes
+        best: Optional[CompressionResult] = None
+        fallback: Optional[CompressionResult] = None
+        for position, name in enumerate(candidates):
+            codec = CODECS[name]
+            prepared = self._prepare(image, codec)
+            # Share what is left of the budget evenly among the formats still to search
+            budget = max(1, remaining // (len(candidates) - position))
+            fitting, smallest, used = self._search(codec, prepared, budget)
+            remaining -= used
+            with self._lock:
+                self.encodes += used
+            reference = np.asarray(prepared, dtype=np.float32)
+            if fitting is not None:
+                with self._lock:
+                    self._last_quality[name] = fitting[0]
+                result = CompressionResult(prepared, name, fitting[0], fitting[1], _psnr(reference, fitting[1]))
+                if best is None or result.psnr > best.psnr:
+                    best = result
+            elif smallest is not None and (fallback is None or len(smallest[1]) < fallback.size):
+                fallback = CompressionResult(prepared, name, smallest[0], smallest[1], _psnr(reference, smallest[1]))
+            if remaining <= 0:
+                break
+        return best or fallback
+
+
+__all__ = ["CODECS", "Codec", "CompressionResult", "TargetSizeCompressor", "available_formats"]
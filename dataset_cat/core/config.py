@@ -12,6 +12,7 @@ from typing import Any, Dict, List, Optional, Union
 DEFAULT_CONFIG = {
     "output_dir": str(Path.home() / "dataset-cat" / "output"),
     "temp_dir": str(Path.home() / "dataset-cat" / "temp"),
+    "cache_dir": str(Path.home() / ".dataset-cat" / "cache"),
     "ui": {
         "theme": "default",
         "language": "en",
@@ -22,6 +23,13 @@ DEFAULT_CONFIG = {
         "timeout": 30,
         "max_parallel_downloads": 5,
         "wait_time": 0.5,  # Wait time between API calls in seconds
+        "async_downloads": True,  # Fetch images of web sources concurrently over HTTP/2 instead of one by one
+        "prefetch_items": 200,  # Listing entries fetched ahead of downloads, about two API pages
+        "site_urls": {},  # Per-source API base URL overrides, e.g. {"Danbooru": "http://127.0.0.1:8765"}
+        "gallery_dl": {
+            "download_dir": "",  # Empty downloads into <temp_dir>/gallery-dl
+            "archive": "",  # Download archive used to skip known files; empty keeps it in the cache directory
+        },
     },
     "processing": {
         "default_actions": ["AlignMinSizeAction"],
@@ -31,6 +39,69 @@ DEFAULT_CONFIG = {
             "MinSizeFilterAction": {"size": 256},
         },
         "use_cuda": False,
+        "image_backend": "pil",  # Resize, crop and mode conversion backend: "pil" or "opencv"
+        "opencv_threads": 0,  # OpenCV worker threads; 0 keeps OpenCV's default
+        "bucketing": {
+            "step": 64,  # Bucket sides are multiples of this
+            "max_buckets": 0,  # Most buckets kept for a dataset; 0 means no limit
+            "min_bucket_size": 4,  # Buckets with fewer images are merged into their neighbours
+        },
+        "smart_crop": {
+            "enabled": False,  # Place crops over salient content and faces instead of the center
+            "face_model": "",  # YuNet .onnx or cascade .xml face detector; empty uses saliency only
+            "face_weight": 2.0,  # Weight of detected faces relative to the saliency peak
+            "map_size": 32,  # Cells along the longer side of cached focus maps
+            "cache_enabled": True,  # Cache focus maps per content hash in the cache directory
+            "memory_cache_size": 4096,
+        },
+        "variants": {
+            "quality": 90,  # JPEG and WebP quality of size variants saved in another format
+        },
+        "compression": {
+            "formats": ["JPEG", "WEBP", "AVIF"],  # Candidates for target-size compression; unsupported ones are skipped
+            "max_encodes": 12,  # Encodes per image across all formats while searching for the target size
+        },
+    },
+    "translator": {
+        "cache_enabled": True,
+        "memory_cache_size": 2048,
+        "cache_ttl": 30 * 24 * 3600,  # Lifetime of cached translations in seconds
+        "negative_cache_ttl": 24 * 3600,  # Lifetime of cached "no match" results in seconds
+        "max_concurrency": 8,  # Concurrent upstream requests for batch translation
+        "jikan_max_concurrency": 3,  # Concurrent Jikan requests, kept within its per-second rate limit
+        "jikan_min_interval": 0.4,  # Minimum seconds between Jikan requests
+        "local_dictionary": True,  # Consult the offline tag dictionary before remote backends
+        "dictionary_path": "",  # Custom dictionary TSV; empty uses the bundled dictionary
+    },
+    "tags": {
+        "vocabulary_path": "",  # Booru tag dump CSV used for autocomplete and validation
+        "min_post_count": 0,  # Ignore dump entries with fewer posts
+    },
+    "jobs": {
+        "db_path": "",  # Persistent job queue of the web UI; empty stores it in the cache directory
+        "server_db_path": "",  # Persistent job queue of the REST server; empty stores it in the cache directory
+        "max_workers": 4,  # Jobs running at once across all users
+        "budget": {"network": 2, "cpu": 2},  # Resource slots shared by running jobs
+        "max_finished": 200,  # Finished jobs kept for status queries; older ones and their progress are dropped
+    },
+    "metrics": {
+        "enabled": False,  # Serve Prometheus metrics alongside the web UI
+        "host": "127.0.0.1",
+        "port": 9464,
+    },
+    "profiling": {
+        "enabled": False,  # Write a per-stage timing report for every crawl job
+        "cprofile": False,  # Include a cProfile sample in reports
+        "tracemalloc": False,  # Include allocation statistics in reports
+        "top_n": 20,  # Functions and allocation sites kept per report
+        "report_dir": "",  # Empty writes reports to ~/.dataset-cat/profiles
+    },
+    "export": {
+        "passthrough": True,  # SaveExporter copies untouched downloads instead of decoding and re-encoding them
+        "shard_max_size_mb": 512,  # WebDataset shards are closed once they reach this size
+        "shard_max_count": 10000,  # ... or hold this many items
+        "shard_workers": 4,  # Shards written in parallel
+        "parquet_row_group_size": 1024,  # Rows buffered per Parquet row group
     },
 }
 
@@ -144,6 +215,16 @@ class Config:
         os.makedirs(path, exist_ok=True)
         return path
 
+    def get_cache_dir(self) -> str:
+        """Get the persistent cache directory path.
+
+        Returns:
+            Path to the cache directory
+        """
+        path = self.get("cache_dir")
+        os.makedirs(path, exist_ok=True)
+        return path
+
 
 # Global configuration instance
 config = Config()
@@ -0,0 +1,154 @@
+"""Multi-size derivatives from a single decode.
+
+Training and preview sets often need the same images at several sizes, such
+as 512, 768 and 1024 pixels. Instead of decoding every source once per size,
+:func:`generate_derivatives` takes one decoded image and walks a progressive
+downscale chain from the largest variant to the smallest: each variant is
+resized from the previous, larger one, so N variants cost one decode plus a
+series of ever cheaper resizes.
+
+Variants are written as ``"<size>[:<format>]"`` specs, e.g. ``"512, 768:webp"``;
+the size bounds the longer side and images are never upscaled.
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from dataset_cat.core.config import config
+from dataset_cat.core.image_ops import ImageOps, get_image_ops, has_alpha
+
+# Variant format names to Pillow format and file extension
+VARIANT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "jpg": ("JPEG", ".jpg"),
+    "jpeg": ("JPEG", ".jpg"),
+    "png": ("PNG", ".png"),
+    "webp": ("WEBP", ".webp"),
+}
+
+_SPEC_PATTERN = re.compile(r"^(\d+)(?::([A-Za-z]+))?$")
+
+
+class VariantSpec:
+    """One derivative size and optional output format."""
+
+    def __init__(self, size: int, image_format: Optional[str] = None, name: Optional[str] = None) -> None:
+        """Initialize the variant.
+
+        Args:
+            size: Maximum length of the longer side in pixels.
+            image_format: Output format name from :data:`VARIANT_FORMATS`, or None to keep the source format.
+            name: Output subdirectory, defaults to the size followed by the format, e.g. ``768_webp``.
+
+        Raises:
+            ValueError: If the size is not positive or the format is unknown.
+        """
+        if size <= 0:
+            raise ValueError(f"Variant size must be positive, got {size}")
+        if image_format is not None and image_format.lower() not in VARIANT_FORMATS:
+            raise ValueError(f"Unknown variant format: {image_format}. Available: {', '.join(VARIANT_FORMATS)}")
+        self.size = size
+        self.image_format = image_format.lower() if image_format else None
+        self.name = name or (f"{size}_{self.image_format}" if self.image_format else str(size))
+
+    def __repr__(self) -> str:
+        return f"VariantSpec({self.size}, {self.image_format!r}, {self.name!r})"
+
+    def target_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Size an image of the given dimensions is resized to, keeping the aspect ratio."""
+        ratio = max(width, height) / self.size
+        if ratio <= 1:
+            return width, height
+        return max(1, round(width / ratio)), max(1, round(height / ratio))
+
+    def output_name(self, name: str) -> str:
+        """File name of the variant of an image saved as ``name``."""
+        if self.image_format is None:
+            return name
+        stem = name.rsplit(".", 1)[0] if "." in name else name
+        return stem + VARIANT_FORMATS[self.image_format][1]
+
+    def save_params(self, image: Image.Image) -> Tuple[Image.Image, Dict[str, Any]]:
+        """Prepare an image and ``Image.save`` arguments for the variant's format.
+
+        JPEG cannot store transparency, so images with alpha are flattened onto white.
+
+        Args:
+            image: Derivative to save.
+
+        Returns:
+            Tuple of (image to save, save arguments including ``format`` if set).
+        """
+        if self.image_format is None:
+            return image, {}
+        image_format = VARIANT_FORMATS[self.image_format][0]
+        params: Dict[str, Any] = {"format": image_format}
+        if image_format in ("JPEG", "WEBP"):
+            params["quality"] = config.get("processing.variants.quality", 90)
+        if image_format == "JPEG" and image.mode != "RGB":
+            image = get_image_ops().convert(image, "RGB", "white" if has_alpha(image) else None)
+        elif image_format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if has_alpha(image) else "RGB")
+        return image, params
+
+
+def parse_variants(specs: Union[str, Iterable[str], None]) -> List[VariantSpec]:
+    """Parse variant specs such as ``"512, 768:webp, 1024:png"``.
+
+    Args:
+        specs: Comma or whitespace separated specs, or an iterable of single specs.
+
+    Returns:
+        The variants in the given order; empty if no specs were given.
+
+    Raises:
+        ValueError: If a spec is malformed or two variants share an output directory.
+    """
+    if not specs:
+        return []
+    tokens = re.split(r"[,\s]+", specs) if isinstance(specs, str) else [str(spec).strip() for spec in specs]
+    variants = []
+    for token in filter(None, tokens):
+        match = _SPEC_PATTERN.match(token)
+        if match is None:
+            raise ValueError(f"Invalid variant spec: {token!r}, expected <size>[:<format>]")
+        variants.append(VariantSpec(int(match.group(1)), match.group(2)))
+    names = [variant.name for variant in variants]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate variants: {', '.join(duplicates)}")
+    return variants
+
+
+def generate_derivatives(
+    image: Image.Image,
+    variants: List[VariantSpec],
+    ops: Optional[ImageOps] = None,
+    resample: int = Image.LANCZOS,
+) -> Iterator[Tuple[VariantSpec, Image.Image]]:
+    """Resize one decoded image into every variant along a progressive downscale chain.
+
+    Variants are produced from the largest to the smallest, each resized from
+    the previous result instead of the source, so the source pixels are read
+    once and every later step works on a smaller image.
+
+    Args:
+        image: Decoded source image.
+        variants: Variants to produce.
+        ops: Image backend, defaults to the configured backend.
+        resample: Pillow resampling filter.
+
+    Yields:
+        Tuples of (variant, derivative image), largest variant first.
+    """
+    ops = ops or get_image_ops()
+    current = image
+    for variant in sorted(variants, key=lambda variant: variant.size, reverse=True):
+        size = variant.target_size(image.width, image.height)
+        if size != current.size:
+            current = ops.resize(current, size, resample)
+        yield variant, current
+
+
+__all__ = ["VARIANT_FORMATS", "VariantSpec", "generate_derivatives", "parse_variants"]
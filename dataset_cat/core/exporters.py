@@ -0,0 +1,525 @@
+"""Custom exporters that pack datasets into a few large files.
+
+``SaveExporter`` writes one image plus sidecars per item, which is slow to copy
+and to read back with millions of small files. The exporters here stream items
+into large sequentially written files instead, ready for training data loaders.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import tarfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import ImageFile
+from waifuc.export import BaseExporter
+from waifuc.model import ImageItem
+
+from dataset_cat.core.config import config
+from dataset_cat.core.packed_store import PackedStoreWriter
+
+logger = logging.getLogger(__name__)
+
+# PIL format name to file extension
+_FORMAT_EXTENSIONS = {"PNG": "png", "JPEG": "jpg", "WEBP": "webp", "AVIF": "avif"}
+
+# Dict-valued metadata keys that are not the per-source post record
+_NON_SOURCE_META_KEYS = {"tags", "save_cfg", "download"}
+
+
+def item_caption(meta: Dict[str, Any]) -> str:
+    """Build a comma-separated caption from an item's tags.
+
+    Args:
+        meta: Item metadata; ``tags`` may be a tag-to-score mapping or a list.
+
+    Returns:
+        Caption text, empty if the item has no tags.
+    """
+    tags = meta.get("tags") or {}
+    if isinstance(tags, str):
+        return tags
+    return ", ".join(str(tag) for tag in tags)
+
+
+def item_meta_json(meta: Dict[str, Any]) -> bytes:
+    """Serialize item metadata, stringifying values JSON cannot represent.
+
+    Args:
+        meta: Item metadata.
+
+    Returns:
+        UTF-8 encoded JSON document.
+    """
+    return json.dumps(meta, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+
+
+def encode_image(item: ImageItem, image_format: str = "PNG") -> Tuple[bytes, str]:
+    """Encode an item's image, honoring ``save_cfg`` set by compression actions.
+
+    Args:
+        item: Item to encode.
+        image_format: PIL format used when the item has no ``save_cfg``.
+
+    Returns:
+        Tuple of (encoded bytes, file extension).
+    """
+    save_cfg = dict(item.meta.get("save_cfg") or {})
+    save_cfg.setdefault("format", image_format)
+    image_format = save_cfg["format"].upper()
+    image = item.image
+    if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, **save_cfg)
+    return buffer.getvalue(), _FORMAT_EXTENSIONS.get(image_format, image_format.lower())
+
+
+def passthrough_path(item: ImageItem) -> Optional[str]:
+    """Find the downloaded file behind an item whose pixels were never replaced.
+
+    Items are opened lazily from their downloaded file; filters keep that image
+    object while pixel-level actions return new images without a file name.
+
+    Args:
+        item: Item to inspect.
+
+    Returns:
+        Path of the original file, or None if the item must be re-encoded.
+    """
+    image = item.image
+    filename = getattr(image, "filename", "")
+    if isinstance(image, ImageFile.ImageFile) and filename and os.path.isfile(filename):
+        return filename
+    return None
+
+
+def export_passthrough(item: ImageItem, output_dir: str, save_meta: bool = True) -> Optional[str]:
+    """Copy an untouched item's original file instead of decoding and re-encoding it.
+
+    The file and the ``.<filename>_meta.json`` sidecar follow ``SaveExporter``'s layout.
+
+    Args:
+        item: Item to export.
+        output_dir: Destination directory.
+        save_meta: Whether to write the metadata sidecar.
+
+    Returns:
+        The written path, or None if the item has no untouched source file.
+    """
+    source_path = passthrough_path(item)
+    if source_path is None:
+        return None
+    filename = item.meta.get("filename") or os.path.basename(source_path)
+    target_path = os.path.join(output_dir, filename)
+    os.makedirs(os.path.dirname(target_path) or ".", exist_ok=True)
+    shutil.copyfile(source_path, target_path)
+    if save_meta and item.meta:
+        directory, name = os.path.split(target_path)
+        with open(os.path.join(directory, f".{name}_meta.json"), "wb") as f:
+            f.write(item_meta_json(item.meta))
+    return target_path
+
+
+class PackedExporter(BaseExporter):
+    """Base class for exporters that write into shared files and must be closed.
+
+    Attributes:
+        bytes_written: Encoded bytes handed to the output files so far. Exporters that
+            write in background threads update it as the writes happen.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.bytes_written = 0
+        self._bytes_lock = threading.Lock()
+
+    def _add_bytes(self, nbytes: int) -> None:
+        with self._bytes_lock:
+            self.bytes_written += nbytes
+
+    def pre_export(self) -> None:
+        pass
+
+    def post_export(self) -> None:
+        self.close()
+
+    def reset(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Flush and close all open files."""
+        raise NotImplementedError
+
+    def __enter__(self) -> "PackedExporter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class _ShardWriter(threading.Thread):
+    """Worker that encodes items and appends them to its own tar shard."""
+
+    def __init__(self, exporter: "WebDatasetExporter", index: int) -> None:
+        super().__init__(name=f"webdataset-writer-{index}", daemon=True)
+        self.exporter = exporter
+        self.items: "queue.Queue[Optional[Tuple[str, ImageItem]]]" = queue.Queue(maxsize=exporter.queue_size)
+        self._tar: Optional[tarfile.TarFile] = None
+        self._shard_bytes = 0
+        self._shard_count = 0
+
+    def run(self) -> None:
+        while True:
+            entry = self.items.get()
+            if entry is None:
+                break
+            if self.exporter.error is not None:
+                continue
+            try:
+                self._write(*entry)
+            except Exception as e:
+                logger.error(f"Failed to write {entry[0]} to shard: {e}")
+                self.exporter.error = e
+        self._close_shard()
+
+    def _write(self, key: str, item: ImageItem) -> None:
+        image_bytes, extension = encode_image(item, self.exporter.image_format)
+        members = [(f"{key}.{extension}", image_bytes), (f"{key}.txt", item_caption(item.meta).encode("utf-8"))]
+        if self.exporter.save_meta:
+            members.append((f"{key}.json", item_meta_json(item.meta)))
+        size = sum(len(data) for _, data in members)
+
+        if self._tar is not None and (
+            self._shard_count >= self.exporter.max_count or self._shard_bytes + size > self.exporter.max_bytes
+        ):
+            self._close_shard()
+        if self._tar is None:
+            self._tar = tarfile.open(self.exporter.next_shard_path(), "w")
+
+        mtime = int(time.time())
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = mtime
+            self._tar.addfile(info, io.BytesIO(data))
+        self._shard_bytes += size
+        self._shard_count += 1
+        self.exporter._add_bytes(size)
+
+    def _close_shard(self) -> None:
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+        self._shard_bytes = 0
+        self._shard_count = 0
+
+
+class WebDatasetExporter(PackedExporter):
+    """Stream items into WebDataset-style tar shards.
+
+    Every item becomes one key in a shard with ``<key>.<ext>`` image bytes,
+    ``<key>.txt`` comma-separated tags and, unless disabled, ``<key>.json``
+    metadata. Shards are named ``<prefix>-000000.tar`` and closed once they
+    reach ``max_size_mb`` or ``max_count`` items. Items are distributed
+    round-robin over ``workers`` writer threads that encode images and append
+    to their own open shard in parallel.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        no_meta: bool = False,
+        image_format: str = "PNG",
+        max_size_mb: Optional[float] = None,
+        max_count: Optional[int] = None,
+        workers: Optional[int] = None,
+        prefix: str = "shard",
+        queue_size: int = 8,
+    ) -> None:
+        """Initialize the exporter; shards are created on the first item.
+
+        Args:
+            output_dir: Directory that receives the shards.
+            no_meta: Skip the per-item JSON metadata.
+            image_format: PIL format for items without ``save_cfg``.
+            max_size_mb: Shard size limit, defaults to ``export.shard_max_size_mb``.
+            max_count: Items per shard limit, defaults to ``export.shard_max_count``.
+            workers: Parallel shard writers, defaults to ``export.shard_workers``.
+            prefix: Shard file name prefix.
+            queue_size: Items buffered per writer before ``export_item`` blocks.
+        """
+        super().__init__()
+        self.output_dir = output_dir
+        self.save_meta = not no_meta
+        self.image_format = image_format
+        self.max_bytes = int((max_size_mb or config.get("export.shard_max_size_mb", 512)) * 1024 * 1024)
+        self.max_count = max_count or config.get("export.shard_max_count", 10000)
+        self.workers = max(1, workers or config.get("export.shard_workers", 4))
+        self.prefix = prefix
+        self.queue_size = queue_size
+        self.error: Optional[Exception] = None
+        self.shard_paths: List[str] = []
+        self._lock = threading.Lock()
+        self._writers: List[_ShardWriter] = []
+        self._exported = 0
+
+    def next_shard_path(self) -> str:
+        """Reserve the next shard file name; called by writer threads."""
+        with self._lock:
+            path = os.path.join(self.output_dir, f"{self.prefix}-{len(self.shard_paths):06d}.tar")
+            self.shard_paths.append(path)
+        return path
+
+    def export_item(self, item: ImageItem) -> None:
+        if self.error is not None:
+            raise RuntimeError(f"WebDataset export failed: {self.error}") from self.error
+        if not self._writers:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._writers = [_ShardWriter(self, index) for index in range(self.workers)]
+            for writer in self._writers:
+                writer.start()
+        key = f"{self._exported:09d}"
+        self._writers[self._exported % len(self._writers)].items.put((key, item))
+        self._exported += 1
+
+    def close(self) -> None:
+        """Wait for the writers to drain their queues and close every shard."""
+        writers, self._writers = self._writers, []
+        for writer in writers:
+            writer.items.put(None)
+        for writer in writers:
+            writer.join()
+        if self.error is not None:
+            raise RuntimeError(f"WebDataset export failed: {self.error}") from self.error
+        if writers:
+            logger.info(f"Wrote {self._exported} items to {len(self.shard_paths)} shards in {self.output_dir}")
+
+
+def item_source(meta: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Find the source name and raw post record in an item's metadata.
+
+    waifuc sources store the post they crawled under their own key, such as
+    ``meta["danbooru"]``.
+
+    Args:
+        meta: Item metadata.
+
+    Returns:
+        Tuple of (source name, post record); (None, {}) for local items.
+    """
+    for key, value in meta.items():
+        if key not in _NON_SOURCE_META_KEYS and isinstance(value, dict):
+            return key, value
+    return None, {}
+
+
+def _partition_value(value: Any) -> str:
+    return re.sub(r"[^\w.-]+", "_", str(value)) if value not in (None, "") else "unknown"
+
+
+class ParquetExporter(PackedExporter):
+    """Write item metadata into partitioned Parquet files for columnar analytics.
+
+    One row is written per item with its source, post ID, tags, rating, author,
+    dimensions, hashes and the remaining metadata as JSON. ``file_size``,
+    ``sha256`` and ``md5`` describe the stored image bytes; ``source_md5`` is
+    the MD5 the source reported for the original file. Encoded images are
+    either embedded in the ``image`` column or saved as ``images/<sha256>.<ext>``
+    with the path relative to the output directory in the ``path`` column. Rows
+    are buffered and flushed as row groups into
+    ``data/<partition_by>=<value>/part-00000.parquet``, so ``data/`` holds nothing
+    but Parquet files and readers such as ``pyarrow.dataset`` can scan it and prune
+    partitions. Requires the optional ``pyarrow`` dependency.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        include_bytes: bool = False,
+        image_format: str = "PNG",
+        row_group_size: Optional[int] = None,
+        partition_by: Optional[str] = "source",
+    ) -> None:
+        """Initialize the exporter.
+
+        Args:
+            output_dir: Directory that receives the dataset.
+            include_bytes: Embed encoded images instead of saving image files.
+            image_format: PIL format for items without ``save_cfg``.
+            row_group_size: Rows per row group, defaults to ``export.parquet_row_group_size``.
+            partition_by: Column used for hive-style partition directories, None for a single file.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("ParquetExporter requires pyarrow: pip install pyarrow") from e
+
+        super().__init__()
+        self._pa = pa
+        self._pq = pq
+        self.output_dir = output_dir
+        self.include_bytes = include_bytes
+        self.image_format = image_format
+        self.row_group_size = row_group_size or config.get("export.parquet_row_group_size", 1024)
+        self.partition_by = partition_by
+        self.schema = pa.schema(
+            [
+                ("key", pa.string()),
+                ("source", pa.string()),
+                ("post_id", pa.string()),
+                ("filename", pa.string()),
+                ("tags", pa.list_(pa.string())),
+                ("rating", pa.string()),
+                ("author", pa.string()),
+                ("width", pa.int32()),
+                ("height", pa.int32()),
+                ("format", pa.string()),
+                ("file_size", pa.int64()),
+                ("sha256", pa.string()),
+                ("md5", pa.string()),
+                ("source_md5", pa.string()),
+                ("path", pa.string()),
+                ("image", pa.binary()),
+                ("meta", pa.string()),
+            ]
+        )
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._writers: Dict[str, Any] = {}
+        self._exported = 0
+
+    def _row(self, item: ImageItem) -> Dict[str, Any]:
+        image_bytes, extension = encode_image(item, self.image_format)
+        source, post = item_source(item.meta)
+        filename = item.meta.get("filename") or f"{self._exported:09d}.{extension}"
+        key = os.path.splitext(filename)[0]
+        sha256 = hashlib.sha256(image_bytes).hexdigest()
+        path = None
+        if not self.include_bytes:
+            # Named by content, since file names repeat across sources and posts
+            path = f"images/{sha256}.{extension}"
+            with open(os.path.join(self.output_dir, path), "wb") as f:
+                f.write(image_bytes)
+        self._add_bytes(len(image_bytes))
+        meta = {name: value for name, value in item.meta.items() if name not in ("tags", "author", "save_cfg")}
+        return {
+            "key": key,
+            "source": source,
+            "post_id": None if post.get("id") is None else str(post["id"]),
+            "filename": filename,
+            "tags": [str(tag) for tag in item.meta.get("tags") or []],
+            "rating": None if post.get("rating") is None else str(post["rating"]),
+            "author": item.meta.get("author"),
+            "width": item.image.width,
+            "height": item.image.height,
+            "format": extension,
+            "file_size": len(image_bytes),
+            "sha256": sha256,
+            "md5": hashlib.md5(image_bytes).hexdigest(),
+            "source_md5": post.get("md5"),
+            "path": path,
+            "image": image_bytes if self.include_bytes else None,
+            "meta": item_meta_json(meta).decode("utf-8"),
+        }
+
+    def export_item(self, item: ImageItem) -> None:
+        if self._exported == 0:
+            os.makedirs(os.path.join(self.output_dir, "" if self.include_bytes else "images"), exist_ok=True)
+        row = self._row(item)
+        partition = _partition_value(row.get(self.partition_by)) if self.partition_by else ""
+        buffer = self._buffers.setdefault(partition, [])
+        buffer.append(row)
+        self._exported += 1
+        if len(buffer) >= self.row_group_size:
+            self._flush(partition)
+
+    def _flush(self, partition: str) -> None:
+        rows = self._buffers.pop(partition, [])
+        if not rows:
+            return
+        writer = self._writers.get(partition)
+        if writer is None:
+            directory = os.path.join(self.output_dir, "data")
+            if self.partition_by:
+                directory = os.path.join(directory, f"{self.partition_by}={partition}")
+            os.makedirs(directory, exist_ok=True)
+            writer = self._pq.ParquetWriter(os.path.join(directory, "part-00000.parquet"), self.schema)
+            self._writers[partition] = writer
+        table = self._pa.Table.from_pylist(rows, schema=self.schema)
+        writer.write_table(table, row_group_size=self.row_group_size)
+
+    def close(self) -> None:
+        """Flush buffered rows and finalize every Parquet file."""
+        for partition in list(self._buffers):
+            self._flush(partition)
+        writers, self._writers = self._writers, {}
+        for writer in writers.values():
+            writer.close()
+        if writers:
+            logger.info(f"Wrote {self._exported} rows to {len(writers)} Parquet files in {self.output_dir}")
+
+
+class PackedStoreExporter(PackedExporter):
+    """Append items to a memory-mappable packed store.
+
+    Encoded images go into ``<name>.bin`` and keys, offsets and metadata into
+    ``<name>.idx.json``; read them back with
+    :class:`~dataset_cat.core.packed_store.PackedImageStore`.
+    """
+
+    def __init__(self, output_dir: str, name: str = "images", no_meta: bool = False, image_format: str = "PNG") -> None:
+        """Initialize the exporter; the store is created on the first item.
+
+        Args:
+            output_dir: Directory that receives the store.
+            name: Base name of the store files.
+            no_meta: Leave item metadata out of the index.
+            image_format: PIL format for items without ``save_cfg``.
+        """
+        super().__init__()
+        self.output_dir = output_dir
+        self.name = name
+        self.save_meta = not no_meta
+        self.image_format = image_format
+        self._writer: Optional[PackedStoreWriter] = None
+        self._exported = 0
+
+    def export_item(self, item: ImageItem) -> None:
+        if self._writer is None:
+            self._writer = PackedStoreWriter(self.output_dir, self.name)
+        image_bytes, extension = encode_image(item, self.image_format)
+        filename = item.meta.get("filename")
+        key = os.path.splitext(filename)[0] if filename else f"{self._exported:09d}"
+        meta = json.loads(item_meta_json(item.meta)) if self.save_meta else None
+        self._writer.add(key, image_bytes, extension, meta)
+        self._add_bytes(len(image_bytes))
+        self._exported += 1
+
+    def close(self) -> None:
+        """Write the store index."""
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+            logger.info(f"Packed {self._exported} items into {writer.data_path}")
+
+
+__all__ = [
+    "PackedExporter",
+    "PackedStoreExporter",
+    "ParquetExporter",
+    "WebDatasetExporter",
+    "encode_image",
+    "export_passthrough",
+    "item_caption",
+    "item_meta_json",
+    "item_source",
+    "passthrough_path",
+]
@@ -0,0 +1,91 @@
+"""Crawled items backed by downloaded files.
+
+Decoding every download as it arrives keeps the pixels of a whole crawl in
+memory until the export. :class:`FileItems` keeps only paths and metadata and
+opens each file while it is iterated, reading no more than its header; pixels
+are decoded by the first action or exporter that needs them, and untouched
+files copied by :func:`~dataset_cat.core.exporters.export_passthrough` are
+never decoded at all.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Tuple
+
+from PIL import Image
+from waifuc.model import ImageItem
+
+logger = logging.getLogger(__name__)
+
+
+def is_image_file(path: str) -> bool:
+    """Check that a file is an image Pillow can read, without decoding its pixels.
+
+    Args:
+        path: File to check.
+
+    Returns:
+        True if the file's header and structure are valid.
+    """
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception as e:
+        logger.warning(f"Skipping {path}: not a readable image ({e})")
+        return False
+    return True
+
+
+class FileItems:
+    """Sized, re-iterable collection of image items backed by files on disk.
+
+    Iterating opens one file at a time, so neither pixels nor file handles pile
+    up across items. The files must stay in place until the items are consumed.
+    """
+
+    def __init__(self) -> None:
+        self._entries: List[Tuple[str, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+    def append(self, path: str, meta: Dict[str, Any]) -> None:
+        """Add a file.
+
+        Args:
+            path: Image file, usually checked with :func:`is_image_file` first.
+            meta: Item metadata.
+        """
+        with self._lock:
+            self._entries.append((path, meta))
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return [path for path, _ in self._entries]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[ImageItem]:
+        with self._lock:
+            entries = list(self._entries)
+        for path, meta in entries:
+            try:
+                image = Image.open(path)
+            except Exception as e:
+                logger.warning(f"Skipping {path}: {e}")
+                continue
+            yield ImageItem(image, dict(meta))
+
+    def load(self) -> List[ImageItem]:
+        """Decode every item, for callers that remove the files afterwards.
+
+        Returns:
+            Items with fully loaded images and no open file handles.
+        """
+        items = []
+        for item in self:
+            item.image.load()
+            items.append(item)
+        return items
+
+
+__all__ = ["FileItems", "is_image_file"]
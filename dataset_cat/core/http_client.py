@@ -0,0 +1,291 @@
+"""Shared HTTP/2 client for concurrent image downloads.
+
+All downloads go through one ``httpx.AsyncClient`` living on the shared async
+bridge loop, so hundreds of in-flight requests are multiplexed over a few
+HTTP/2 connections per host. Response bodies are streamed to disk in chunks,
+hashed on the fly and checked against the MD5 the site reports, and
+concurrency is bounded by ``fetcher.max_parallel_downloads``.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+
+from dataset_cat.core.async_bridge import run_sync
+from dataset_cat.core.config import config
+from dataset_cat.core.metrics import httpx_event_hooks, observe_http_failure
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+
+# Status codes worth retrying after a back-off
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class ChecksumMismatch(Exception):
+    """Raised when a downloaded body does not match the expected MD5."""
+
+
+class DownloadTask:
+    """A single file to download."""
+
+    def __init__(
+        self,
+        url: str,
+        path: str,
+        headers: Optional[Dict[str, str]] = None,
+        meta: Any = None,
+        expected_md5: Optional[str] = None,
+    ) -> None:
+        """Initialize the task.
+
+        Args:
+            url: Source URL.
+            path: Destination file path.
+            headers: Extra request headers, e.g. a referer or session cookies.
+            meta: Caller data passed through to the result.
+            expected_md5: Hex MD5 reported by the site; mismatching downloads are retried and then rejected.
+        """
+        self.url = url
+        self.path = path
+        self.headers = headers or {}
+        self.meta = meta
+        self.expected_md5 = expected_md5.lower() if expected_md5 else None
+
+
+class DownloadResult:
+    """Outcome of a download task."""
+
+    def __init__(
+        self,
+        task: DownloadTask,
+        nbytes: int = 0,
+        seconds: float = 0.0,
+        error: Optional[str] = None,
+        md5: Optional[str] = None,
+        sha256: Optional[str] = None,
+    ) -> None:
+        self.task = task
+        self.nbytes = nbytes
+        self.seconds = seconds
+        self.error = error
+        self.md5 = md5
+        self.sha256 = sha256
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+_client: Optional[httpx.AsyncClient] = None
+_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the process-wide download client, creating it on first use.
+
+    The client must only be used from coroutines running on the async bridge loop.
+
+    Returns:
+        Shared HTTP/2 client.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            parallel = config.get("fetcher.max_parallel_downloads", 5)
+            _client = httpx.AsyncClient(
+                http2=True,
+                timeout=config.get("fetcher.timeout", 30),
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=max(parallel, 10), max_keepalive_connections=max(parallel, 10)),
+                event_hooks=httpx_event_hooks(),
+            )
+        return _client
+
+
+async def stream_to_file(
+    client: httpx.AsyncClient, task: DownloadTask, chunk_size: int = CHUNK_SIZE
+) -> Tuple[int, str, str]:
+    """Stream a response body to disk, replacing the destination only when complete and verified.
+
+    Args:
+        client: Client to send the request with.
+        task: Download task.
+        chunk_size: Bytes written per chunk.
+
+    Returns:
+        Tuple of (bytes written, hex MD5, hex SHA-256) of the body.
+
+    Raises:
+        httpx.HTTPError: On transport errors or an error status.
+        ChecksumMismatch: If the body does not match ``task.expected_md5``.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(task.path)), exist_ok=True)
+    # Unique per attempt so concurrent downloads never share a partial file
+    temp_path = f"{task.path}.{uuid.uuid4().hex[:8]}.part"
+    nbytes = 0
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+    try:
+        async with client.stream("GET", task.url, headers=task.headers) as response:
+            response.raise_for_status()
+            with open(temp_path, "wb") as f:
+                async for chunk in response.aiter_bytes(chunk_size):
+                    f.write(chunk)
+                    md5.update(chunk)
+                    sha256.update(chunk)
+                    nbytes += len(chunk)
+        if task.expected_md5 and md5.hexdigest() != task.expected_md5:
+            raise ChecksumMismatch(f"MD5 {md5.hexdigest()} does not match expected {task.expected_md5}")
+        os.replace(temp_path, task.path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return nbytes, md5.hexdigest(), sha256.hexdigest()
+
+
+async def download_one(
+    client: httpx.AsyncClient, task: DownloadTask, retries: Optional[int] = None, backoff: Optional[float] = None
+) -> DownloadResult:
+    """Download a task, retrying transport errors and retryable status codes.
+
+    Args:
+        client: Client to send requests with.
+        task: Download task.
+        retries: Extra attempts, defaults to ``fetcher.retry_count``.
+        backoff: Base delay between attempts in seconds, defaults to ``fetcher.wait_time``.
+
+    Returns:
+        The download result; failures are reported in ``error`` rather than raised.
+    """
+    retries = config.get("fetcher.retry_count", 3) if retries is None else retries
+    backoff = config.get("fetcher.wait_time", 0.5) if backoff is None else backoff
+    start = time.perf_counter()
+    for attempt in range(retries + 1):
+        try:
+            nbytes, md5, sha256 = await stream_to_file(client, task)
+            return DownloadResult(task, nbytes, time.perf_counter() - start, md5=md5, sha256=sha256)
+        except httpx.HTTPStatusError as e:
+            error = f"HTTP {e.response.status_code}"
+            if e.response.status_code not in RETRY_STATUS_CODES:
+                break
+        except httpx.TransportError as e:
+            observe_http_failure(e)
+            error = f"{type(e).__name__}: {e}"
+        except (httpx.HTTPError, ChecksumMismatch) as e:
+            error = f"{type(e).__name__}: {e}"
+        except Exception as e:
+            # e.g. an invalid URL or a disk error; retrying will not help and one task must not fail the batch
+            error = f"{type(e).__name__}: {e}"
+            break
+        if attempt < retries:
+            await asyncio.sleep(backoff * 2**attempt)
+    logger.error(f"Failed to download {task.url}: {error}")
+    return DownloadResult(task, seconds=time.perf_counter() - start, error=error)
+
+
+def _unclaimed_path(path: str, claimed: Set[str]) -> str:
+    """Claim a path, numbering it ``name-1.ext``, ``name-2.ext``, ... if already claimed."""
+    candidate = path
+    stem, extension = os.path.splitext(path)
+    counter = 1
+    while os.path.normcase(os.path.abspath(candidate)) in claimed:
+        candidate = f"{stem}-{counter}{extension}"
+        counter += 1
+    claimed.add(os.path.normcase(os.path.abspath(candidate)))
+    return candidate
+
+
+async def download_many(
+    tasks: Iterable[DownloadTask],
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[DownloadResult], None]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[DownloadResult]:
+    """Download tasks concurrently.
+
+    Tasks may come from a lazy iterator, such as a listing still being paged
+    through; it is advanced on a worker thread and downloads start as soon as
+    tasks arrive, with at most ``concurrency`` tasks taken ahead of completion.
+    Tasks whose path was already taken by an earlier task get a numbered path,
+    so two posts with the same file name do not overwrite each other.
+
+    Args:
+        tasks: Files to download.
+        concurrency: Maximum in-flight downloads, defaults to ``fetcher.max_parallel_downloads``.
+        on_result: Callback invoked as each download finishes.
+        client: Client to use, defaults to the shared client.
+
+    Returns:
+        Results in task order.
+    """
+    client = client or get_http_client()
+    semaphore = asyncio.Semaphore(concurrency or config.get("fetcher.max_parallel_downloads", 5))
+    loop = asyncio.get_running_loop()
+    iterator = iter(tasks)
+    lazy = not isinstance(tasks, (list, tuple))
+    claimed: Set[str] = set()
+
+    async def run(task: DownloadTask) -> DownloadResult:
+        try:
+            result = await download_one(client, task)
+        finally:
+            semaphore.release()
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    pending: List["asyncio.Future[DownloadResult]"] = []
+    try:
+        while True:
+            await semaphore.acquire()
+            task = await loop.run_in_executor(None, next, iterator, None) if lazy else next(iterator, None)
+            if task is None:
+                semaphore.release()
+                break
+            task.path = _unclaimed_path(task.path, claimed)
+            pending.append(asyncio.ensure_future(run(task)))
+    except BaseException:
+        # The task source failed, e.g. a listing request; abandon in-flight downloads
+        for future in pending:
+            future.cancel()
+        raise
+    return list(await asyncio.gather(*pending))
+
+
+def download_files(
+    tasks: Iterable[DownloadTask],
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[DownloadResult], None]] = None,
+) -> List[DownloadResult]:
+    """Download tasks concurrently from synchronous code on the shared bridge loop.
+
+    Args:
+        tasks: Files to download.
+        concurrency: Maximum in-flight downloads, defaults to ``fetcher.max_parallel_downloads``.
+        on_result: Callback invoked on the bridge loop as each download finishes.
+
+    Returns:
+        Results in task order.
+    """
+    return run_sync(download_many(tasks, concurrency, on_result))
+
+
+__all__ = [
+    "ChecksumMismatch",
+    "DownloadResult",
+    "DownloadTask",
+    "download_files",
+    "download_many",
+    "download_one",
+    "get_http_client",
+    "stream_to_file",
+]
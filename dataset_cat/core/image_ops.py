@@ -0,0 +1,203 @@
+"""Pluggable backends for resizing, cropping and mode conversion.
+
+Post-processing actions run their pixel operations through an :class:`ImageOps`
+backend chosen with ``processing.image_backend``. ``pil`` uses Pillow; ``opencv``
+runs resizing and alpha flattening with OpenCV's SIMD and multithreaded kernels
+on NumPy views of the pixel data and keeps Pillow for everything else, including
+modes OpenCV cannot represent directly (palette, CMYK, 16-bit, ...).
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image, ImageColor
+
+from dataset_cat.core.config import config
+
+logger = logging.getLogger(__name__)
+
+Color = Union[str, Tuple[int, int, int]]
+Box = Tuple[int, int, int, int]
+
+_ALPHA_MODES = ("RGBA", "LA", "PA")
+
+
+def has_alpha(image: Image.Image) -> bool:
+    """Check whether an image carries transparency."""
+    return image.mode in _ALPHA_MODES or (image.mode == "P" and "transparency" in image.info)
+
+
+class ImageOps:
+    """Interface of an image operation backend."""
+
+    name = "base"
+
+    def resize(self, image: Image.Image, size: Tuple[int, int], resample: int = Image.BICUBIC) -> Image.Image:
+        """Resize an image.
+
+        Args:
+            image: Source image.
+            size: Target (width, height).
+            resample: Pillow resampling filter.
+
+        Returns:
+            Resized image.
+        """
+        raise NotImplementedError
+
+    def crop(self, image: Image.Image, box: Box) -> Image.Image:
+        """Crop an image to a (left, top, right, bottom) box."""
+        raise NotImplementedError
+
+    def convert(self, image: Image.Image, mode: str, background: Optional[Color] = None) -> Image.Image:
+        """Convert an image to another mode.
+
+        Args:
+            image: Source image.
+            mode: Target Pillow mode, e.g. ``RGB``.
+            background: Color transparent pixels are composited onto when the
+                target mode has no alpha channel; ``None`` drops the alpha channel.
+
+        Returns:
+            Converted image, or the source image if it already has the mode.
+        """
+        raise NotImplementedError
+
+
+class PILImageOps(ImageOps):
+    """Image operations implemented with Pillow."""
+
+    name = "pil"
+
+    def resize(self, image: Image.Image, size: Tuple[int, int], resample: int = Image.BICUBIC) -> Image.Image:
+        return image.resize(size, resample)
+
+    def crop(self, image: Image.Image, box: Box) -> Image.Image:
+        return image.crop(box)
+
+    def convert(self, image: Image.Image, mode: str, background: Optional[Color] = None) -> Image.Image:
+        if background is not None and has_alpha(image) and mode not in _ALPHA_MODES:
+            canvas = Image.new("RGBA", image.size, background)
+            canvas.alpha_composite(image.convert("RGBA"))
+            image = canvas
+        return image if image.mode == mode else image.convert(mode)
+
+
+class OpenCVImageOps(PILImageOps):
+    """Image operations implemented with OpenCV on NumPy arrays.
+
+    Resizing and alpha flattening run as OpenCV kernels on the pixel array;
+    results are wrapped back into Pillow images without another copy.
+    Downscaling uses area interpolation, which averages source pixels like
+    Pillow's filters do; upscaling maps the Pillow filter to the nearest OpenCV
+    interpolation. Images with alpha are resized premultiplied, as Pillow does,
+    so the color of transparent pixels does not bleed into visible ones.
+    Crops and plain mode conversions are single memory passes that Pillow
+    already does faster than the round trip through an array, so they are
+    inherited from :class:`PILImageOps`.
+    """
+
+    name = "opencv"
+
+    # Modes stored as interleaved 8-bit channels, the layout OpenCV works on
+    NATIVE_MODES = ("L", "LA", "RGB", "RGBA")
+
+    def __init__(self, threads: Optional[int] = None) -> None:
+        """Initialize the backend.
+
+        Args:
+            threads: OpenCV worker threads, defaults to ``processing.opencv_threads``;
+                0 keeps OpenCV's default.
+
+        Raises:
+            ImportError: If OpenCV is not installed.
+        """
+        import cv2
+
+        self._cv2 = cv2
+        threads = config.get("processing.opencv_threads", 0) if threads is None else threads
+        if threads > 0:
+            cv2.setNumThreads(threads)
+        self._interpolation = {
+            Image.NEAREST: cv2.INTER_NEAREST,
+            Image.BILINEAR: cv2.INTER_LINEAR,
+            Image.BICUBIC: cv2.INTER_CUBIC,
+            Image.LANCZOS: cv2.INTER_LANCZOS4,
+            Image.BOX: cv2.INTER_AREA,
+            Image.HAMMING: cv2.INTER_LINEAR,
+        }
+
+    def resize(self, image: Image.Image, size: Tuple[int, int], resample: int = Image.BICUBIC) -> Image.Image:
+        if image.mode not in self.NATIVE_MODES:
+            return super().resize(image, size, resample)
+        width, height = size
+        if resample == Image.NEAREST:
+            interpolation = self._cv2.INTER_NEAREST
+        elif width <= image.width and height <= image.height:
+            interpolation = self._cv2.INTER_AREA
+        else:
+            interpolation = self._interpolation.get(resample, self._cv2.INTER_CUBIC)
+        if image.mode in _ALPHA_MODES:
+            return Image.fromarray(self._resize_premultiplied(np.asarray(image), size, interpolation))
+        return Image.fromarray(self._cv2.resize(np.asarray(image), (width, height), interpolation=interpolation))
+
+    def _resize_premultiplied(self, pixels: np.ndarray, size: Tuple[int, int], interpolation: int) -> np.ndarray:
+        """Resize interleaved pixels whose last channel is alpha, weighting colors by their alpha."""
+        pixels = pixels.astype(np.float32)
+        pixels[..., :-1] *= pixels[..., -1:] / 255
+        resized = self._cv2.resize(pixels, size, interpolation=interpolation)
+        alpha = np.clip(resized[..., -1:], 0, 255)
+        color = np.divide(resized[..., :-1] * 255, alpha, out=np.zeros_like(resized[..., :-1]), where=alpha > 0)
+        return np.clip(np.concatenate([color, alpha], axis=-1) + 0.5, 0, 255).astype(np.uint8)
+
+    def convert(self, image: Image.Image, mode: str, background: Optional[Color] = None) -> Image.Image:
+        if image.mode != "RGBA" or mode not in ("RGB", "L") or background is None:
+            return super().convert(image, mode, background)
+        cv2 = self._cv2
+        pixels = np.asarray(image)
+        rgb = ImageColor.getrgb(background) if isinstance(background, str) else background
+        alpha = cv2.cvtColor(cv2.extractChannel(pixels, 3), cv2.COLOR_GRAY2RGB)
+        foreground = cv2.multiply(cv2.cvtColor(pixels, cv2.COLOR_RGBA2RGB), alpha, scale=1 / 255)
+        backdrop = cv2.multiply(cv2.bitwise_not(alpha), tuple(channel / 255 for channel in rgb[:3]) + (0,))
+        flattened = Image.fromarray(cv2.add(foreground, backdrop))
+        return flattened if mode == "RGB" else flattened.convert(mode)
+
+
+# Backend name to factory; register additional backends here
+IMAGE_BACKENDS: Dict[str, Callable[[], ImageOps]] = {
+    "pil": PILImageOps,
+    "opencv": OpenCVImageOps,
+}
+
+_instances: Dict[str, ImageOps] = {}
+_lock = threading.Lock()
+
+
+def get_image_ops(name: Optional[str] = None) -> ImageOps:
+    """Get an image operation backend.
+
+    Args:
+        name: Backend name, defaults to ``processing.image_backend``.
+
+    Returns:
+        Shared backend instance; Pillow if the requested backend cannot be imported.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    name = (name or config.get("processing.image_backend", "pil")).lower()
+    with _lock:
+        if name not in _instances:
+            if name not in IMAGE_BACKENDS:
+                raise ValueError(f"Unknown image backend: {name}. Available: {', '.join(IMAGE_BACKENDS)}")
+            try:
+                _instances[name] = IMAGE_BACKENDS[name]()
+            except ImportError as e:
+                logger.warning(f"Image backend {name} is unavailable ({e}), falling back to Pillow")
+                _instances[name] = PILImageOps()
+        return _instances[name]
+
+
+__all__ = ["IMAGE_BACKENDS", "ImageOps", "OpenCVImageOps", "PILImageOps", "get_image_ops", "has_alpha"]
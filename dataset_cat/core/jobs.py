@@ -0,0 +1,537 @@
+"""Background job manager for long-running dataset tasks.
+
+This module runs crawl and processing work off the web server's request
+threads. Jobs are persisted to a SQLite queue so queued work survives a
+restart, and a dispatcher starts jobs only when their declared resource cost
+(network and CPU slots) fits within a global budget shared by all users.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+
+from dataset_cat.core.config import config
+from dataset_cat.core.metrics import JOBS_QUEUED, JOBS_RUNNING, REGISTRY
+from dataset_cat.core.progress import ProgressTracker
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class Job:
+    """A unit of background work and its current state."""
+
+    def __init__(
+        self,
+        job_id: str,
+        kind: str,
+        params: Dict[str, Any],
+        status: str = QUEUED,
+        message: str = "",
+        created_at: Optional[float] = None,
+        started_at: Optional[float] = None,
+        finished_at: Optional[float] = None,
+        has_secrets: bool = False,
+    ) -> None:
+        """Initialize a job record.
+
+        Args:
+            job_id: Unique job identifier.
+            kind: Name of the registered handler that runs the job.
+            params: JSON-serializable handler parameters.
+            status: Current state.
+            message: Latest status message or final result.
+            created_at: Enqueue time as a Unix timestamp.
+            started_at: Start time as a Unix timestamp.
+            finished_at: Completion time as a Unix timestamp.
+            has_secrets: Whether the job was submitted with in-memory secrets, which are
+                lost if the process stops before it runs.
+        """
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.status = status
+        self.message = message
+        self.created_at = created_at if created_at is not None else time.time()
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.has_secrets = has_secrets
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the job, excluding its parameters.
+
+        Returns:
+            Dictionary of job fields.
+        """
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "message": self.message,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobContext:
+    """Handle passed to a running job for reporting status and checking cancellation."""
+
+    def __init__(self, manager: "JobManager", job: Job, secrets: Dict[str, Any]) -> None:
+        """Initialize the context.
+
+        Args:
+            manager: Owning job manager.
+            job: The running job.
+            secrets: Parameters that are kept in memory only and never persisted.
+        """
+        self._manager = manager
+        self.job = job
+        self.secrets = secrets
+        # Handlers may replace this with a RunProfiler to profile the job
+        self.progress: ProgressTracker = ProgressTracker()
+
+    @property
+    def job_id(self) -> str:
+        return self.job.job_id
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation has been requested; handlers should stop at the next safe point."""
+        return self._manager.is_cancel_requested(self.job.job_id)
+
+    def set_message(self, message: str) -> None:
+        """Update the job's status message.
+
+        Args:
+            message: Human-readable progress message.
+        """
+        self._manager._update(self.job, message=message)
+
+
+JobHandler = Callable[[Dict[str, Any], JobContext], str]
+
+
+class JobManager:
+    """Persistent job queue with a resource-budgeted worker pool."""
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        max_workers: int = 4,
+        budget: Optional[Dict[str, int]] = None,
+        max_finished: int = 200,
+    ) -> None:
+        """Initialize the manager and recover unfinished jobs.
+
+        Jobs that were queued or running when the process stopped are queued
+        again and start once a handler for their kind is registered. Jobs
+        submitted with secrets are failed instead, since their secrets were
+        never persisted. Every process needs its own ``db_path``: a manager
+        requeues all unfinished jobs in its file, including those another
+        process is still running.
+
+        Args:
+            db_path: SQLite file for the persistent queue, or None to keep jobs in memory only.
+            max_workers: Maximum number of jobs running at once.
+            budget: Resource slots shared by all jobs, e.g. ``{"network": 2, "cpu": 2}``.
+            max_finished: Finished jobs kept for status queries. Older ones are dropped with
+                their progress, from memory and from the persistent queue on the next start.
+        """
+        self.budget = dict(budget or {})
+        self.max_finished = max_finished
+        self._available = dict(self.budget)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._costs: Dict[str, Dict[str, int]] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._secrets: Dict[str, Dict[str, Any]] = {}
+        self._cancel_requested: set = set()
+        self._contexts: Dict[str, JobContext] = {}
+        self._queue: Deque[str] = deque()
+        # Finished job IDs, oldest first
+        self._finished: Deque[str] = deque()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dataset-cat-job")
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stopping = False
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if db_path is not None:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, "
+                "message TEXT NOT NULL, created_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+                "has_secrets INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "has_secrets" not in columns:
+                # Queues created before the column existed
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN has_secrets INTEGER NOT NULL DEFAULT 0")
+            self._conn.commit()
+            self._recover()
+
+    def register(self, kind: str, handler: JobHandler, cost: Optional[Dict[str, int]] = None) -> None:
+        """Register the handler for a job kind.
+
+        Args:
+            kind: Job kind name.
+            handler: Callable taking ``(params, context)`` and returning a result message.
+            cost: Resource slots the job holds while running, e.g. ``{"network": 1}``.
+
+        Raises:
+            ValueError: If the cost names a resource missing from the budget or exceeds
+                its total, since such a job could never start.
+        """
+        for resource, amount in (cost or {}).items():
+            if resource not in self.budget:
+                raise ValueError(f"Job kind {kind} needs unknown resource: {resource}")
+            if amount > self.budget[resource]:
+                raise ValueError(
+                    f"Job kind {kind} needs {amount} {resource} slots but the budget has {self.budget[resource]}"
+                )
+        with self._condition:
+            self._handlers[kind] = handler
+            self._costs[kind] = dict(cost or {})
+            # Recovered jobs of this kind may now start
+            self._condition.notify_all()
+
+    def start(self) -> None:
+        """Start the dispatcher thread."""
+        with self._condition:
+            if self._dispatcher is not None:
+                return
+            orphaned = {self._jobs[job_id].kind for job_id in self._queue} - set(self._handlers)
+            if orphaned:
+                logger.warning(f"Jobs wait until handlers are registered for: {', '.join(sorted(orphaned))}")
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="dataset-cat-jobs", daemon=True)
+            self._dispatcher.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop dispatching new jobs.
+
+        Args:
+            wait: Whether to wait for running jobs to finish.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._executor.shutdown(wait=wait)
+
+    def submit(self, kind: str, params: Dict[str, Any], secrets: Optional[Dict[str, Any]] = None) -> str:
+        """Queue a job.
+
+        Args:
+            kind: Registered job kind.
+            params: JSON-serializable parameters, persisted with the job.
+            secrets: Parameters such as tokens that must not be written to disk.
+
+        Returns:
+            The new job's ID.
+
+        Raises:
+            ValueError: If no handler is registered for the kind.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        job = Job(uuid.uuid4().hex[:12], kind, params, has_secrets=any((secrets or {}).values()))
+        with self._condition:
+            self._jobs[job.job_id] = job
+            self._secrets[job.job_id] = dict(secrets or {})
+            self._persist(job)
+            self._queue.append(job.job_id)
+            self._condition.notify_all()
+        logger.info(f"Queued {kind} job {job.job_id}")
+        return job.job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job.
+
+        Args:
+            job_id: Job identifier.
+
+        Returns:
+            The job, or None if unknown.
+        """
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, limit: int = 50) -> List[Job]:
+        """List the most recently created jobs.
+
+        Args:
+            limit: Maximum number of jobs to return.
+
+        Returns:
+            Jobs ordered from newest to oldest.
+        """
+        with self._condition:
+            jobs = sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+        return jobs[:limit]
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """Get a queued job's position in the queue.
+
+        Args:
+            job_id: Job identifier.
+
+        Returns:
+            Zero-based position, or None if the job is not queued.
+        """
+        with self._condition:
+            try:
+                return self._queue.index(job_id)
+            except ValueError:
+                return None
+
+    def get_progress(self, job_id: str) -> Optional[ProgressTracker]:
+        """Get the progress counters of a job that has started in this process.
+
+        Args:
+            job_id: Job identifier.
+
+        Returns:
+            The job's tracker, or None if it has not started.
+        """
+        with self._condition:
+            context = self._contexts.get(job_id)
+        return context.progress if context is not None else None
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting to start."""
+        with self._condition:
+            return len(self._queue)
+
+    def running_count(self) -> int:
+        """Number of jobs currently running."""
+        with self._condition:
+            return sum(1 for job in self._jobs.values() if job.status == RUNNING)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job.
+
+        Queued jobs are removed immediately; running jobs are asked to stop and
+        finish as cancelled once their handler returns.
+
+        Args:
+            job_id: Job identifier.
+
+        Returns:
+            True if the job was queued or running.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return False
+            if job.status == QUEUED:
+                self._queue.remove(job_id)
+                self._finish(job, CANCELLED, "Cancelled before start.")
+            else:
+                self._cancel_requested.add(job_id)
+            return True
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        """Whether cancellation was requested for a running job."""
+        with self._condition:
+            return job_id in self._cancel_requested
+
+    def _dispatch_loop(self) -> None:
+        """Start queued jobs in FIFO order as soon as their cost fits the budget."""
+        with self._condition:
+            while not self._stopping:
+                job = self._next_runnable()
+                if job is None:
+                    self._condition.wait()
+                    continue
+                self._reserve(job)
+                job.status = RUNNING
+                job.started_at = time.time()
+                self._persist(job)
+                self._executor.submit(self._run, job)
+
+    def _next_runnable(self) -> Optional[Job]:
+        """Pop the first queued job that has a handler and whose cost fits the available budget.
+
+        Caller holds the lock.
+        """
+        for job_id in self._queue:
+            job = self._jobs[job_id]
+            if job.kind not in self._handlers:
+                continue
+            cost = self._costs.get(job.kind, {})
+            if all(self._available.get(resource, 0) >= amount for resource, amount in cost.items()):
+                self._queue.remove(job_id)
+                return job
+        return None
+
+    def _reserve(self, job: Job) -> None:
+        for resource, amount in self._costs.get(job.kind, {}).items():
+            self._available[resource] -= amount
+
+    def _release(self, job: Job) -> None:
+        for resource, amount in self._costs.get(job.kind, {}).items():
+            self._available[resource] += amount
+
+    def _run(self, job: Job) -> None:
+        """Executor target that runs a job's handler and records the outcome."""
+        context = JobContext(self, job, self._secrets.get(job.job_id, {}))
+        with self._condition:
+            self._contexts[job.job_id] = context
+        try:
+            result = self._handlers[job.kind](job.params, context)
+            status = CANCELLED if context.cancelled else SUCCEEDED
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}\n{traceback.format_exc()}")
+            result, status = f"Error: {e}", FAILED
+        with self._condition:
+            self._release(job)
+            self._finish(job, status, result)
+            self._cancel_requested.discard(job.job_id)
+            self._secrets.pop(job.job_id, None)
+            context.secrets = {}
+            self._condition.notify_all()
+
+    def _finish(self, job: Job, status: str, message: str) -> None:
+        """Mark a job finished. Caller holds the lock."""
+        job.status = status
+        job.message = message
+        job.finished_at = time.time()
+        self._persist(job)
+        logger.info(f"Job {job.job_id} {status}: {message}")
+        self._finished.append(job.job_id)
+        self._prune()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond ``max_finished``. Caller holds the lock."""
+        while len(self._finished) > self.max_finished:
+            job_id = self._finished.popleft()
+            self._jobs.pop(job_id, None)
+            self._contexts.pop(job_id, None)
+
+    def _update(self, job: Job, message: str) -> None:
+        with self._condition:
+            job.message = message
+            self._persist(job)
+
+    def _persist(self, job: Job) -> None:
+        """Write a job to the persistent queue. Caller holds the lock."""
+        if self._conn is None:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (job_id, kind, params, status, message, created_at, started_at, "
+            "finished_at, has_secrets) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job.job_id,
+                job.kind,
+                json.dumps(job.params),
+                job.status,
+                job.message,
+                job.created_at,
+                job.started_at,
+                job.finished_at,
+                int(job.has_secrets),
+            ),
+        )
+        self._conn.commit()
+
+    def _recover(self) -> None:
+        """Load unfinished and recently finished jobs and requeue those that never finished."""
+        assert self._conn is not None
+        finished = ", ".join("?" * len(FINISHED_STATES))
+        self._conn.execute(
+            f"DELETE FROM jobs WHERE status IN ({finished}) AND job_id NOT IN "
+            f"(SELECT job_id FROM jobs WHERE status IN ({finished}) ORDER BY finished_at DESC LIMIT ?)",
+            (*FINISHED_STATES, *FINISHED_STATES, self.max_finished),
+        )
+        self._conn.commit()
+        rows = self._conn.execute(
+            "SELECT job_id, kind, params, status, message, created_at, started_at, finished_at, has_secrets "
+            "FROM jobs ORDER BY created_at"
+        ).fetchall()
+        for job_id, kind, params, status, message, created_at, started_at, finished_at, has_secrets in rows:
+            job = Job(job_id, kind, json.loads(params), status, message, created_at, started_at, finished_at)
+            job.has_secrets = bool(has_secrets)
+            if status not in FINISHED_STATES and job.has_secrets:
+                # Running without the secret would silently skip e.g. the Hugging Face upload
+                self._finish(job, FAILED, "Error: job lost its credentials in a restart; submit it again.")
+            elif status not in FINISHED_STATES:
+                job.status = QUEUED
+                job.started_at = None
+                job.message = "Requeued after restart."
+                self._queue.append(job_id)
+                self._persist(job)
+            self._jobs[job_id] = job
+        finished = [job for job in self._jobs.values() if job.status in FINISHED_STATES]
+        finished.sort(key=lambda job: job.finished_at or 0.0)
+        self._finished = deque(job.job_id for job in finished)
+        self._prune()
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def _collect_job_metrics() -> None:
+    """Publish the shared job manager's queue depth and running job count."""
+    manager = _manager
+    if manager is not None:
+        JOBS_QUEUED.set(manager.queue_depth())
+        JOBS_RUNNING.set(manager.running_count())
+
+
+REGISTRY.add_collector(_collect_job_metrics)
+
+
+def get_job_manager(db_path: Optional[Union[str, Path]] = None) -> JobManager:
+    """Get the process-wide job manager configured under ``jobs.*``.
+
+    The manager is created on first use but not started; register handlers
+    and call ``start`` before submitting work.
+
+    Args:
+        db_path: SQLite file for the persistent queue, defaults to ``jobs.db_path``. Only
+            used by the call that creates the manager.
+
+    Returns:
+        The shared JobManager.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            db_path = db_path or config.get("jobs.db_path") or Path(config.get_cache_dir()) / "jobs.sqlite3"
+            _manager = JobManager(
+                db_path=db_path,
+                max_workers=config.get("jobs.max_workers", 4),
+                budget=config.get("jobs.budget", {"network": 2, "cpu": 2}),
+                max_finished=config.get("jobs.max_finished", 200),
+            )
+        return _manager
+
+
+__all__ = [
+    "Job",
+    "JobContext",
+    "JobManager",
+    "get_job_manager",
+    "QUEUED",
+    "RUNNING",
+    "SUCCEEDED",
+    "FAILED",
+    "CANCELLED",
+]
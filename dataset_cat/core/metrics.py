@@ -0,0 +1,369 @@
+"""Prometheus-style metrics for long-running deployments.
+
+This module keeps counters, gauges and histograms in a process-wide registry
+and renders them in the Prometheus text exposition format. Recording a sample
+is a dictionary update under a lock, so instrumentation stays on in every run;
+the ``/metrics`` HTTP endpoint is only started when enabled.
+"""
+
+import logging
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from dataset_cat.core.config import config
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets in seconds, from fast local steps up to slow downloads
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    """Base class for a named metric family with fixed label names."""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        """Initialize the metric family.
+
+        Args:
+            name: Metric name.
+            documentation: Help text.
+            label_names: Names of the labels every sample carries.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        """Render the family's HELP, TYPE and sample lines."""
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increase the counter.
+
+        Args:
+            amount: Non-negative amount to add.
+            **labels: Label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels: Any) -> None:
+        """Mirror a total maintained elsewhere, such as a cache's hit count.
+
+        Args:
+            value: Current total.
+            **labels: Label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the gauge.
+
+        Args:
+            value: New value.
+            **labels: Label values.
+        """
+        self.set_total(value, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: (bucket counts, sum, count)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record an observation.
+
+        Args:
+            value: Observed value, e.g. a duration in seconds.
+            **labels: Label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.label_names, key, ("le", _format_value(bound)))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} is already registered as a {metric.metric_type}")
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, documentation, label_names)
+
+    def histogram(
+        self, name: str, documentation: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges just before each scrape.
+
+        Args:
+            collector: Callable that updates metrics from external state, such as queue depths.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector} failed: {e}")
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Metrics shared across modules; the "source" label is always the crawl source name, e.g. "Danbooru"
+IMAGES_CRAWLED = REGISTRY.counter("dataset_cat_images_crawled_total", "Images yielded by crawl sources.", ["source"])
+IMAGES_DOWNLOADED = REGISTRY.counter("dataset_cat_images_downloaded_total", "Images downloaded to disk.", ["source"])
+BYTES_DOWNLOADED = REGISTRY.counter("dataset_cat_downloaded_bytes_total", "Bytes downloaded.", ["source"])
+IMAGES_EXPORTED = REGISTRY.counter("dataset_cat_images_exported_total", "Images written by exporters.", ["exporter"])
+STAGE_DURATION = REGISTRY.histogram(
+    "dataset_cat_stage_duration_seconds", "Time spent per item in each pipeline stage or action.", ["stage"]
+)
+HTTP_DURATION = REGISTRY.histogram(
+    "dataset_cat_http_request_duration_seconds", "Outgoing HTTP request latency.", ["host"]
+)
+HTTP_RESPONSES = REGISTRY.counter(
+    "dataset_cat_http_responses_total", "Outgoing HTTP responses by status code.", ["host", "code"]
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "dataset_cat_cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"]
+)
+JOBS_QUEUED = REGISTRY.gauge("dataset_cat_jobs_queued", "Background jobs waiting to start.")
+JOBS_RUNNING = REGISTRY.gauge("dataset_cat_jobs_running", "Background jobs currently running.")
+
+
+def observe_http(host: str, status: int, seconds: float) -> None:
+    """Record an outgoing HTTP request.
+
+    Args:
+        host: Remote host name.
+        status: HTTP status code, or 0 if the request failed without a response.
+        seconds: Request latency.
+    """
+    HTTP_DURATION.observe(seconds, host=host)
+    HTTP_RESPONSES.inc(host=host, code=status)
+
+
+def observe_http_failure(error: Exception) -> None:
+    """Record an httpx request that failed without a response, such as a connect error or timeout.
+
+    The response hook of ``httpx_event_hooks`` never fires for these, so callers
+    record them where the exception is caught; they are counted with status 0.
+
+    Args:
+        error: The ``httpx.TransportError`` raised for the request.
+    """
+    try:
+        request = error.request  # type: ignore[attr-defined]
+    except (AttributeError, RuntimeError):  # httpx raises RuntimeError when no request is attached
+        return
+    started = request.extensions.get("dataset_cat_started")
+    observe_http(request.url.host, 0, time.perf_counter() - started if started is not None else 0.0)
+
+
+def httpx_event_hooks() -> Dict[str, List[Callable[..., Any]]]:
+    """Build ``event_hooks`` for an ``httpx.AsyncClient`` that record request metrics.
+
+    Returns:
+        Hooks mapping suitable for the ``event_hooks`` client argument.
+    """
+
+    async def on_request(request: Any) -> None:
+        request.extensions["dataset_cat_started"] = time.perf_counter()
+
+    async def on_response(response: Any) -> None:
+        started = response.request.extensions.get("dataset_cat_started")
+        if started is not None:
+            observe_http(response.request.url.host, response.status_code, time.perf_counter() - started)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves the registry at ``/metrics``."""
+
+    registry: MetricsRegistry
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0].rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+def start_metrics_server(
+    host: Optional[str] = None, port: Optional[int] = None, registry: Optional[MetricsRegistry] = None
+) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` from a daemon thread.
+
+    Args:
+        host: Bind address, defaults to ``metrics.host``.
+        port: Port, defaults to ``metrics.port``; 0 picks a free port.
+        registry: Registry to expose, defaults to the process-wide registry.
+
+    Returns:
+        The running server; call ``shutdown()`` to stop it.
+    """
+    handler = type("MetricsRequestHandler", (_MetricsRequestHandler,), {"registry": registry or REGISTRY})
+    server = ThreadingHTTPServer(
+        (host or config.get("metrics.host", "127.0.0.1"), config.get("metrics.port", 9464) if port is None else port),
+        handler,
+    )
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="dataset-cat-metrics", daemon=True).start()
+    logger.info(f"Serving metrics on http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    return server
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "DEFAULT_BUCKETS",
+    "observe_http",
+    "observe_http_failure",
+    "httpx_event_hooks",
+    "start_metrics_server",
+]
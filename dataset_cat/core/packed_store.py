@@ -0,0 +1,205 @@
+"""Packed image store with memory-mapped random access.
+
+A store is a pair of files in one directory: ``<name>.bin`` holds encoded
+images back to back and ``<name>.idx.json`` maps each key to its offset,
+length and format. Readers map the data file once and slice it without
+copying, so millions of images are served without per-file open or stat calls.
+"""
+
+import io
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from PIL import Image
+
+INDEX_VERSION = 1
+
+PathLike = Union[str, Path]
+
+
+def _store_paths(directory: PathLike, name: str) -> Tuple[Path, Path]:
+    directory = Path(directory)
+    return directory / f"{name}.bin", directory / f"{name}.idx.json"
+
+
+class PackedStoreWriter:
+    """Append encoded images to a packed store.
+
+    Data and index are written to ``.tmp`` files that replace the store when
+    the writer is closed; until then readers see the previous store, if any,
+    and readers that already mapped it keep their view. Adding a key twice
+    keeps the last value.
+    """
+
+    def __init__(self, directory: PathLike, name: str = "images") -> None:
+        """Start a new store that replaces any existing one on close.
+
+        Args:
+            directory: Directory that receives the store files.
+            name: Base name of the data and index files.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.data_path, self.index_path = _store_paths(directory, name)
+        self._data_temp_path = self.data_path.with_name(f"{self.data_path.name}.tmp")
+        self._data = open(self._data_temp_path, "wb")
+        self._entries: Dict[str, List[Any]] = {}
+        self._meta: Dict[str, Any] = {}
+        self._offset = 0
+
+    def add(self, key: str, data: bytes, image_format: str, meta: Optional[Dict[str, Any]] = None) -> int:
+        """Append encoded image bytes.
+
+        Args:
+            key: Lookup key, e.g. the original file name.
+            data: Encoded image.
+            image_format: File extension of the encoding, such as ``png``.
+            meta: Optional JSON-serializable metadata kept in the index.
+
+        Returns:
+            Number of bytes written.
+        """
+        self._data.write(data)
+        self._entries[key] = [self._offset, len(data), image_format]
+        if meta is not None:
+            self._meta[key] = meta
+        self._offset += len(data)
+        return len(data)
+
+    def add_image(self, key: str, image: Image.Image, image_format: str = "PNG", **save_params: Any) -> int:
+        """Encode a PIL image and append it.
+
+        Args:
+            key: Lookup key.
+            image: Image to encode.
+            image_format: PIL format name.
+            **save_params: Extra ``Image.save`` arguments such as ``quality``.
+
+        Returns:
+            Number of bytes written.
+        """
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **save_params)
+        return self.add(key, buffer.getvalue(), image_format.lower().replace("jpeg", "jpg"))
+
+    def close(self) -> None:
+        """Flush the data and index and move them over the previous store."""
+        if self._data.closed:
+            return
+        self._data.close()
+        index = {"version": INDEX_VERSION, "data_file": self.data_path.name, "entries": self._entries}
+        if self._meta:
+            index["meta"] = self._meta
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, default=str)
+        # Open readers keep the replaced data file mapped, so it is never truncated under them
+        os.replace(self._data_temp_path, self.data_path)
+        os.replace(temp_path, self.index_path)
+
+    def __enter__(self) -> "PackedStoreWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class PackedImageStore:
+    """Read-only, memory-mapped view of a packed store with O(1) lookups by key.
+
+    ``get`` returns a ``memoryview`` into the mapping; release such views
+    before closing the store.
+    """
+
+    def __init__(self, directory: PathLike, name: str = "images") -> None:
+        """Open a store.
+
+        Args:
+            directory: Directory containing the store files.
+            name: Base name of the data and index files.
+        """
+        data_path, index_path = _store_paths(directory, name)
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported packed store version: {index.get('version')}")
+        self._entries: Dict[str, List[Any]] = index["entries"]
+        self._meta: Dict[str, Any] = index.get("meta", {})
+        self._file = open(data_path, "rb")
+        # Zero-length files cannot be mapped
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._entries else None
+        self._view = memoryview(self._mmap) if self._mmap is not None else memoryview(b"")
+
+    @staticmethod
+    def exists(directory: PathLike, name: str = "images") -> bool:
+        """Check whether a directory contains a complete store."""
+        return all(path.is_file() for path in _store_paths(directory, name))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def keys(self) -> List[str]:
+        return list(self._entries)
+
+    def get(self, key: str) -> memoryview:
+        """Return the encoded bytes of an image without copying.
+
+        Args:
+            key: Image key.
+
+        Returns:
+            Read-only view into the memory-mapped data file.
+
+        Raises:
+            KeyError: If the key is not in the store.
+        """
+        offset, length, _ = self._entries[key]
+        return self._view[offset : offset + length]
+
+    __getitem__ = get
+
+    def size(self, key: str) -> int:
+        return self._entries[key][1]
+
+    def format(self, key: str) -> str:
+        return self._entries[key][2]
+
+    def meta(self, key: str) -> Dict[str, Any]:
+        return self._meta.get(key, {})
+
+    def open_image(self, key: str) -> Image.Image:
+        """Decode an image.
+
+        Args:
+            key: Image key.
+
+        Returns:
+            Fully loaded PIL image.
+        """
+        with self.get(key) as view:
+            image = Image.open(io.BytesIO(view))
+            image.load()
+        return image
+
+    def close(self) -> None:
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "PackedImageStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+__all__ = ["PackedImageStore", "PackedStoreWriter"]
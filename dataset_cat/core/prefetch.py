@@ -0,0 +1,116 @@
+"""Read-ahead iteration for slow paginated sources.
+
+Booru sources fetch listing page N+1 only after the consumer has taken every
+item of page N. :class:`Prefetcher` drains such an iterator on a background
+thread into a bounded buffer, so page requests overlap with downloads and
+processing while memory stays capped.
+"""
+
+import queue
+import threading
+from typing import Any, Generic, Iterable, Iterator, Optional, TypeVar
+
+from dataset_cat.core.config import config
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    """Wraps an exception raised by the source so it is re-raised in the consumer."""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class Prefetcher(Generic[T]):
+    """Iterate a source on a background thread, buffering up to ``max_ahead`` items.
+
+    The producer blocks while the buffer is full, which bounds memory and how far
+    ahead of the consumer requests are made. Exceptions from the source are
+    re-raised on the consumer side. Call :meth:`close`, or use the prefetcher as a
+    context manager, when stopping early so the producer thread exits.
+    """
+
+    def __init__(self, iterable: Iterable[T], max_ahead: Optional[int] = None, name: str = "prefetch") -> None:
+        """Start prefetching.
+
+        Args:
+            iterable: Source to consume, typically a listing iterator.
+            max_ahead: Items buffered ahead of the consumer, defaults to ``fetcher.prefetch_items``.
+            name: Name of the producer thread.
+        """
+        self.max_ahead = max(1, max_ahead or config.get("fetcher.prefetch_items", 200))
+        self._iterable = iterable
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.max_ahead)
+        self._stopped = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(target=self._produce, name=name, daemon=True)
+        self._thread.start()
+
+    def _put(self, value: Any) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        iterator = None
+        try:
+            # Inside the try so a source that cannot be iterated fails the consumer instead of hanging it
+            iterator = iter(self._iterable)
+            for item in iterator:
+                if not self._put(item):
+                    break
+            else:
+                self._put(_DONE)
+        except BaseException as e:
+            self._put(_Failure(e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    @property
+    def buffered(self) -> int:
+        """Number of items fetched but not yet consumed."""
+        return self._queue.qsize()
+
+    def __iter__(self) -> Iterator[T]:
+        return self
+
+    def __next__(self) -> T:
+        if self._finished:
+            raise StopIteration
+        value = self._queue.get()
+        if value is _DONE:
+            self._finished = True
+            raise StopIteration
+        if isinstance(value, _Failure):
+            self._finished = True
+            raise value.error
+        return value
+
+    def close(self) -> None:
+        """Stop the producer after its current item and discard the buffer."""
+        self._finished = True
+        self._stopped.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join()
+
+    def __enter__(self) -> "Prefetcher[T]":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+__all__ = ["Prefetcher"]
@@ -0,0 +1,241 @@
+"""Per-stage profiling for crawl, export and post-processing runs.
+
+This module extends the progress tracker with latency distributions and
+counters per stage, optional cProfile and tracemalloc sampling, and a JSON
+report written at the end of each run, so optimization work can target the
+stages that actually dominate a run.
+"""
+
+import cProfile
+import json
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from dataset_cat.core.config import config
+from dataset_cat.core.progress import ProgressTracker
+
+logger = logging.getLogger(__name__)
+
+# Column headers for summary_rows()
+SUMMARY_COLUMNS = ["stage", "calls", "total_s", "mean_ms", "p95_ms", "max_ms", "share_%"]
+
+# cProfile and tracemalloc are process-wide, so concurrent runs share them
+_sampling_lock = threading.Lock()
+_cprofile_owner: Optional["RunProfiler"] = None
+_tracemalloc_users = 0
+_tracemalloc_started = False
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class RunProfiler(ProgressTracker):
+    """Progress tracker that also keeps timing distributions and optional profiler samples.
+
+    Use it as a context manager around the run so cProfile and tracemalloc
+    sampling cover exactly the profiled work. cProfile only samples the thread
+    that entered the context, and only one run at a time is sampled; runs that
+    start while another is being profiled skip cProfile. tracemalloc is shared
+    by overlapping runs, so their memory figures include each other's allocations.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        total: Optional[int] = None,
+        use_cprofile: bool = False,
+        use_tracemalloc: bool = False,
+        top_n: int = 20,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            name: Run name, used in the report and its file name.
+            total: Expected number of items, used for the ETA.
+            use_cprofile: Whether to collect a cProfile sample of the run.
+            use_tracemalloc: Whether to trace memory allocations during the run.
+            top_n: Number of functions and allocation sites kept in the report.
+        """
+        super().__init__(total)
+        self.name = name
+        self.use_cprofile = use_cprofile
+        self.use_tracemalloc = use_tracemalloc
+        self.top_n = top_n
+        self.finished_at: Optional[float] = None
+        self._calls: Dict[str, List[float]] = {}
+        self._profile: Optional[cProfile.Profile] = None
+        self._memory: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_config(cls, name: str, total: Optional[int] = None) -> "RunProfiler":
+        """Create a profiler using the sampling options under ``profiling.*``.
+
+        Args:
+            name: Run name.
+            total: Expected number of items.
+
+        Returns:
+            A new RunProfiler.
+        """
+        return cls(
+            name,
+            total,
+            use_cprofile=config.get("profiling.cprofile", False),
+            use_tracemalloc=config.get("profiling.tracemalloc", False),
+            top_n=config.get("profiling.top_n", 20),
+        )
+
+    def record(self, stage: str, seconds: float, nbytes: int = 0, items: int = 1) -> None:
+        super().record(stage, seconds, nbytes, items)
+        with self._lock:
+            self._calls.setdefault(stage, []).append(seconds)
+
+    def __enter__(self) -> "RunProfiler":
+        global _cprofile_owner, _tracemalloc_started, _tracemalloc_users
+        with _sampling_lock:
+            if self.use_tracemalloc:
+                if _tracemalloc_users == 0:
+                    _tracemalloc_started = not tracemalloc.is_tracing()
+                    if _tracemalloc_started:
+                        tracemalloc.start()
+                    # Resetting the peak while other runs trace would corrupt their figures
+                    if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                        tracemalloc.reset_peak()
+                _tracemalloc_users += 1
+            if self.use_cprofile:
+                if _cprofile_owner is None:
+                    _cprofile_owner = self
+                    self._profile = cProfile.Profile()
+                    self._profile.enable()
+                else:
+                    logger.info(f"Skipping cProfile for {self.name}: {_cprofile_owner.name} is being profiled")
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        global _cprofile_owner, _tracemalloc_started, _tracemalloc_users
+        with _sampling_lock:
+            if self._profile is not None and _cprofile_owner is self:
+                self._profile.disable()
+                _cprofile_owner = None
+            if self.use_tracemalloc:
+                self._sample_memory()
+                _tracemalloc_users -= 1
+                # The last run out stops tracing, unless it was already on before the first run
+                if _tracemalloc_users == 0 and _tracemalloc_started:
+                    tracemalloc.stop()
+                    _tracemalloc_started = False
+        self.finished_at = time.time()
+
+    def _sample_memory(self) -> None:
+        """Take the tracemalloc snapshot for the report. Caller holds the sampling lock."""
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            self._memory = {
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top": [
+                    {"location": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[: self.top_n]
+                ],
+            }
+
+    def stage_report(self) -> List[Dict[str, Any]]:
+        """Timing statistics per stage, in the order stages started."""
+        with self._lock:
+            calls = {stage: sorted(values) for stage, values in self._calls.items()}
+        busy_total = sum(sum(values) for values in calls.values()) or 1.0
+        report = []
+        for stats in self.stages():
+            values = calls.get(stats.name, [])
+            report.append(
+                {
+                    "stage": stats.name,
+                    "calls": len(values),
+                    "items": stats.items,
+                    "bytes": stats.bytes,
+                    "total_seconds": stats.busy_seconds,
+                    "mean_ms": stats.busy_seconds / len(values) * 1000 if values else 0.0,
+                    "p50_ms": _percentile(values, 0.5) * 1000,
+                    "p95_ms": _percentile(values, 0.95) * 1000,
+                    "max_ms": values[-1] * 1000 if values else 0.0,
+                    "share": stats.busy_seconds / busy_total,
+                }
+            )
+        return report
+
+    def report(self) -> Dict[str, Any]:
+        """Build the full JSON-serializable run report."""
+        end = self.finished_at or time.time()
+        report: Dict[str, Any] = {
+            "name": self.name,
+            "started_at": self.started_at,
+            "elapsed_seconds": end - self.started_at,
+            "total": self.total,
+            "stages": self.stage_report(),
+            "counters": dict(self.counters),
+        }
+        if self._profile is not None:
+            raw_stats = pstats.Stats(self._profile).stats  # type: ignore[attr-defined]
+            # Entries are (primitive calls, calls, own time, cumulative time, callers); rank by cumulative time
+            functions = sorted(raw_stats.items(), key=lambda entry: entry[1][3], reverse=True)[: self.top_n]
+            report["cprofile"] = [
+                {
+                    "function": f"{filename}:{line}({function})",
+                    "calls": call_count,
+                    "total_seconds": total_time,
+                    "cumulative_seconds": cumulative_time,
+                }
+                for (filename, line, function), (_, call_count, total_time, cumulative_time, _) in functions
+            ]
+        if self._memory is not None:
+            report["tracemalloc"] = self._memory
+        return report
+
+    def write_report(self, directory: Optional[Union[str, Path]] = None) -> Path:
+        """Write the run report as JSON.
+
+        Args:
+            directory: Output directory, defaults to ``profiling.report_dir``
+                or a ``profiles`` folder next to the configuration file.
+
+        Returns:
+            Path of the written report.
+        """
+        directory = Path(directory or config.get("profiling.report_dir") or Path(config.config_dir) / "profiles")
+        directory.mkdir(parents=True, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        path = directory / f"{self.name}-{timestamp}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def summary_rows(self) -> List[List[Any]]:
+        """Stage statistics as table rows matching SUMMARY_COLUMNS, slowest stage first."""
+        rows = [
+            [
+                entry["stage"],
+                entry["calls"],
+                round(entry["total_seconds"], 3),
+                round(entry["mean_ms"], 1),
+                round(entry["p95_ms"], 1),
+                round(entry["max_ms"], 1),
+                round(entry["share"] * 100, 1),
+            ]
+            for entry in self.stage_report()
+        ]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+
+__all__ = ["RunProfiler", "SUMMARY_COLUMNS"]
@@ -0,0 +1,213 @@
+"""Progress and throughput tracking for multi-stage runs.
+
+This module records per-stage item counts, byte counts and latencies for the
+crawl, download, action and export stages, and renders rates and an ETA for
+display while a run is in progress.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from dataset_cat.core.metrics import STAGE_DURATION
+from dataset_cat.core.utils import format_time_elapsed
+
+T = TypeVar("T")
+
+
+class StageStats:
+    """Counters for one pipeline stage."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize empty counters.
+
+        Args:
+            name: Stage name.
+        """
+        self.name = name
+        self.items = 0
+        self.bytes = 0
+        self.busy_seconds = 0.0
+        self.first_at: Optional[float] = None
+        self.last_at: Optional[float] = None
+
+    @property
+    def wall_seconds(self) -> float:
+        """Time from the stage's first record to its last."""
+        if self.first_at is None or self.last_at is None:
+            return 0.0
+        return self.last_at - self.first_at
+
+    @property
+    def items_per_second(self) -> float:
+        elapsed = self.wall_seconds or self.busy_seconds
+        return self.items / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        elapsed = self.wall_seconds or self.busy_seconds
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        """Average busy time per item in seconds."""
+        return self.busy_seconds / self.items if self.items else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "bytes": self.bytes,
+            "busy_seconds": self.busy_seconds,
+            "items_per_second": self.items_per_second,
+            "bytes_per_second": self.bytes_per_second,
+            "mean_latency": self.mean_latency,
+        }
+
+
+class ProgressTracker:
+    """Thread-safe per-stage progress counters for a single run."""
+
+    def __init__(self, total: Optional[int] = None) -> None:
+        """Initialize the tracker.
+
+        Args:
+            total: Expected number of items, used for the ETA; None if unknown.
+        """
+        self.total = total
+        self.queue_depth = 0
+        self.started_at = time.time()
+        self.counters: Dict[str, int] = {}
+        self._stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, nbytes: int = 0, items: int = 1) -> None:
+        """Record completed work for a stage.
+
+        Args:
+            stage: Stage name. Stages are reported in the order first recorded.
+            seconds: Time spent on the work.
+            nbytes: Bytes transferred or written.
+            items: Number of items completed.
+        """
+        now = time.time()
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats(stage)
+            if stats.first_at is None:
+                stats.first_at = now - seconds
+            stats.last_at = now
+            stats.items += items
+            stats.bytes += nbytes
+            stats.busy_seconds += seconds
+        STAGE_DURATION.observe(seconds / items if items else seconds, stage=stage)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Increment a named counter, e.g. items dropped by a filter.
+
+        Args:
+            name: Counter name.
+            amount: Amount to add.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def time(self, stage: str, nbytes: int = 0, items: int = 1) -> Iterator[None]:
+        """Time a block of work as one record of a stage.
+
+        Args:
+            stage: Stage name.
+            nbytes: Bytes handled by the block.
+            items: Number of items completed by the block.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, nbytes, items)
+
+    def track(
+        self, iterable: Iterable[T], stage: str, size_of: Optional[Callable[[T], int]] = None
+    ) -> Iterator[T]:
+        """Wrap an iterable, recording the time taken to produce each item.
+
+        Args:
+            iterable: Items to pass through.
+            stage: Stage name.
+            size_of: Optional function returning an item's size in bytes.
+
+        Yields:
+            The items of ``iterable`` unchanged.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            elapsed = time.perf_counter() - start
+            self.record(stage, elapsed, size_of(item) if size_of is not None else 0)
+            yield item
+
+    def stages(self) -> List[StageStats]:
+        """Stage counters in the order stages started."""
+        with self._lock:
+            return list(self._stages.values())
+
+    def eta(self) -> Optional[float]:
+        """Estimate the seconds remaining, assuming stages run one after another.
+
+        Returns:
+            Estimated remaining time, or None if the total is unknown or no stage has data.
+        """
+        stages = self.stages()
+        if self.total is None or not stages:
+            return None
+        return sum(max(self.total - stats.items, 0) * stats.mean_latency for stats in stages)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the current progress."""
+        return {
+            "total": self.total,
+            "queue_depth": self.queue_depth,
+            "elapsed": time.time() - self.started_at,
+            "eta": self.eta(),
+            "stages": [stats.to_dict() for stats in self.stages()],
+            "counters": dict(self.counters),
+        }
+
+    def format(self, locale: Optional[dict] = None) -> str:
+        """Render progress as plain text, one line per stage.
+
+        Args:
+            locale: Optional locale data for labels.
+
+        Returns:
+            Multi-line progress summary.
+        """
+        if locale is None:
+            locale = {}
+        lines = []
+        for stats in self.stages():
+            lines.append(
+                f"{stats.name}: {stats.items} | {stats.items_per_second:.2f} it/s | "
+                f"{stats.bytes_per_second / 1024 / 1024:.2f} MB/s | {stats.mean_latency * 1000:.0f} ms/it"
+            )
+        footer = [
+            locale.get("progress_elapsed", "Elapsed: {elapsed}").format(
+                elapsed=format_time_elapsed(time.time() - self.started_at)
+            )
+        ]
+        eta = self.eta()
+        if eta is not None:
+            footer.append(locale.get("progress_eta", "ETA: {eta}").format(eta=format_time_elapsed(eta)))
+        footer.append(locale.get("progress_queue_depth", "Queue: {depth}").format(depth=self.queue_depth))
+        lines.append(" | ".join(footer))
+        return "\n".join(lines)
+
+
+__all__ = ["StageStats", "ProgressTracker"]
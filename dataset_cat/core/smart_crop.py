@@ -0,0 +1,322 @@
+"""Content-aware crop placement.
+
+Center crops often cut the heads off character art. :class:`SmartCropper`
+analyzes an image once, on the CPU, into a small focus map: spectral-residual
+saliency of a thumbnail, with faces boosted when a detector model is
+configured. The map depends only on the image, not on the crop size, so it is
+cached per content hash in a :class:`~dataset_cat.core.cache.TwoLevelCache` and
+every later crop of the same image, at any divisor or bucket size, is placed
+from the cached map without analyzing the image again.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from dataset_cat.core.cache import TwoLevelCache
+from dataset_cat.core.config import config
+from dataset_cat.core.image_ops import Box
+
+logger = logging.getLogger(__name__)
+
+# Bump when the analysis changes so stale focus maps are not reused
+ANALYSIS_VERSION = 1
+
+# Side of the square thumbnail the spectral residual is computed on
+_SALIENCY_SIZE = 64
+# Longest side of the image faces are detected on
+_DETECTION_SIZE = 512
+# Number of crop offsets tried along each axis
+_OFFSET_STEPS = 65
+
+
+def content_hash(image: Image.Image) -> str:
+    """Hash an image's decoded pixels, so re-encoded or renamed copies share a key."""
+    # SHA-1 over the array view is about twice as fast as a keyed hash over ``tobytes``
+    digest = hashlib.sha1(f"{image.mode}:{image.width}x{image.height}:".encode())
+    digest.update(np.ascontiguousarray(np.asarray(image)))
+    return digest.hexdigest()
+
+
+def spectral_residual_saliency(gray: np.ndarray) -> np.ndarray:
+    """Compute a saliency map with the spectral residual method.
+
+    Regions whose log-amplitude spectrum stands out from its local average are
+    salient; this picks out subjects against flat or repetitive backgrounds.
+
+    Args:
+        gray: 2D float array, typically a small square thumbnail.
+
+    Returns:
+        Non-negative saliency map of the same shape.
+    """
+    import cv2
+
+    spectrum = np.fft.fft2(gray)
+    log_amplitude = np.log(np.abs(spectrum) + 1e-8).astype(np.float32)
+    residual = log_amplitude - cv2.blur(log_amplitude, (3, 3))
+    saliency = np.abs(np.fft.ifft2(np.exp(residual + 1j * np.angle(spectrum)))) ** 2
+    return cv2.GaussianBlur(saliency.astype(np.float32), (0, 0), gray.shape[0] / 24)
+
+
+class FocusMap:
+    """Coarse map of where the important content of an image is."""
+
+    def __init__(self, weights: np.ndarray) -> None:
+        """Wrap a focus map.
+
+        Args:
+            weights: Non-negative 2D array covering the whole image, rows first.
+        """
+        self.weights = np.asarray(weights, dtype=np.float64)
+        integral = np.zeros((self.weights.shape[0] + 1, self.weights.shape[1] + 1))
+        integral[1:, 1:] = self.weights.cumsum(axis=0).cumsum(axis=1)
+        self._integral = integral
+
+    def _mass(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Total weight above and left of points given in map cells, interpolated bilinearly."""
+        rows, cols = self.weights.shape
+        x = np.clip(x, 0, cols)
+        y = np.clip(y, 0, rows)
+        x0 = np.minimum(np.floor(x).astype(int), cols - 1)
+        y0 = np.minimum(np.floor(y).astype(int), rows - 1)
+        fx = x - x0
+        fy = y - y0
+        integral = self._integral
+        top = integral[y0, x0] * (1 - fx) + integral[y0, x0 + 1] * fx
+        bottom = integral[y0 + 1, x0] * (1 - fx) + integral[y0 + 1, x0 + 1] * fx
+        return top * (1 - fy) + bottom * fy
+
+    def crop_box(self, image_size: Tuple[int, int], crop_size: Tuple[int, int]) -> Box:
+        """Place a crop window over as much of the focus weight as possible.
+
+        Among windows holding about the same weight, the one centered closest
+        to the weighted centroid of the map wins.
+
+        Args:
+            image_size: (width, height) of the image the map was computed for,
+                or of a resized copy of it.
+            crop_size: (width, height) of the crop window, at most the image size.
+
+        Returns:
+            (left, top, right, bottom) box in pixels of ``image_size``.
+        """
+        width, height = image_size
+        crop_width, crop_height = min(crop_size[0], width), min(crop_size[1], height)
+        rows, cols = self.weights.shape
+        total = self._integral[-1, -1]
+        if total <= 0:
+            left, top = (width - crop_width) // 2, (height - crop_height) // 2
+            return left, top, left + crop_width, top + crop_height
+
+        # Candidate offsets in map cells
+        span_x, span_y = crop_width / width * cols, crop_height / height * rows
+        xs = np.linspace(0, cols - span_x, _OFFSET_STEPS if crop_width < width else 1)
+        ys = np.linspace(0, rows - span_y, _OFFSET_STEPS if crop_height < height else 1)
+        x0, y0 = np.meshgrid(xs, ys)
+        x1, y1 = x0 + span_x, y0 + span_y
+        mass = self._mass(x1, y1) - self._mass(x0, y1) - self._mass(x1, y0) + self._mass(x0, y0)
+
+        centroid_x = (self.weights.sum(axis=0) * (np.arange(cols) + 0.5)).sum() / total
+        centroid_y = (self.weights.sum(axis=1) * (np.arange(rows) + 0.5)).sum() / total
+        distance = np.hypot(x0 + span_x / 2 - centroid_x, y0 + span_y / 2 - centroid_y)
+        candidates = mass >= mass.max() - 1e-3 * total
+        best = np.unravel_index(np.argmin(np.where(candidates, distance, np.inf)), mass.shape)
+
+        left = int(round(x0[best] / cols * width))
+        top = int(round(y0[best] / rows * height))
+        left = min(max(left, 0), width - crop_width)
+        top = min(max(top, 0), height - crop_height)
+        return left, top, left + crop_width, top + crop_height
+
+    def encode(self) -> str:
+        """Serialize the map, quantized to 8 bits, for the cache."""
+        peak = self.weights.max()
+        scaled = self.weights / peak * 255 if peak > 0 else self.weights
+        quantized = np.round(scaled).astype(np.uint8)
+        return json.dumps(
+            {"shape": list(quantized.shape), "weights": base64.b64encode(quantized.tobytes()).decode("ascii")}
+        )
+
+    @classmethod
+    def decode(cls, value: str) -> "FocusMap":
+        """Restore a map serialized with :meth:`encode`."""
+        data = json.loads(value)
+        weights = np.frombuffer(base64.b64decode(data["weights"]), dtype=np.uint8).reshape(data["shape"])
+        return cls(weights)
+
+
+class SmartCropper:
+    """Analyze images into focus maps and place crops from them, caching maps per content hash."""
+
+    def __init__(
+        self,
+        cache: Optional[TwoLevelCache] = None,
+        face_model: Optional[str] = None,
+        face_weight: Optional[float] = None,
+        map_size: Optional[int] = None,
+    ) -> None:
+        """Initialize the cropper.
+
+        Args:
+            cache: Cache for focus maps, or None to analyze every image.
+            face_model: Face detector, defaults to ``processing.smart_crop.face_model``. A ``.onnx``
+                file is loaded as an OpenCV YuNet detector and an ``.xml`` file as a cascade
+                classifier, e.g. an anime face cascade; empty uses saliency only.
+            face_weight: Weight of detected faces relative to the saliency peak, defaults to
+                ``processing.smart_crop.face_weight``.
+            map_size: Cells along the longer side of focus maps, defaults to
+                ``processing.smart_crop.map_size``.
+
+        Raises:
+            ImportError: If OpenCV is not installed.
+        """
+        import cv2
+
+        self._cv2 = cv2
+        self.cache = cache
+        self.face_model = config.get("processing.smart_crop.face_model", "") if face_model is None else face_model
+        self.face_weight = config.get("processing.smart_crop.face_weight", 2.0) if face_weight is None else face_weight
+        self.map_size = map_size or config.get("processing.smart_crop.map_size", 32)
+        self._detector: Any = None
+        self._detector_lock = threading.Lock()
+        model_name = Path(self.face_model).name if self.face_model else "none"
+        self._key_prefix = f"smartcrop:v{ANALYSIS_VERSION}:{self.map_size}:{model_name}:{self.face_weight}"
+        if self.face_model:
+            self._detector = self._load_detector(self.face_model)
+
+    def _load_detector(self, path: str) -> Any:
+        """Load a face detector model, or return None if it cannot be used."""
+        cv2 = self._cv2
+        if not os.path.exists(path):
+            logger.warning(f"Face model {path} not found, smart crop uses saliency only")
+            return None
+        if path.lower().endswith(".onnx") and hasattr(cv2, "FaceDetectorYN"):
+            return cv2.FaceDetectorYN.create(path, "", (_DETECTION_SIZE, _DETECTION_SIZE))
+        if path.lower().endswith(".xml") and hasattr(cv2, "CascadeClassifier"):
+            return cv2.CascadeClassifier(path)
+        logger.warning(f"Face model {path} is not supported by this OpenCV build, smart crop uses saliency only")
+        return None
+
+    def _detect_faces(self, image: Image.Image) -> np.ndarray:
+        """Detect faces, returning (x, y, w, h) rows as fractions of the image size."""
+        if self._detector is None:
+            return np.zeros((0, 4))
+        cv2 = self._cv2
+        scale = min(1.0, _DETECTION_SIZE / max(image.size))
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        small = np.asarray(image.convert("RGB").resize(size, Image.BILINEAR))
+        with self._detector_lock:
+            if hasattr(cv2, "FaceDetectorYN") and isinstance(self._detector, cv2.FaceDetectorYN):
+                self._detector.setInputSize(size)
+                _, faces = self._detector.detect(cv2.cvtColor(small, cv2.COLOR_RGB2BGR))
+                boxes = faces[:, :4] if faces is not None else np.zeros((0, 4))
+            else:
+                gray = cv2.equalizeHist(cv2.cvtColor(small, cv2.COLOR_RGB2GRAY))
+                boxes = self._detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24))
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        return boxes / np.array([size[0], size[1], size[0], size[1]])
+
+    def analyze(self, image: Image.Image) -> FocusMap:
+        """Compute the focus map of an image without consulting the cache.
+
+        Args:
+            image: Image to analyze.
+
+        Returns:
+            Focus map with ``map_size`` cells along the image's longer side.
+        """
+        cv2 = self._cv2
+        gray = image.convert("L").resize((_SALIENCY_SIZE, _SALIENCY_SIZE), Image.BILINEAR)
+        saliency = spectral_residual_saliency(np.asarray(gray, dtype=np.float32) / 255)
+        scale = self.map_size / max(image.size)
+        cols, rows = max(1, round(image.width * scale)), max(1, round(image.height * scale))
+        weights = cv2.resize(saliency, (cols, rows), interpolation=cv2.INTER_AREA).astype(np.float64)
+        weights /= max(weights.max(), 1e-12)
+
+        for x, y, w, h in self._detect_faces(image):
+            # Pad faces to cover the whole head
+            left, right = int((x - w / 4) * cols), int(np.ceil((x + w * 5 / 4) * cols))
+            top, bottom = int((y - h / 2) * rows), int(np.ceil((y + h * 5 / 4) * rows))
+            weights[max(top, 0) : max(bottom, 0), max(left, 0) : max(right, 0)] += self.face_weight
+        return FocusMap(weights)
+
+    def focus(self, image: Image.Image, key: Optional[str] = None) -> FocusMap:
+        """Get the focus map of an image, analyzing it only if it is not cached.
+
+        Args:
+            image: Image to analyze.
+            key: Content hash of the image, computed with :func:`content_hash` if omitted.
+
+        Returns:
+            The focus map.
+        """
+        if self.cache is None:
+            return self.analyze(image)
+        cache_key = f"{self._key_prefix}:{key or content_hash(image)}"
+        entry = self.cache.get(cache_key)
+        if entry is not None:
+            return FocusMap.decode(entry.value)
+        focus = self.analyze(image)
+        self.cache.set(cache_key, focus.encode())
+        return focus
+
+    def crop_box(self, image: Image.Image, crop_size: Tuple[int, int], key: Optional[str] = None) -> Box:
+        """Place a crop of the given size over the important content of an image.
+
+        Args:
+            image: Image to crop.
+            crop_size: (width, height) of the crop.
+            key: Content hash of the image, computed with :func:`content_hash` if omitted.
+
+        Returns:
+            (left, top, right, bottom) box in pixels.
+        """
+        return self.focus(image, key).crop_box(image.size, crop_size)
+
+
+_cropper: Optional[SmartCropper] = None
+_lock = threading.Lock()
+
+
+def get_smart_cropper() -> SmartCropper:
+    """Get the process-wide smart cropper configured under ``processing.smart_crop``.
+
+    Focus maps are cached in ``<cache_dir>/smart_crop.sqlite3`` unless
+    ``processing.smart_crop.cache_enabled`` is off.
+
+    Returns:
+        Shared cropper.
+
+    Raises:
+        ImportError: If OpenCV is not installed.
+    """
+    global _cropper
+    with _lock:
+        if _cropper is None:
+            cache = None
+            if config.get("processing.smart_crop.cache_enabled", True):
+                cache = TwoLevelCache(
+                    db_path=os.path.join(config.get_cache_dir(), "smart_crop.sqlite3"),
+                    max_memory_items=config.get("processing.smart_crop.memory_cache_size", 4096),
+                )
+            _cropper = SmartCropper(cache)
+        return _cropper
+
+
+__all__ = [
+    "ANALYSIS_VERSION",
+    "FocusMap",
+    "SmartCropper",
+    "content_hash",
+    "get_smart_cropper",
+    "spectral_residual_saliency",
+]
@@ -0,0 +1,388 @@
+"""Offline Chinese-to-English tag dictionary.
+
+This module loads a tag dictionary (character, series and general tags),
+compiles it into a compact binary table and reads it through ``mmap``. Keys are
+stored sorted by their UTF-8 bytes, so the table doubles as an implicit trie:
+walking a key byte by byte narrows a contiguous range of rows, which gives
+longest-match segmentation of Chinese descriptions and prefix lookup for
+autocomplete without building any in-memory structures.
+
+Binary layout (little-endian)::
+
+    magic "DCTD" | version u32 | count u32 | key_blob_size u32 | value_blob_size u32
+    key_offsets   u32 * (count + 1)
+    value_offsets u32 * (count + 1)
+    categories    u8  * count
+    key_blob | value_blob
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from dataset_cat.core.config import config
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_DICTIONARY_PATH = Path(__file__).resolve().parent.parent / "data" / "tag_dictionary.tsv"
+
+TAG_CATEGORIES: List[str] = ["general", "character", "series"]
+
+_MAGIC = b"DCTD"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIII")
+
+# Characters that separate tags in a free-form description
+_SEPARATORS = set(" \t\r\n,，、;；/|")
+
+
+class TagEntry(NamedTuple):
+    """A dictionary entry.
+
+    Attributes:
+        source: The Chinese term.
+        tag: The booru tag it translates to.
+        category: One of TAG_CATEGORIES.
+    """
+
+    source: str
+    tag: str
+    category: str
+
+
+class TagDictionary(Mapping[str, str]):
+    """Memory-mapped, read-only Chinese-to-tag dictionary.
+
+    The dictionary behaves as a ``Mapping`` from Chinese terms to tags, so it can
+    be passed anywhere a plain ``zh2en_dict`` is accepted.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Open a compiled dictionary file.
+
+        Args:
+            path: Path to a file produced by ``TagDictionary.compile``.
+
+        Raises:
+            ValueError: If the file is not a compiled tag dictionary.
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, key_blob_size, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a compiled tag dictionary: {self.path}")
+
+        view = memoryview(self._mm)
+        offset = _HEADER.size
+        table_size = 4 * (count + 1)
+        self._count = count
+        self._key_offsets = view[offset : offset + table_size].cast("I")
+        offset += table_size
+        self._value_offsets = view[offset : offset + table_size].cast("I")
+        offset += table_size
+        self._categories = view[offset : offset + count]
+        offset += count
+        self._keys = view[offset : offset + key_blob_size]
+        self._values = view[offset + key_blob_size :]
+
+    @staticmethod
+    def compile(entries: Iterable[TagEntry], path: Union[str, Path]) -> None:
+        """Write entries to a compiled dictionary file.
+
+        Args:
+            entries: Entries to store. The first entry wins for duplicate terms.
+            path: Output file path.
+        """
+        unique: Dict[bytes, TagEntry] = {}
+        for entry in entries:
+            unique.setdefault(entry.source.encode("utf-8"), entry)
+        ordered = sorted(unique.items())
+
+        key_offsets = [0]
+        value_offsets = [0]
+        key_blob = bytearray()
+        value_blob = bytearray()
+        categories = bytearray()
+        for key, entry in ordered:
+            key_blob += key
+            value_blob += entry.tag.encode("utf-8")
+            key_offsets.append(len(key_blob))
+            value_offsets.append(len(value_blob))
+            categories.append(TAG_CATEGORIES.index(entry.category))
+
+        count = len(ordered)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, count, len(key_blob), len(value_blob)))
+            f.write(struct.pack(f"<{count + 1}I", *key_offsets))
+            f.write(struct.pack(f"<{count + 1}I", *value_offsets))
+            f.write(categories)
+            f.write(key_blob)
+            f.write(value_blob)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_tsv(cls, tsv_path: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None) -> "TagDictionary":
+        """Load a TSV dictionary, compiling it once and reusing the compiled file.
+
+        Args:
+            tsv_path: Path to a ``chinese<TAB>tag<TAB>category`` file.
+            cache_dir: Directory for compiled files, defaults to the configured cache directory.
+
+        Returns:
+            The loaded dictionary.
+        """
+        raw = Path(tsv_path).read_bytes()
+        digest = hashlib.sha1(raw).hexdigest()[:16]
+        compiled_path = Path(cache_dir or config.get_cache_dir()) / f"tag_dictionary-{digest}.bin"
+        if not compiled_path.exists():
+            compiled_path.parent.mkdir(parents=True, exist_ok=True)
+            cls.compile(_parse_tsv(raw.decode("utf-8")), compiled_path)
+        return cls(compiled_path)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._key_offsets.release()
+        self._value_offsets.release()
+        self._categories.release()
+        self._keys.release()
+        self._values.release()
+        self._mm.close()
+
+    def __getitem__(self, source: str) -> str:
+        entry = self.lookup(source)
+        if entry is None:
+            raise KeyError(source)
+        return entry.tag
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._key(index).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def lookup(self, source: str) -> Optional[TagEntry]:
+        """Find the entry for an exact Chinese term.
+
+        Args:
+            source: Chinese term.
+
+        Returns:
+            The matching entry, or None.
+        """
+        lo, hi = self._narrow(source.encode("utf-8"))
+        if lo < hi and self._key_length(lo) == len(source.encode("utf-8")):
+            return self._entry(lo)
+        return None
+
+    def complete(self, prefix: str, limit: int = 10) -> List[TagEntry]:
+        """List entries whose Chinese term starts with a prefix.
+
+        Args:
+            prefix: Prefix to complete.
+            limit: Maximum number of entries to return.
+
+        Returns:
+            Matching entries in key order.
+        """
+        lo, hi = self._narrow(prefix.encode("utf-8"))
+        return [self._entry(index) for index in range(lo, min(hi, lo + limit))]
+
+    def longest_match(self, text: str, start: int = 0) -> Optional[Tuple[int, TagEntry]]:
+        """Find the longest dictionary term starting at a position in the text.
+
+        Args:
+            text: Text to scan.
+            start: Character offset to start matching at.
+
+        Returns:
+            Tuple of (end character offset, entry), or None if no term matches.
+        """
+        lo, hi = 0, self._count
+        best: Optional[Tuple[int, TagEntry]] = None
+        depth = 0
+        for position in range(start, len(text)):
+            for byte in text[position].encode("utf-8"):
+                lo, hi = self._narrow_step(lo, hi, depth, byte)
+                depth += 1
+                if lo >= hi:
+                    return best
+            # Keys of exactly this length sort first within the range
+            if self._key_length(lo) == depth:
+                best = (position + 1, self._entry(lo))
+        return best
+
+    def segment(self, text: str) -> List[Tuple[str, Optional[TagEntry]]]:
+        """Split a description into dictionary terms using greedy longest match.
+
+        Args:
+            text: Description to segment.
+
+        Returns:
+            List of (text, entry) pairs. Unmatched runs have an entry of None and
+            separator characters are dropped.
+        """
+        segments: List[Tuple[str, Optional[TagEntry]]] = []
+        unmatched = ""
+        position = 0
+        while position < len(text):
+            match = self.longest_match(text, position)
+            if match is not None:
+                end, entry = match
+                if unmatched:
+                    segments.append((unmatched, None))
+                    unmatched = ""
+                segments.append((text[position:end], entry))
+                position = end
+                continue
+            if text[position] in _SEPARATORS:
+                if unmatched:
+                    segments.append((unmatched, None))
+                    unmatched = ""
+            else:
+                unmatched += text[position]
+            position += 1
+        if unmatched:
+            segments.append((unmatched, None))
+        return segments
+
+    def translate(self, text: str) -> Optional[List[str]]:
+        """Translate a description entirely from the dictionary.
+
+        Args:
+            text: Chinese description.
+
+        Returns:
+            The tags for every segment in order without duplicates, or None if any
+            part of the description is not in the dictionary.
+        """
+        entry = self.lookup(text.strip())
+        if entry is not None:
+            return [entry.tag]
+        segments = self.segment(text)
+        if not segments or any(entry is None for _, entry in segments):
+            return None
+        return list(dict.fromkeys(entry.tag for _, entry in segments if entry is not None))
+
+    def _key(self, index: int) -> bytes:
+        return bytes(self._keys[self._key_offsets[index] : self._key_offsets[index + 1]])
+
+    def _key_length(self, index: int) -> int:
+        return self._key_offsets[index + 1] - self._key_offsets[index]
+
+    def _key_byte(self, index: int, depth: int) -> int:
+        """Byte of a key at a depth, or -1 past its end so shorter keys sort first."""
+        start = self._key_offsets[index]
+        if start + depth >= self._key_offsets[index + 1]:
+            return -1
+        return self._keys[start + depth]
+
+    def _entry(self, index: int) -> TagEntry:
+        value = bytes(self._values[self._value_offsets[index] : self._value_offsets[index + 1]])
+        category = TAG_CATEGORIES[self._categories[index]]
+        return TagEntry(self._key(index).decode("utf-8"), value.decode("utf-8"), category)
+
+    def _narrow_step(self, lo: int, hi: int, depth: int, byte: int) -> Tuple[int, int]:
+        """Restrict a row range sharing a prefix of ``depth`` bytes to rows whose next byte is ``byte``."""
+        left, right = lo, hi
+        while left < right:
+            mid = (left + right) // 2
+            if self._key_byte(mid, depth) < byte:
+                left = mid + 1
+            else:
+                right = mid
+        first = left
+        right = hi
+        while left < right:
+            mid = (left + right) // 2
+            if self._key_byte(mid, depth) <= byte:
+                left = mid + 1
+            else:
+                right = mid
+        return first, left
+
+    def _narrow(self, prefix: bytes) -> Tuple[int, int]:
+        """Row range of keys starting with a byte prefix."""
+        lo, hi = 0, self._count
+        for depth, byte in enumerate(prefix):
+            lo, hi = self._narrow_step(lo, hi, depth, byte)
+            if lo >= hi:
+                break
+        return lo, hi
+
+
+def _parse_tsv(text: str) -> Iterator[TagEntry]:
+    """Parse dictionary TSV text.
+
+    Args:
+        text: File contents.
+
+    Yields:
+        Entries in file order. Lines with a missing or unknown category are
+        treated as general tags.
+    """
+    for line in text.splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        parts = line.split("\t")
+        if len(parts) < 2:
+            continue
+        category = parts[2].strip() if len(parts) > 2 else "general"
+        if category not in TAG_CATEGORIES:
+            category = "general"
+        yield TagEntry(parts[0].strip(), parts[1].strip(), category)
+
+
+_dictionary: Optional[TagDictionary] = None
+_dictionary_lock = threading.Lock()
+
+
+def get_tag_dictionary() -> TagDictionary:
+    """Get the process-wide tag dictionary.
+
+    The dictionary is read from ``translator.dictionary_path`` when set,
+    otherwise from the dictionary bundled with the package.
+
+    Returns:
+        The shared TagDictionary.
+    """
+    global _dictionary
+    with _dictionary_lock:
+        if _dictionary is None:
+            path = config.get("translator.dictionary_path") or BUNDLED_DICTIONARY_PATH
+            _dictionary = TagDictionary.from_tsv(path)
+        return _dictionary
+
+
+def get_local_dictionary() -> Optional[TagDictionary]:
+    """Get the tag dictionary if enabled via ``translator.local_dictionary``.
+
+    Returns:
+        The shared TagDictionary, or None if disabled or it fails to load.
+    """
+    if not config.get("translator.local_dictionary", True):
+        return None
+    try:
+        return get_tag_dictionary()
+    except Exception as e:
+        logger.warning(f"Local tag dictionary unavailable: {e}")
+        return None
+
+
+__all__ = [
+    "TagDictionary",
+    "TagEntry",
+    "TAG_CATEGORIES",
+    "BUNDLED_DICTIONARY_PATH",
+    "get_tag_dictionary",
+    "get_local_dictionary",
+]
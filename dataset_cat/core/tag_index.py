@@ -0,0 +1,377 @@
+"""Local booru tag vocabulary for autocomplete and validation.
+
+This module loads a tag dump (tag names with post counts and optional aliases)
+and answers prefix and fuzzy queries locally, so typos in search tags can be
+caught and corrected before any request is sent to a booru.
+
+Fuzzy lookups use the symmetric delete algorithm (SymSpell): every vocabulary
+term is indexed by the strings obtained from deleting up to ``max_distance``
+characters from its first ``prefix_length`` characters. A query generates the
+same deletes, and candidates sharing a delete are verified with an exact
+edit distance.
+"""
+
+import bisect
+import csv
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from dataset_cat.core.config import config
+
+logger = logging.getLogger(__name__)
+
+# Search prefixes that are booru metatags rather than vocabulary tags
+METATAGS: Set[str] = {
+    "rating",
+    "order",
+    "sort",
+    "score",
+    "user",
+    "fav",
+    "id",
+    "width",
+    "height",
+    "date",
+    "status",
+    "source",
+    "md5",
+    "pool",
+    "limit",
+    "ratio",
+    "filetype",
+}
+
+
+class TagSuggestion(NamedTuple):
+    """A vocabulary tag suggested for a query.
+
+    Attributes:
+        tag: Canonical tag name.
+        post_count: Number of posts with the tag.
+        distance: Edit distance from the query (0 for exact or alias matches).
+    """
+
+    tag: str
+    post_count: int
+    distance: int
+
+
+class TagCheck(NamedTuple):
+    """Result of validating a single search tag.
+
+    Attributes:
+        tag: The tag as written by the user.
+        valid: Whether the tag is known (or is a metatag).
+        suggestions: Closest known tags when the tag is invalid or an alias.
+    """
+
+    tag: str
+    valid: bool
+    suggestions: List[TagSuggestion]
+
+
+def normalize_tag(tag: str) -> str:
+    """Normalize a tag to booru form (lowercase, underscores for spaces).
+
+    Args:
+        tag: Tag as typed.
+
+    Returns:
+        Normalized tag.
+    """
+    return "_".join(tag.strip().lower().split())
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Compute the optimal string alignment distance between two strings.
+
+    Args:
+        a: First string.
+        b: Second string.
+        max_distance: Distance above which computation may stop early.
+
+    Returns:
+        The distance, or ``max_distance + 1`` if it exceeds ``max_distance``.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+class TagVocabulary:
+    """In-memory index of booru tags with prefix and fuzzy search."""
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7) -> None:
+        """Initialize an empty vocabulary.
+
+        Args:
+            max_distance: Maximum edit distance for fuzzy suggestions.
+            prefix_length: Number of leading characters indexed for fuzzy search.
+        """
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.post_counts: Dict[str, int] = {}
+        self.aliases: Dict[str, str] = {}
+        self._sorted_names: List[str] = []
+        self._deletes: Optional[Dict[str, List[str]]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path], min_post_count: int = 0) -> "TagVocabulary":
+        """Load a tag dump in CSV form.
+
+        Accepts ``name,post_count`` rows as well as the common autocomplete dump
+        layout ``name,category,post_count,"alias1,alias2"``.
+
+        Args:
+            path: Path to the CSV file.
+            min_post_count: Tags with fewer posts are skipped.
+
+        Returns:
+            The loaded vocabulary.
+        """
+        vocabulary = cls()
+        post_counts = vocabulary.post_counts
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.reader(f):
+                if not row or row[0].startswith("#"):
+                    continue
+                name = row[0]
+                if len(row) >= 3:
+                    count_field, alias_field = row[2], row[3] if len(row) > 3 else ""
+                else:
+                    count_field, alias_field = row[1] if len(row) > 1 else "0", ""
+                try:
+                    post_count = int(count_field)
+                except ValueError:
+                    # Header row or malformed line
+                    continue
+                if post_count < min_post_count:
+                    continue
+                name = normalize_tag(name)
+                post_counts[name] = post_count
+                for alias in alias_field.split(","):
+                    if alias.strip():
+                        vocabulary.aliases.setdefault(normalize_tag(alias), name)
+        # Sort once instead of inserting row by row
+        vocabulary._sorted_names = sorted(post_counts)
+        return vocabulary
+
+    def add(self, tag: str, post_count: int = 0, aliases: Iterable[str] = ()) -> None:
+        """Add a tag to the vocabulary.
+
+        Args:
+            tag: Canonical tag name.
+            post_count: Number of posts with the tag.
+            aliases: Alternative names that resolve to this tag.
+        """
+        name = normalize_tag(tag)
+        with self._lock:
+            is_new = name not in self.post_counts
+            if is_new:
+                bisect.insort(self._sorted_names, name)
+            self.post_counts[name] = post_count
+            for alias in aliases:
+                self.aliases.setdefault(normalize_tag(alias), name)
+            if is_new and self._deletes is not None:
+                for variant in self._variants(name):
+                    self._deletes.setdefault(variant, []).append(name)
+
+    def __contains__(self, tag: object) -> bool:
+        return isinstance(tag, str) and normalize_tag(tag) in self.post_counts
+
+    def __len__(self) -> int:
+        return len(self.post_counts)
+
+    def resolve(self, tag: str) -> Optional[str]:
+        """Resolve a tag or alias to its canonical name.
+
+        Args:
+            tag: Tag or alias.
+
+        Returns:
+            The canonical tag, or None if unknown.
+        """
+        name = normalize_tag(tag)
+        if name in self.post_counts:
+            return name
+        return self.aliases.get(name)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[TagSuggestion]:
+        """List tags starting with a prefix, most popular first.
+
+        Args:
+            prefix: Prefix to complete.
+            limit: Maximum number of suggestions.
+
+        Returns:
+            Suggestions ordered by descending post count.
+        """
+        name = normalize_tag(prefix)
+        start = bisect.bisect_left(self._sorted_names, name)
+        # Names sharing the prefix form a contiguous run in sorted order
+        end = bisect.bisect_left(self._sorted_names, name + "\U0010ffff", start)
+        matches = self._sorted_names[start:end]
+        matches.sort(key=lambda tag: -self.post_counts[tag])
+        return [TagSuggestion(tag, self.post_counts[tag], 0) for tag in matches[:limit]]
+
+    def suggest(self, tag: str, limit: int = 5, max_distance: Optional[int] = None) -> List[TagSuggestion]:
+        """Find known tags close to a possibly misspelled tag.
+
+        Args:
+            tag: Tag to look up.
+            limit: Maximum number of suggestions.
+            max_distance: Maximum edit distance, defaults to the vocabulary's setting.
+
+        Returns:
+            Suggestions ordered by distance, then descending post count.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+        name = normalize_tag(tag)
+
+        canonical = self.resolve(name)
+        if canonical is not None:
+            return [TagSuggestion(canonical, self.post_counts[canonical], 0)]
+
+        deletes = self._get_deletes()
+        candidates: Set[str] = set()
+        for variant in self._variants(name):
+            candidates.update(deletes.get(variant, ()))
+
+        scored: List[Tuple[int, int, str]] = []
+        for candidate in candidates:
+            distance = edit_distance(name, candidate, max_distance)
+            if distance <= max_distance:
+                scored.append((distance, -self.post_counts[candidate], candidate))
+        scored.sort()
+        return [TagSuggestion(candidate, -count, distance) for distance, count, candidate in scored[:limit]]
+
+    def check(self, tag: str) -> TagCheck:
+        """Validate a single search tag.
+
+        Negated tags (``-tag``) are checked without the prefix and metatags
+        such as ``rating:safe`` are always valid.
+
+        Args:
+            tag: Tag as typed in a search.
+
+        Returns:
+            The validation result.
+        """
+        term = tag.strip()
+        if term.startswith("-"):
+            term = term[1:]
+        if ":" in term and term.split(":", 1)[0].lower() in METATAGS:
+            return TagCheck(tag, True, [])
+        name = normalize_tag(term)
+        if name in self.post_counts:
+            return TagCheck(tag, True, [])
+        if name in self.aliases:
+            # Boorus resolve aliases themselves; still point at the canonical name
+            return TagCheck(tag, True, self.suggest(name))
+        return TagCheck(tag, False, self.suggest(name))
+
+    def validate(self, tags: Iterable[str]) -> List[TagCheck]:
+        """Validate a list of search tags.
+
+        Args:
+            tags: Tags as typed in a search. Empty entries are ignored.
+
+        Returns:
+            One result per non-empty tag.
+        """
+        return [self.check(tag) for tag in tags if tag.strip()]
+
+    def correct(self, tag: str) -> str:
+        """Correct a tag to the closest known tag.
+
+        Args:
+            tag: Tag to correct.
+
+        Returns:
+            The canonical tag for known tags and aliases, the best suggestion
+            for misspellings, or the tag unchanged if nothing is close.
+        """
+        suggestions = self.suggest(tag, limit=1)
+        return suggestions[0].tag if suggestions else tag
+
+    def _variants(self, name: str) -> Set[str]:
+        """Generate delete variants of a name's indexed prefix."""
+        prefix = name[: self.prefix_length]
+        variants = {prefix}
+        frontier = {prefix}
+        for _ in range(self.max_distance):
+            next_frontier: Set[str] = set()
+            for word in frontier:
+                for i in range(len(word)):
+                    next_frontier.add(word[:i] + word[i + 1 :])
+            variants |= next_frontier
+            frontier = next_frontier
+        return variants
+
+    def _get_deletes(self) -> Dict[str, List[str]]:
+        """Build the delete index on first use."""
+        with self._lock:
+            if self._deletes is None:
+                deletes: Dict[str, List[str]] = {}
+                for name in self.post_counts:
+                    for variant in self._variants(name):
+                        deletes.setdefault(variant, []).append(name)
+                self._deletes = deletes
+            return self._deletes
+
+
+_vocabulary: Optional[TagVocabulary] = None
+_vocabulary_path: Optional[str] = None
+_vocabulary_lock = threading.Lock()
+
+
+def get_tag_vocabulary() -> Optional[TagVocabulary]:
+    """Get the process-wide tag vocabulary configured by ``tags.vocabulary_path``.
+
+    Returns:
+        The loaded vocabulary, or None if no dump is configured or it cannot be read.
+    """
+    global _vocabulary, _vocabulary_path
+    path = config.get("tags.vocabulary_path")
+    if not path:
+        return None
+    with _vocabulary_lock:
+        if _vocabulary is None or _vocabulary_path != path:
+            try:
+                _vocabulary = TagVocabulary.from_csv(path, config.get("tags.min_post_count", 0))
+                _vocabulary_path = path
+                logger.info(f"Loaded {len(_vocabulary)} tags from {path}")
+            except OSError as e:
+                logger.warning(f"Failed to load tag vocabulary {path}: {e}")
+                return None
+        return _vocabulary
+
+
+__all__ = [
+    "TagVocabulary",
+    "TagSuggestion",
+    "TagCheck",
+    "METATAGS",
+    "normalize_tag",
+    "edit_distance",
+    "get_tag_vocabulary",
+]
@@ -6,11 +6,13 @@ This module provides helper functions for common tasks across the application.
 import logging
 import os
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import List, Mapping, Optional, Union
 
 import numpy as np
 from PIL import Image
 
+from dataset_cat.core.tag_dictionary import get_local_dictionary
+
 
 def setup_logging(level: int = logging.INFO) -> logging.Logger:
     """Set up the logging configuration for the application.
@@ -154,17 +156,20 @@ def format_time_elapsed(seconds: float) -> str:
 def convert_tag_for_source(
     tag: Union[str, List[str]],
     source: str,
-    zh2en_dict: Optional[Dict[str, str]] = None,
+    zh2en_dict: Optional[Mapping[str, str]] = None,
 ) -> List[str]:
     """Convert input tag(s) to the appropriate search keywords for a given imageboard source.
 
     This function standardizes tags for different booru sources (e.g., danbooru, safebooru, e621).
-    It also supports basic Chinese-to-English tag translation (can be extended with a dictionary or API).
+    It also supports basic Chinese-to-English tag translation, using the local tag dictionary
+    when no dictionary is given and ``translator.local_dictionary`` is enabled.
 
     Args:
         tag: The input tag or list of tags (can be English or Chinese)
         source: The target source name (e.g., 'danbooru', 'safebooru', 'e621')
-        zh2en_dict: Optional dictionary for Chinese-to-English tag translation
+        zh2en_dict: Optional dictionary for Chinese-to-English tag translation, defaults to the
+            local tag dictionary from ``get_local_dictionary``; tags are left untranslated when
+            it is disabled or fails to load
 
     Returns:
         List of tags/keywords suitable for the target source
@@ -178,6 +183,9 @@ def convert_tag_for_source(
     else:
         tags = tag
 
+    if zh2en_dict is None:
+        zh2en_dict = get_local_dictionary()
+
     # Step 1: Translate Chinese tags to English if needed
     def zh2en(single_tag: str) -> str:
         # Simple dictionary-based translation; can be replaced with API or more advanced logic
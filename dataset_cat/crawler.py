@@ -1,16 +1,29 @@
 """Dataset crawler module for fetching images from various sources.
 
 This module provides a unified interface for crawling images from different
-anime image sources using the waifuc library.
+anime image sources using the waifuc library, with gallery-dl as a second
+backend for arbitrary gallery URLs.
 """
 
 import logging
 import os
-from typing import Optional, Tuple
+import shutil
+import tempfile
+import threading
+from urllib.parse import urlparse
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import requests
 
+from dataset_cat.core.config import config
+from dataset_cat.core.exporters import item_source
+from dataset_cat.core.file_items import FileItems, is_image_file
+from dataset_cat.core.http_client import DownloadResult, DownloadTask, download_files
+from dataset_cat.core.metrics import BYTES_DOWNLOADED, IMAGES_CRAWLED, IMAGES_DOWNLOADED
+from dataset_cat.core.prefetch import Prefetcher
+from dataset_cat.core.progress import ProgressTracker
 from dataset_cat.core.utils import ensure_directory, format_time_elapsed, setup_logging
+from dataset_cat.gallery_dl_backend import GALLERY_DL_SOURCE, GalleryDLBackend, parse_urls
 from waifuc.source import (
     AnimePicturesSource,
     DanbooruSource,
@@ -26,10 +39,10 @@ from waifuc.source import (
     Rule34Source,
     SafebooruSource,
     WallHavenSource,
+    WebDataSource,
     YandeSource,
     ZerochanSource,
 )
-from waifuc.utils.download import download_file
 
 # 数据源列表
 SOURCE_LIST = [
@@ -49,11 +62,200 @@ SOURCE_LIST = [
     "Duitang",
     "Pixiv",
     "Derpibooru",
+    GALLERY_DL_SOURCE,
 ]
 
 logger = logging.getLogger(__name__)
 
 
+def _file_size(item) -> int:
+    """Size of the file backing a crawled item's image, or 0 if it is not on disk."""
+    filename = getattr(getattr(item, "image", None), "filename", "")
+    return os.path.getsize(filename) if filename and os.path.exists(filename) else 0
+
+
+def _get_zerochan_select(size_param: Optional[str]) -> str:
+    """Map UI size options to Zerochan's valid select options"""
+    # Handle legacy mapping for backward compatibility
+    size_mapping = {
+        "Original": "full",
+        "Large": "large",
+        "Medium": "medium",
+        "Small": "medium",  # fallback to medium for small
+    }
+    # If already using correct values, return as-is
+    if size_param in ["full", "large", "medium"]:
+        return size_param
+    # Otherwise use mapping
+    return size_mapping.get(size_param, "large")  # default to 'large'
+
+
+def _create_source(source_name: str, tags: str, limit: int, size: Optional[str], strict: bool):
+    """Create the waifuc source for a name in SOURCE_LIST, other than gallery-dl."""
+    source_mapping = {
+        "Danbooru": lambda: DanbooruSource(tags=tags.split(","), min_size=limit),
+        "Zerochan": lambda: ZerochanSource(tags, select=_get_zerochan_select(size), strict=strict),
+        "Safebooru": lambda: SafebooruSource(tags=tags.split(","), min_size=limit),
+        "Gelbooru": lambda: GelbooruSource(tags=tags.split(","), min_size=limit),
+        "WallHaven": lambda: WallHavenSource(
+            query=tags, select=size if size in ["original", "thumbnail"] else "original"
+        ),
+        "Konachan": lambda: KonachanSource(tags=tags.split(","), min_size=limit),
+        "KonachanNet": lambda: KonachanNetSource(tags=tags.split(","), min_size=limit),
+        "Lolibooru": lambda: LolibooruSource(tags=tags.split(","), min_size=limit),
+        "Yande": lambda: YandeSource(tags=tags.split(","), min_size=limit),
+        "Rule34": lambda: Rule34Source(tags=tags.split(","), min_size=limit),
+        "HypnoHub": lambda: HypnoHubSource(tags=tags.split(","), min_size=limit),
+        "Paheal": lambda: PahealSource(tags=tags.split(",")),
+        "AnimePictures": lambda: AnimePicturesSource(tags=tags.split(",")),
+        "Duitang": lambda: DuitangSource(keyword=tags, strict=strict),
+        "Pixiv": lambda: PixivSearchSource(query=tags, select=size),
+        "Derpibooru": lambda: DerpibooruSource(tags=tags.split(","), select=size),
+    }
+    return source_mapping[source_name]()
+
+
+# Crawl failures by the first matching exception type, most specific first
+_CRAWL_ERRORS = (
+    (requests.exceptions.HTTPError, "HTTP error"),
+    (requests.exceptions.ConnectionError, "Connection error"),
+    (requests.exceptions.Timeout, "Timeout error"),
+    (requests.exceptions.RequestException, "Network error"),
+    (Exception, "Error"),
+)
+
+
+def _crawl_serially(
+    source,
+    source_name: str,
+    limit: int,
+    progress: Optional[ProgressTracker] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> list:
+    """Take up to ``limit`` items from a source's own iteration, which downloads them one by one."""
+    if progress is not None:
+        source = progress.track(source, "crawl", size_of=_file_size)
+    items = []
+    for item in source:
+        if cancelled is not None and cancelled():
+            break
+        items.append(item)
+        IMAGES_CRAWLED.inc(source=source_name)
+        if len(items) >= limit:
+            break
+    return items
+
+
+def _apply_site_url(source, source_name: str) -> None:
+    """Point a source at the API base URL configured in ``fetcher.site_urls``, e.g. a mirror or mock server."""
+    site_url = config.get("fetcher.site_urls", {}).get(source_name)
+    if not site_url:
+        return
+    if hasattr(source, "site_url"):
+        source.site_url = site_url.rstrip("/")
+        logger.info(f"Using {site_url} for {source_name}")
+    else:
+        logger.warning(f"{source_name} does not support a custom site URL, ignoring {site_url}")
+
+
+def _session_headers(source) -> dict:
+    """Headers and cookies of a waifuc source's requests session, e.g. a referer required by the site."""
+    session = getattr(source, "session", None)
+    if session is None:
+        return {}
+    headers = {key: value for key, value in session.headers.items() if key.lower() != "accept-encoding"}
+    cookies = "; ".join(f"{cookie.name}={cookie.value}" for cookie in session.cookies)
+    if cookies:
+        headers["Cookie"] = cookies
+    return headers
+
+
+def _expected_md5(url: str, meta: dict) -> Optional[str]:
+    """MD5 a booru reports for a post, when the URL is the original file named by that MD5.
+
+    Samples and previews are re-encoded and have a different hash, so they are not checked.
+    """
+    md5 = meta.get("md5") or item_source(meta)[1].get("md5")
+    if not isinstance(md5, str) or len(md5) != 32:
+        return None
+    stem = os.path.splitext(os.path.basename(urlparse(url).path))[0]
+    return md5 if stem.lower() == md5.lower() else None
+
+
+def _iter_listing(source) -> Optional[Iterator[Tuple[Any, str, Dict[str, Any]]]]:
+    """Post listing of a waifuc web source, without the serial image downloads of its iteration.
+
+    waifuc has no public listing API: ``WebDataSource`` subclasses produce
+    ``(id, url, meta)`` entries in ``_iter_data`` and download them one by one in
+    ``_iter``. This is the only place that hook is used; sources that do not
+    provide it return None and are crawled through the public iteration.
+    """
+    iter_data = getattr(source, "_iter_data", None) if isinstance(source, WebDataSource) else None
+    if not callable(iter_data):
+        return None
+
+    def entries() -> Iterator[Tuple[Any, str, Dict[str, Any]]]:
+        for entry in iter_data():
+            if not (isinstance(entry, tuple) and len(entry) == 3 and isinstance(entry[1], str)):
+                raise TypeError(f"Unexpected listing entry from {type(source).__name__}: {entry!r}")
+            yield entry
+
+    return entries()
+
+
+def _record_download(result: DownloadResult, source_name: str, progress: Optional[ProgressTracker] = None) -> None:
+    """Update download metrics and progress for a finished download."""
+    if not result.ok:
+        return
+    IMAGES_DOWNLOADED.inc(source=source_name)
+    BYTES_DOWNLOADED.inc(result.nbytes, source=source_name)
+    if progress is not None:
+        progress.record("download", result.seconds, result.nbytes)
+
+
+def _download_listing(
+    source,
+    listing: Iterator[Tuple[Any, str, Dict[str, Any]]],
+    source_name: str,
+    limit: int,
+    download_dir: str,
+    progress: Optional[ProgressTracker] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> List[DownloadResult]:
+    """Download listed posts until ``limit`` downloads succeed, the listing ends or the crawl is cancelled."""
+    if progress is not None:
+        listing = progress.track(listing, "crawl")
+    headers = _session_headers(source)
+    counts = {"issued": 0, "finished": 0, "ok": 0}
+    changed = threading.Condition()
+
+    def on_result(result: DownloadResult) -> None:
+        with changed:
+            counts["finished"] += 1
+            counts["ok"] += result.ok
+            changed.notify_all()
+        _record_download(result, source_name, progress)
+
+    def iter_tasks(entries):
+        # Runs on a worker thread, so waiting for downloads in flight does not block them
+        for _, url, meta in entries:
+            with changed:
+                # List another post only while the downloads in flight could still fall short
+                while counts["ok"] < limit <= counts["ok"] + counts["issued"] - counts["finished"]:
+                    changed.wait()
+                if counts["ok"] >= limit or (cancelled is not None and cancelled()):
+                    return
+                counts["issued"] += 1
+            filename = os.path.basename(meta.get("filename") or urlparse(url).path) or f"{counts['issued']}.jpg"
+            path = os.path.join(download_dir, filename)
+            yield DownloadTask(url, path, headers, meta, expected_md5=_expected_md5(url, meta))
+
+    # Listing pages are fetched ahead on a background thread while earlier images download
+    max_ahead = min(limit, config.get("fetcher.prefetch_items", 200))
+    with Prefetcher(listing, max_ahead, name=f"{source_name}-listing") as entries:
+        return download_files(iter_tasks(entries), on_result=on_result)
+
+
 class Crawler:
     @staticmethod
     def get_sources():
@@ -61,8 +263,34 @@ class Crawler:
 
     @staticmethod
     def start_crawl(
-        source_name: str, tags: str, limit: int, size: Optional[str], strict: bool
-    ) -> Tuple[Optional[list], str]:
+        source_name: str,
+        tags: str,
+        limit: int,
+        size: Optional[str],
+        strict: bool,
+        progress: Optional[ProgressTracker] = None,
+        download_dir: Optional[str] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[Optional[Union[FileItems, list]], str]:
+        """Crawl up to ``limit`` images from a source.
+
+        Args:
+            source_name: Name from SOURCE_LIST.
+            tags: Search tags, or gallery URLs for gallery-dl.
+            limit: Maximum number of images.
+            size: Image size option of the source.
+            strict: Strict tag matching, where the source supports it.
+            progress: Tracker for crawl and download progress.
+            download_dir: Directory for concurrent downloads. The caller owns it and must keep it
+                until the returned :class:`FileItems` are consumed, since they are read from
+                it lazily; by default a temporary directory is used and removed once the
+                images are loaded.
+            cancelled: Checked before each post is fetched; once it returns True the crawl stops
+                and returns what it has downloaded so far.
+
+        Returns:
+            Tuple of (crawled items or None on failure, status message).
+        """
         proxies = {}
         if os.getenv("HTTP_PROXY"):
             proxies["http"] = os.getenv("HTTP_PROXY")
@@ -72,84 +300,98 @@ class Crawler:
         session = requests.Session()
         session.proxies.update(proxies)
 
-        # Size mapping for different sources
-        def get_zerochan_select(size_param):
-            """Map UI size options to Zerochan's valid select options"""
-            # Handle legacy mapping for backward compatibility
-            size_mapping = {
-                "Original": "full",
-                "Large": "large",
-                "Medium": "medium",
-                "Small": "medium",  # fallback to medium for small
-            }
-            # If already using correct values, return as-is
-            if size_param in ["full", "large", "medium"]:
-                return size_param
-            # Otherwise use mapping
-            return size_mapping.get(size_param, "large")  # default to 'large'
-
-        source_mapping = {
-            "Danbooru": lambda: DanbooruSource(tags=tags.split(","), min_size=limit),
-            "Zerochan": lambda: ZerochanSource(tags, select=get_zerochan_select(size), strict=strict),
-            "Safebooru": lambda: SafebooruSource(tags=tags.split(","), min_size=limit),
-            "Gelbooru": lambda: GelbooruSource(tags=tags.split(","), min_size=limit),
-            "WallHaven": lambda: WallHavenSource(
-                query=tags, select=size if size in ["original", "thumbnail"] else "original"
-            ),
-            "Konachan": lambda: KonachanSource(tags=tags.split(","), min_size=limit),
-            "KonachanNet": lambda: KonachanNetSource(tags=tags.split(","), min_size=limit),
-            "Lolibooru": lambda: LolibooruSource(tags=tags.split(","), min_size=limit),
-            "Yande": lambda: YandeSource(tags=tags.split(","), min_size=limit),
-            "Rule34": lambda: Rule34Source(tags=tags.split(","), min_size=limit),
-            "HypnoHub": lambda: HypnoHubSource(tags=tags.split(","), min_size=limit),
-            "Paheal": lambda: PahealSource(tags=tags.split(",")),
-            "AnimePictures": lambda: AnimePicturesSource(tags=tags.split(",")),
-            "Duitang": lambda: DuitangSource(keyword=tags, strict=strict),
-            "Pixiv": lambda: PixivSearchSource(query=tags, select=size),
-            "Derpibooru": lambda: DerpibooruSource(tags=tags.split(","), select=size),
-        }
-
         if source_name not in SOURCE_LIST:
             return None, f"Unsupported source: {source_name}"
+        if source_name == GALLERY_DL_SOURCE:
+            return Crawler._start_gallery_dl(tags, limit, progress, cancelled)
 
         try:
-            source_generator = source_mapping[source_name]()
-            source = []
-            for item in source_generator:
-                source.append(item)
-                if len(source) >= limit:
-                    break
-            return source, "Crawl task initialized."
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error during crawling {source_name}: {e}", exc_info=True)
-            return None, f"HTTP error during crawling {source_name}: {e}"
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"Connection error during crawling {source_name}: {e}", exc_info=True)
-            return None, f"Connection error during crawling {source_name}: {e}"
-        except requests.exceptions.Timeout as e:
-            logger.error(f"Timeout error during crawling {source_name}: {e}", exc_info=True)
-            return None, f"Timeout error during crawling {source_name}: {e}"
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error during crawling {source_name}: {e}", exc_info=True)
-            return None, f"Network error during crawling {source_name}: {e}"
+            source_generator = _create_source(source_name, tags, limit, size, strict)
+            _apply_site_url(source_generator, source_name)
+            listing = _iter_listing(source_generator) if config.get("fetcher.async_downloads", True) else None
+            if listing is not None:
+                return Crawler._crawl_with_httpx(
+                    source_generator, listing, source_name, limit, progress, download_dir, cancelled
+                )
+            return _crawl_serially(source_generator, source_name, limit, progress, cancelled), "Crawl task initialized."
         except Exception as e:
-            logger.error(f"Error during crawling {source_name}: {e}", exc_info=True)
-            return None, f"Error during crawling {source_name}: {e}"
+            kind = next(kind for error, kind in _CRAWL_ERRORS if isinstance(e, error))
+            logger.error(f"{kind} during crawling {source_name}: {e}", exc_info=True)
+            return None, f"{kind} during crawling {source_name}: {e}"
+
+    @staticmethod
+    def _crawl_with_httpx(
+        source,
+        listing: Iterator[Tuple[Any, str, Dict[str, Any]]],
+        source_name: str,
+        limit: int,
+        progress: Optional[ProgressTracker] = None,
+        download_dir: Optional[str] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[Optional[Union[FileItems, list]], str]:
+        """Fetch the images of a source's post listing concurrently over HTTP/2.
+
+        waifuc web sources download every image serially while iterating; here only
+        the listing comes from the source and the images go through the shared
+        async client. Posts are taken from the listing until ``limit`` downloads
+        have succeeded, so failed downloads are replaced by later posts. Downloads
+        into a caller's ``download_dir`` are returned as :class:`FileItems` and
+        decoded only when an action or exporter needs their pixels.
+        """
+        owns_dir = download_dir is None
+        if download_dir is None:
+            download_dir = tempfile.mkdtemp(prefix=f"{source_name.lower()}-", dir=config.get_temp_dir())
+        os.makedirs(download_dir, exist_ok=True)
+        try:
+            results = _download_listing(source, listing, source_name, limit, download_dir, progress, cancelled)
+            items = FileItems()
+            for result in results:
+                if result.ok and is_image_file(result.task.path):
+                    download = {"bytes": result.nbytes, "md5": result.md5, "sha256": result.sha256}
+                    items.append(result.task.path, dict(result.task.meta, url=result.task.url, download=download))
+                    IMAGES_CRAWLED.inc(source=source_name)
+            failed = len(results) - len(items)
+            # The temporary directory is removed below, so its files are decoded now
+            crawled = items.load() if owns_dir else items
+        finally:
+            if owns_dir:
+                shutil.rmtree(download_dir, ignore_errors=True)
+        message = "Crawl task initialized."
+        if failed:
+            message += f" {failed} downloads failed."
+        return crawled, message
 
     @staticmethod
-    def download_images(source: list, output_dir: str) -> str:
+    def _start_gallery_dl(
+        urls: str,
+        limit: int,
+        progress: Optional[ProgressTracker] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[Optional[FileItems], str]:
+        """Fetch gallery URLs with the gallery-dl backend; the tags field carries the URLs."""
+        url_list = parse_urls(urls)
+        if not url_list:
+            return None, "gallery-dl needs one or more gallery URLs."
+        items, errors = GalleryDLBackend().fetch(url_list, limit, progress, cancelled)
+        if errors and not items:
+            return None, "; ".join(errors)
+        message = f"Downloaded {len(items)} new images with gallery-dl."
+        return items, "\n".join([message] + errors)
+
+    @staticmethod
+    def download_images(
+        source: list, output_dir: str, progress: Optional[ProgressTracker] = None, source_name: str = "unknown"
+    ) -> str:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        for item in source:
-            url = item[1]  # Assuming the second element is the URL
-            filename = os.path.join(output_dir, item[2]["filename"])  # Metadata contains the filename
-
-            try:
-                logger.info(f"Starting download: {url} -> {filename}")
-                download_file(url, filename, desc=f"Downloading {filename}")
-                logger.info(f"Successfully downloaded: {filename}")
-            except Exception as e:
-                logger.error(f"Failed to download {url}: {e}")
+        tasks = []
+        for _, url, meta in source:  # (id, url, meta) tuples; the metadata carries the file name
+            path = os.path.join(output_dir, meta["filename"])
+            tasks.append(DownloadTask(url, path, expected_md5=_expected_md5(url, meta)))
+        logger.info(f"Downloading {len(tasks)} images to {output_dir}")
+        for result in download_files(tasks, on_result=lambda result: _record_download(result, source_name, progress)):
+            if result.ok:
+                logger.info(f"Successfully downloaded: {result.task.path}")
 
         return f"Images downloaded to {output_dir}"
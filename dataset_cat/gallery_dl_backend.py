@@ -0,0 +1,254 @@
+"""gallery-dl backed fetching for URL and gallery downloads.
+
+This module drives gallery-dl's extractor and download job API in-process so
+any page gallery-dl supports (booru searches, artist galleries, direct image
+links, ...) can feed the same processing and export pipeline as the waifuc
+sources. Downloaded files are recorded in gallery-dl's download archive and
+skipped on later runs.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from gallery_dl import config as gallery_dl_config
+from gallery_dl import exception, extractor, job
+from PIL import Image
+
+from dataset_cat.core.config import config
+from dataset_cat.core.file_items import FileItems, is_image_file
+from dataset_cat.core.metrics import BYTES_DOWNLOADED, IMAGES_CRAWLED, IMAGES_DOWNLOADED
+from dataset_cat.core.progress import ProgressTracker
+
+# Source name used in the crawler's source list
+GALLERY_DL_SOURCE = "gallery-dl"
+
+logger = logging.getLogger(__name__)
+
+# gallery-dl keeps its configuration in module globals, so fetches run one at a time
+_lock = threading.Lock()
+
+
+def parse_urls(text: str) -> List[str]:
+    """Split user input into gallery URLs.
+
+    Args:
+        text: URLs separated by commas, spaces or newlines.
+
+    Returns:
+        The HTTP(S) URLs in input order.
+    """
+    return [part for part in re.split(r"[\s,]+", text or "") if part.startswith(("http://", "https://"))]
+
+
+def _tags(kwdict: Dict[str, Any]) -> Dict[str, float]:
+    """Convert gallery-dl tag fields into waifuc's tag-to-score mapping."""
+    tags = kwdict.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split()
+    elif isinstance(tags, dict):
+        tags = [tag for values in tags.values() for tag in (values if isinstance(values, list) else [values])]
+    return {str(tag): 1.0 for tag in tags}
+
+
+def _json_safe(kwdict: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop gallery-dl's private keys and stringify values JSON cannot represent."""
+    public = {key: value for key, value in kwdict.items() if not key.startswith("_")}
+    return json.loads(json.dumps(public, default=str))
+
+
+class _Collector:
+    """Gathers downloaded files from concurrently running jobs up to a limit.
+
+    Jobs reserve a slot before each download so no file beyond the limit is
+    downloaded, and thereby archived, without being returned. No slots are
+    handed out once ``cancelled`` returns True.
+    """
+
+    def __init__(
+        self, limit: int, progress: Optional[ProgressTracker], cancelled: Optional[Callable[[], bool]] = None
+    ) -> None:
+        self.limit = limit
+        self.progress = progress
+        self.cancelled = cancelled
+        self.items = FileItems()
+        self._reserved = 0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> bool:
+        if self.cancelled is not None and self.cancelled():
+            return False
+        with self._lock:
+            if self._reserved >= self.limit:
+                return False
+            self._reserved += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._reserved -= 1
+
+    def add(self, path: str, url: str, kwdict: Dict[str, Any], seconds: float) -> None:
+        """Collect a downloaded file, releasing its slot if it is not a readable image.
+
+        Only the path is kept; the image is read from it when the items are iterated.
+        """
+        if not is_image_file(path):
+            self.release()
+            return
+        nbytes = os.path.getsize(path)
+        meta = {
+            "gallery_dl": _json_safe(kwdict),
+            "filename": os.path.basename(path),
+            "url": url,
+            "tags": _tags(kwdict),
+        }
+        self.items.append(path, meta)
+        IMAGES_CRAWLED.inc(source=GALLERY_DL_SOURCE)
+        IMAGES_DOWNLOADED.inc(source=GALLERY_DL_SOURCE)
+        BYTES_DOWNLOADED.inc(nbytes, source=GALLERY_DL_SOURCE)
+        if self.progress is not None:
+            self.progress.record("download", seconds, nbytes)
+
+
+class _CollectingJob(job.DownloadJob):
+    """Download job that reports every newly downloaded file to a collector.
+
+    gallery-dl creates child jobs for nested galleries through
+    ``self.__class__(extractor, parent)``; children share the parent's collector.
+    """
+
+    def __init__(
+        self, url: Any, parent: Optional["_CollectingJob"] = None, collector: Optional[_Collector] = None
+    ) -> None:
+        super().__init__(url, parent)
+        self.collector = collector if collector is not None else parent.collector
+        self._skipped = False
+
+    def handle_url(self, url: str, kwdict: Dict[str, Any]) -> None:
+        # Galleries can contain videos and archives; skip them before they take a slot
+        extension = str(kwdict.get("extension") or "").lower()
+        if extension and f".{extension}" not in Image.registered_extensions():
+            logger.info(f"Skipping non-image file {url}")
+            return
+        if not self.collector.reserve():
+            raise exception.StopExtraction()
+        self._skipped = False
+        start = time.perf_counter()
+        try:
+            super().handle_url(url, kwdict)
+        except BaseException:
+            self.collector.release()
+            raise
+        path = self.pathfmt.path
+        if not self._skipped and path and os.path.isfile(path):
+            self.collector.add(path, url, kwdict, time.perf_counter() - start)
+        else:
+            self.collector.release()
+
+    def handle_skip(self) -> None:
+        self._skipped = True
+        super().handle_skip()
+
+
+class GalleryDLBackend:
+    """Fetch images for a list of gallery URLs with gallery-dl.
+
+    Each URL runs as its own gallery-dl download job; up to
+    ``fetcher.max_parallel_downloads`` jobs run concurrently. Retries, timeouts
+    and request spacing follow the other ``fetcher.*`` settings. A user's own
+    gallery-dl configuration file, e.g. with cookies, is loaded first.
+    """
+
+    def __init__(
+        self,
+        download_dir: Optional[str] = None,
+        archive_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            download_dir: Base directory for downloads, defaults to ``fetcher.gallery_dl.download_dir``
+                or ``<temp_dir>/gallery-dl``.
+            archive_path: SQLite download archive, defaults to ``fetcher.gallery_dl.archive``
+                or ``<cache_dir>/gallery-dl-archive.sqlite3``; an empty string disables the archive.
+            max_workers: Concurrent jobs, defaults to ``fetcher.max_parallel_downloads``.
+        """
+        self.download_dir = download_dir or config.get("fetcher.gallery_dl.download_dir") or str(
+            Path(config.get_temp_dir()) / "gallery-dl"
+        )
+        if archive_path is None:
+            archive_path = config.get("fetcher.gallery_dl.archive") or str(
+                Path(config.get_cache_dir()) / "gallery-dl-archive.sqlite3"
+            )
+        self.archive_path = archive_path
+        self.max_workers = max(1, max_workers or config.get("fetcher.max_parallel_downloads", 5))
+
+    def _configure(self) -> None:
+        gallery_dl_config.clear()
+        gallery_dl_config.load()
+        settings = {
+            "base-directory": self.download_dir,
+            "retries": config.get("fetcher.retry_count", 3),
+            "timeout": config.get("fetcher.timeout", 30),
+            "sleep-request": config.get("fetcher.wait_time", 0.5),
+        }
+        if self.archive_path:
+            settings["archive"] = self.archive_path
+        for key, value in settings.items():
+            gallery_dl_config.set(("extractor",), key, value)
+        gallery_dl_config.set(("downloader",), "retries", config.get("fetcher.retry_count", 3))
+        gallery_dl_config.set(("downloader",), "timeout", config.get("fetcher.timeout", 30))
+        gallery_dl_config.set(("output",), "mode", "null")
+        # Extractor classes are discovered by a lazy generator that is not thread-safe; load them all up front
+        extractor.extractors()
+
+    def _run(self, url: str, collector: _Collector) -> Optional[str]:
+        try:
+            status = _CollectingJob(url, collector=collector).run()
+        except exception.NoExtractorError:
+            return f"No gallery-dl extractor for {url}"
+        except Exception as e:
+            logger.error(f"gallery-dl failed on {url}: {e}", exc_info=True)
+            return f"gallery-dl failed on {url}: {e}"
+        if status:
+            logger.warning(f"gallery-dl finished {url} with status {status}")
+        return None
+
+    def fetch(
+        self,
+        urls: List[str],
+        limit: int,
+        progress: Optional[ProgressTracker] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[FileItems, List[str]]:
+        """Download up to ``limit`` new images from the given URLs.
+
+        Args:
+            urls: Gallery, search or direct image URLs.
+            limit: Maximum number of images across all URLs.
+            progress: Optional tracker receiving per-file download timings.
+            cancelled: Checked before each download; once it returns True no more files are fetched.
+
+        Returns:
+            Tuple of (downloaded items, error messages per failed URL). Items are read
+            lazily from the download directory, so its files must stay in place until
+            they are consumed. Files already in the download archive are skipped and
+            not returned.
+        """
+        collector = _Collector(limit, progress, cancelled)
+        with _lock:
+            self._configure()
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls) or 1)) as executor:
+                results = list(executor.map(lambda url: self._run(url, collector), urls))
+        return collector.items, [error for error in results if error]
+
+
+__all__ = ["GALLERY_DL_SOURCE", "GalleryDLBackend", "parse_urls"]
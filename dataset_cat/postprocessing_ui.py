@@ -3,23 +3,30 @@ import io
 import os
 import shutil
 import tempfile
+import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import gradio as gr
 from PIL import Image
 
-from waifuc.action import (
+from waifuc.action import FilterAction, MinSizeFilterAction, ProcessAction
+from waifuc.export import SaveExporter
+from waifuc.model import ImageItem
+from dataset_cat.core.actions import (
     AlignMaxSizeAction,
     AlignMinSizeAction,
-    FilterAction,
-    MinSizeFilterAction,
+    AspectRatioBucketAction,
+    CropToDivisibleAction,
+    FileSizeFilterAction,
+    ImageCompressionAction,
     ModeConvertAction,
-    ProcessAction,
 )
-from waifuc.export import SaveExporter
-from waifuc.model import ImageItem
-from dataset_cat.core.actions import CropToDivisibleAction, FileSizeFilterAction, ImageCompressionAction
+from dataset_cat.core.derivatives import VariantSpec, generate_derivatives, parse_variants
+from dataset_cat.core.packed_store import PackedImageStore, PackedStoreWriter
+from dataset_cat.core.profiling import SUMMARY_COLUMNS, RunProfiler
+from dataset_cat.core.progress import ProgressTracker
 
 
 def _discover_image_files(input_directory: str) -> List[Path]:
@@ -64,11 +71,16 @@ def _build_processing_pipeline(
         "resize_max": lambda: AlignMaxSizeAction(params.get("max_size")) if params.get("max_size") else None,
         "mode_convert": lambda: ModeConvertAction(params.get("mode")) if params.get("mode") else None,
         "compress_image": lambda: ImageCompressionAction(params.get("quality")) if params.get("quality") else None,
-        "crop_to_divisible": lambda: CropToDivisibleAction(int(params.get("divisible_by"))) if params.get("divisible_by") else None,
+        "crop_to_divisible": lambda: CropToDivisibleAction(
+            int(params.get("divisible_by")), smart_crop=params.get("smart_crop")
+        ) if params.get("divisible_by") else None,
         "filter_filesize": lambda: FileSizeFilterAction(
             int(params.get("min_filesize") or 0),
             int(params.get("max_filesize") or 0)
         ) if params.get("min_filesize") is not None or params.get("max_filesize") is not None else None,
+        "aspect_bucket": lambda: AspectRatioBucketAction(
+            int(params.get("bucket_resolution")), smart_crop=params.get("smart_crop")
+        ) if params.get("bucket_resolution") else None,
     }
     
     for label in selected_actions:
@@ -81,63 +93,280 @@ def _build_processing_pipeline(
     return pipeline
 
 
-def _apply_action_to_image(action: Any, img: Image.Image) -> Optional[Image.Image]:
+def _apply_action(action: Any, item: ImageItem) -> Optional[ImageItem]:
     """
-    Apply a single action to an image.
+    Apply a single action to an image item.
     
     Args:
         action: The action to apply.
-        img: The PIL Image to process.
+        item: The image item to process; its metadata carries the file name and
+            the ``save_cfg`` set by compression actions.
         
     Returns:
-        Processed image or None if filtered out.
+        Processed image item or None if filtered out.
+    """
+    if isinstance(action, ProcessAction):
+        return action.process(item)
+    elif isinstance(action, FilterAction):
+        return item if action.check(item) else None
+    img = action.apply(item.image) if hasattr(action, "apply") else action(item.image)
+    return ImageItem(img, item.meta) if img is not None else None
+
+
+def _output_name(path: Union[Path, str], store: Optional[PackedImageStore] = None) -> str:
+    """File name an input image is saved under, also used as its key in bucket manifests."""
+    if store is not None:
+        return f"{path}.{store.format(str(path))}"
+    return Path(path).name
+
+
+def _read_image_sizes(files: List[Any], store: Optional[PackedImageStore] = None) -> Tuple[List[int], List[int]]:
+    """
+    Read image dimensions from file headers without decoding pixel data.
+
+    Args:
+        files: Image paths, or keys of ``store``.
+        store: Packed store to read from instead of the file system.
+
+    Returns:
+        Tuple of (widths, heights) in the order of ``files``.
     """
-    if isinstance(action, CropToDivisibleAction):
-        img_item = ImageItem(img)
-        result_item = action(img_item)
-        return result_item.image if result_item is not None else None
-    elif hasattr(action, "apply"):
-        return action.apply(img)
+    widths, heights = [], []
+    for path in files:
+        with Image.open(io.BytesIO(store.get(str(path))) if store is not None else path) as img:
+            widths.append(img.width)
+            heights.append(img.height)
+    return widths, heights
+
+
+def _save_image(
+    img: Image.Image,
+    name: str,
+    output_directory: Union[Path, str],
+    writer: Optional[PackedStoreWriter] = None,
+    save_params: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Save an image as a file or into a packed store.
+
+    Args:
+        img: Image to save.
+        name: File name; its extension selects the format unless ``save_params`` sets one.
+        output_directory: Directory receiving the file.
+        writer: Packed store writer receiving the image instead of a file.
+        save_params: Extra ``Image.save`` arguments, including ``format``.
+
+    Returns:
+        Number of bytes written.
+    """
+    save_params = dict(save_params or {})
+    if writer is not None:
+        stem, extension = os.path.splitext(name)
+        image_format = save_params.pop("format", None) or Image.registered_extensions().get(extension.lower(), "PNG")
+        return writer.add_image(stem, img, image_format, **save_params)
+    save_path = Path(output_directory) / name
+    img.save(save_path, **save_params)
+    return save_path.stat().st_size
+
+
+def _decode_image(
+    path: Union[Path, str], store: Optional[PackedImageStore] = None, progress: Optional[ProgressTracker] = None
+) -> Image.Image:
+    """Open and fully decode an input image, from the file system or a packed store."""
+    start = time.perf_counter()
+    if store is not None:
+        img = store.open_image(str(path))
     else:
-        return action(img)
+        img = Image.open(path)
+        img.load()
+    if progress is not None:
+        nbytes = store.size(str(path)) if store is not None else Path(path).stat().st_size
+        progress.record("decode", time.perf_counter() - start, nbytes)
+    return img
+
+
+def _run_pipeline(
+    item: ImageItem, pipeline: List[Any], path: Union[Path, str], progress: Optional[ProgressTracker] = None
+) -> Optional[ImageItem]:
+    """Apply each action in turn; None if an action filtered the image out or failed."""
+    for action in pipeline:
+        start = time.perf_counter()
+        try:
+            item = _apply_action(action, item)
+        except Exception as e:
+            print(f"Action {action} failed on {path}: {e}")
+            return None
+        if progress is not None:
+            progress.record(f"action:{type(action).__name__}", time.perf_counter() - start)
+
+        if item is None:
+            if progress is not None:
+                progress.count(f"filtered:{type(action).__name__}")
+            return None
+    return item
+
+
+def _save_variants(
+    img: Image.Image,
+    name: str,
+    output_directory: str,
+    variants: List[VariantSpec],
+    variant_writers: Optional[Dict[str, PackedStoreWriter]] = None,
+    save_cfg: Optional[Dict[str, Any]] = None,
+    progress: Optional[ProgressTracker] = None,
+) -> None:
+    """Derive every variant from a processed image and save each into its own subdirectory or store."""
+    start = time.perf_counter()
+    for variant, derivative in generate_derivatives(img, variants):
+        if progress is not None:
+            progress.record(f"variant:{variant.name}", time.perf_counter() - start)
+        start = time.perf_counter()
+        derivative, save_params = variant.save_params(derivative)
+        if not save_params and save_cfg:
+            save_params = save_cfg
+        variant_writer = variant_writers.get(variant.name) if variant_writers else None
+        variant_directory = Path(output_directory) / variant.name
+        nbytes = _save_image(derivative, variant.output_name(name), variant_directory, variant_writer, save_params)
+        if progress is not None:
+            progress.record("save", time.perf_counter() - start, nbytes)
+        start = time.perf_counter()
 
 
 def _process_single_image(
-    path: Path,
+    path: Union[Path, str],
     pipeline: List[Any],
-    output_directory: str
-) -> bool:
+    output_directory: str,
+    progress: Optional[ProgressTracker] = None,
+    store: Optional[PackedImageStore] = None,
+    writer: Optional[PackedStoreWriter] = None,
+    variants: Optional[List[VariantSpec]] = None,
+    variant_writers: Optional[Dict[str, PackedStoreWriter]] = None,
+) -> Optional[str]:
     """
     Process a single image through the pipeline.
     
     Args:
-        path: Path to the image file.
+        path: Path to the image file, or its key when reading from ``store``.
         pipeline: List of actions to apply.
         output_directory: Directory to save processed image.
+        progress: Optional tracker receiving decode, per-action and save timings.
+        store: Packed store to read the image from instead of the file system.
+        writer: Packed store writer receiving the result instead of an image file.
+        variants: Sizes to derive from the result instead of saving it, each into
+            its own subdirectory of ``output_directory``.
+        variant_writers: Packed store writers by variant name, for packed output.
         
     Returns:
-        True if processing succeeded, False otherwise.
+        File name the result was saved under, which a compression action may have
+        given another extension, or None if the image was filtered out or failed.
     """
     try:
-        img = Image.open(path)
-        
-        for action in pipeline:
-            try:
-                img = _apply_action_to_image(action, img)
-            except Exception as e:
-                print(f"Action {action} failed on {path}: {e}")
-                return False
-            
-            if img is None:
-                return False
-        
-        save_name = Path(path).name
-        img.save(Path(output_directory) / save_name)
-        return True
+        name = _output_name(path, store)
+        img = _decode_image(path, store, progress)
+        item = _run_pipeline(ImageItem(img, {"filename": name}), pipeline, path, progress)
+        if item is None:
+            return None
+
+        img = item.image
+        name = item.meta.get("filename", name)
+        save_cfg = item.meta.get("save_cfg")
+        if variants:
+            _save_variants(img, name, output_directory, variants, variant_writers, save_cfg, progress)
+            return name
+        start = time.perf_counter()
+        nbytes = _save_image(img, name, output_directory, writer, save_cfg)
+        if progress is not None:
+            progress.record("save", time.perf_counter() - start, nbytes)
+        return name
         
     except Exception as e:
         print(f"Failed to process {path}: {e}")
-        return False
+        return None
+
+
+def _open_writers(
+    output_directory: str, pack_output: bool, variants: Optional[List[VariantSpec]] = None
+) -> Tuple[Optional[PackedStoreWriter], Dict[str, PackedStoreWriter]]:
+    """Create the output directories and, for packed output, the store writers receiving the results.
+
+    Returns:
+        Tuple of (writer for the main output or None, writers by variant name).
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    variant_writers: Dict[str, PackedStoreWriter] = {}
+    for variant in variants or []:
+        os.makedirs(Path(output_directory) / variant.name, exist_ok=True)
+        if pack_output:
+            variant_writers[variant.name] = PackedStoreWriter(Path(output_directory) / variant.name)
+    writer = PackedStoreWriter(output_directory) if pack_output and not variants else None
+    return writer, variant_writers
+
+
+def _process_directory(
+    input_directory: str,
+    output_directory: str,
+    pipeline: List[Any],
+    progress: ProgressTracker,
+    pack_output: bool = False,
+    variants: Optional[List[VariantSpec]] = None,
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Process every image in a directory through the pipeline.
+
+    A packed store in the input directory is read in place of image files.
+    Bucketing actions are fitted to the dimensions of all input images first
+    and write their bucket manifests to the output directory at the end.
+    With variants, each image is decoded and processed once and every variant
+    is derived from the result into ``<output_directory>/<variant name>``.
+
+    Args:
+        input_directory: Path to source images.
+        output_directory: Path to save processed images.
+        pipeline: List of actions to apply.
+        progress: Tracker receiving the image count and per-stage timings.
+        pack_output: Whether to write results into a packed store instead of image files.
+        variants: Sizes and formats to derive from every processed image.
+
+    Yields:
+        Tuples of (images handled, total images, images processed successfully) after each image.
+
+    Raises:
+        ValueError: If packed output would replace the packed store being read.
+    """
+    packed_input = PackedImageStore.exists(input_directory)
+    same_directory = Path(input_directory).resolve() == Path(output_directory).resolve()
+    if packed_input and pack_output and not variants and same_directory:
+        raise ValueError(f"Packed output would replace the packed store it reads: {input_directory}")
+    writer, variant_writers = _open_writers(output_directory, pack_output, variants)
+    store = PackedImageStore(input_directory) if packed_input else None
+    files: List[Any] = store.keys() if store is not None else _discover_image_files(input_directory)
+    progress.total = len(files)
+    bucketing = [action for action in pipeline if isinstance(action, AspectRatioBucketAction)]
+    if bucketing:
+        with progress.time("bucketing", items=len(files)):
+            widths, heights = _read_image_sizes(files, store)
+            assignments = [
+                action.fit([_output_name(path, store) for path in files], widths, heights) for action in bucketing
+            ]
+    # Input name to the name each processed image was saved under
+    saved: Dict[str, str] = {}
+    try:
+        for index, path in enumerate(files, 1):
+            saved_name = _process_single_image(
+                path, pipeline, output_directory, progress, store, writer, variants, variant_writers
+            )
+            if saved_name is not None:
+                saved[_output_name(path, store)] = saved_name
+            yield index, len(files), len(saved)
+        if bucketing:
+            assignments[-1].write_manifests(output_directory, saved)
+    finally:
+        if writer is not None:
+            writer.close()
+        for variant_writer in variant_writers.values():
+            variant_writer.close()
+        if store is not None:
+            store.close()
 
 
 def _create_action_parameter_panels(
@@ -192,6 +421,14 @@ def _create_action_parameter_panels(
         components["max_filesize"] = max_filesize
         components["filesize_filter_params"] = filesize_filter_params
         param_groups["filter_filesize"] = filesize_filter_params
+
+    with gr.Column(visible=False) as aspect_bucket_params:
+        bucket_resolution = gr.Number(
+            value=1024, label=locale_getter("bucket_resolution_label", "分桶分辨率（像素）")
+        )
+        components["bucket_resolution"] = bucket_resolution
+        components["aspect_bucket_params"] = aspect_bucket_params
+        param_groups["aspect_bucket"] = aspect_bucket_params
     
     return param_groups
 
@@ -224,6 +461,55 @@ def _create_visibility_updater(
     return update_visibility, list(label_to_group.values())
 
 
+def _list_input_images(input_directory: str) -> List[Any]:
+    """Images of an input directory: the keys of its packed store, or its image files."""
+    if not os.path.exists(input_directory):
+        return []
+    if PackedImageStore.exists(input_directory):
+        with PackedImageStore(input_directory) as store:
+            return store.keys()
+    return _discover_image_files(input_directory)
+
+
+def _stream_progress(
+    results: Iterator[Tuple[int, int, int]], progress: ProgressTracker, locale: Dict[str, Any]
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Drive a directory run, streaming progress at most a few times per second.
+
+    Args:
+        results: Progress tuples of :func:`_process_directory`.
+        progress: Tracker of the run; a :class:`RunProfiler` also writes its report.
+        locale: Localized UI texts.
+
+    Yields:
+        Tuples of (progress summary, stage table update), ending with the final
+        message with the processed image count.
+    """
+    processed_count = 0
+    last_update = 0.0
+    with progress if isinstance(progress, RunProfiler) else nullcontext():
+        try:
+            for index, total, processed_count in results:
+                if time.perf_counter() - last_update >= 0.5:
+                    last_update = time.perf_counter()
+                    yield f"{index}/{total}\n{progress.format(locale)}", gr.update()
+        except ValueError as e:
+            yield locale.get("processing_failed", "处理失败：{error}").format(error=e), gr.update()
+            return
+
+    # Final summary message
+    completed = locale.get("processing_completed", "处理完成。{count} 张图片处理完毕。")
+    completed = completed.format(count=processed_count)
+    summary = f"{completed}\n{progress.format(locale)}"
+    if not isinstance(progress, RunProfiler):
+        yield summary, gr.update()
+        return
+    report_path = progress.write_report()
+    saved = locale.get("profile_report_saved", "性能分析报告：{path}").format(path=report_path)
+    yield f"{summary}\n{saved}", gr.update(value=progress.summary_rows())
+
+
 def create_postprocessing_tab_content(locale: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     创建数据后处理标签页内容，支持国际化。
@@ -252,6 +538,7 @@ def create_postprocessing_tab_content(locale: Optional[Dict[str, Any]] = None) -
         "compress_image": _get_actions_localized("compress_image", "压缩图片"),
         "crop_to_divisible": _get_actions_localized("crop_to_divisible", "裁剪为可整除尺寸"),
         "filter_filesize": _get_actions_localized("filter_filesize", "按文件大小筛选"),
+        "aspect_bucket": _get_actions_localized("aspect_bucket", "宽高比分桶"),
     }
 
     with gr.Column():
@@ -285,10 +572,32 @@ def create_postprocessing_tab_content(locale: Optional[Dict[str, Any]] = None) -
         )
         actions.change(update_visibility, inputs=[actions], outputs=param_group_outputs)
 
+        profile_checkbox = gr.Checkbox(label=_get_localized("profile_run_label", "生成性能分析报告"), value=False)
+        profile_table = gr.Dataframe(
+            headers=SUMMARY_COLUMNS,
+            label=_get_localized("profile_table_label", "阶段耗时"),
+            interactive=False,
+        )
+        components["profile_checkbox"] = profile_checkbox
+        components["profile_table"] = profile_table
+
+        pack_output_checkbox = gr.Checkbox(
+            label=_get_localized("pack_output_label", "打包输出为内存映射图片库"), value=False
+        )
+        components["pack_output_checkbox"] = pack_output_checkbox
+
+        smart_crop_checkbox = gr.Checkbox(
+            label=_get_localized("smart_crop_label", "智能裁剪（按显著区域和人脸定位）"), value=False
+        )
+        components["smart_crop_checkbox"] = smart_crop_checkbox
+
+        variants_input = gr.Textbox(
+            label=_get_localized("variants_label", "尺寸变体（如 512, 768:webp, 1024，留空则只输出一份）"), value=""
+        )
+        components["variants_input"] = variants_input
+
         def preview_images(input_directory: str) -> str:
-            if not os.path.exists(input_directory):
-                return _get_localized("no_images_found", "在目录中未找到图片")
-            files = _discover_image_files(input_directory)
+            files = _list_input_images(input_directory)
             if not files:
                 return _get_localized("no_images_found", "在目录中未找到图片")
             return _get_localized("preview_result", "预览：在目录中找到 {count} 张图片").format(count=len(files))
@@ -304,11 +613,18 @@ def create_postprocessing_tab_content(locale: Optional[Dict[str, Any]] = None) -
             divisible_by_val: Optional[int] = None,
             min_filesize_val: Optional[int] = None,
             max_filesize_val: Optional[int] = None,
+            bucket_resolution_val: Optional[int] = None,
+            profile_val: bool = False,
+            pack_output_val: bool = False,
+            smart_crop_val: bool = False,
+            variants_val: str = "",
             *args, **kwargs
-        ) -> str:
+        ) -> Iterator[Tuple[str, Any]]:
             """
             Process images in the input directory, applying selected actions and saving to output directory.
 
+            Progress with per-stage throughput is streamed to the UI while images are processed.
+
             Args:
                 input_directory: Path to source images.
                 output_directory: Path to save processed images.
@@ -320,17 +636,18 @@ def create_postprocessing_tab_content(locale: Optional[Dict[str, Any]] = None) -
                 divisible_by_val: Value to crop dimensions by.
                 min_filesize_val: Minimum file size in KB.
                 max_filesize_val: Maximum file size in KB.
-
-            Returns:
-                Summary message of processed image count.
+                bucket_resolution_val: Side of the square bucket for aspect-ratio bucketing.
+                profile_val: Whether to write a profiling report and fill the stage timing table.
+                pack_output_val: Whether to write results into a packed store instead of image files.
+                    A packed store in the input directory is read in place of image files.
+                smart_crop_val: Whether crops follow salient content and faces instead of the center.
+                variants_val: Size variants such as "512, 768:webp", each derived from a single decode
+                    into its own subdirectory of the output directory.
+
+            Yields:
+                Tuples of (progress summary, stage table update), ending with the final
+                message with the processed image count.
             """
-            # Ensure output directory exists
-            os.makedirs(output_directory, exist_ok=True)
-            
-            # Find all image files
-            files = _discover_image_files(input_directory)
-            print("Found files:", files)
-            
             # Build parameters dictionary
             params = {
                 "min_size": min_size_val,
@@ -340,19 +657,23 @@ def create_postprocessing_tab_content(locale: Optional[Dict[str, Any]] = None) -
                 "divisible_by": divisible_by_val,
                 "min_filesize": min_filesize_val,
                 "max_filesize": max_filesize_val,
+                "bucket_resolution": bucket_resolution_val,
+                "smart_crop": smart_crop_val,
             }
             
             # Build processing pipeline
             pipeline = _build_processing_pipeline(selected_actions, actions_mapping, params)
+            try:
+                variants = parse_variants(variants_val)
+            except ValueError as e:
+                yield _get_localized("processing_failed", "处理失败：{error}").format(error=e), gr.update()
+                return
             
-            # Process each file
-            processed_count = sum(
-                1 for path in files
-                if _process_single_image(path, pipeline, output_directory)
+            progress: ProgressTracker = RunProfiler.from_config("postprocess") if profile_val else ProgressTracker()
+            results = _process_directory(
+                input_directory, output_directory, pipeline, progress, pack_output_val, variants
             )
-
-            # Return summary message
-            return _get_localized("processing_completed", "处理完成。{count} 张图片处理完毕。").format(count=processed_count)
+            yield from _stream_progress(results, progress, locale)
     preview_btn.click(
         preview_images,
         inputs=[input_dir],
@@ -372,8 +693,13 @@ def create_postprocessing_tab_content(locale: Optional[Dict[str, Any]] = None) -
             components["divisible_by"],
             components["min_filesize"],
             components["max_filesize"],
+            components["bucket_resolution"],
+            profile_checkbox,
+            pack_output_checkbox,
+            smart_crop_checkbox,
+            variants_input,
         ],
-        outputs=result,
+        outputs=[result, profile_table],
     )
     return components
 
@@ -417,6 +743,7 @@ def update_postprocessing_ui_language(components: Dict[str, Any], locale_data: D
         action_list.get("compress_image", "压缩图片"),
         action_list.get("crop_to_divisible", "裁剪为可整除尺寸"),
         action_list.get("filter_filesize", "按文件大小筛选"),
+        action_list.get("aspect_bucket", "宽高比分桶"),
     ]
     updates.append(gr.update(choices=action_choices, label=_loc("actions_post_label", "后处理操作")))
     # 7. min_size
@@ -445,5 +772,19 @@ def update_postprocessing_ui_language(components: Dict[str, Any], locale_data: D
     updates.append(gr.update(label=_loc("max_filesize_label", "最大文件大小（KB）")))
     # 19. filesize_filter_params - no update needed for Column visibility
     updates.append(gr.update())
+    # 20. bucket_resolution
+    updates.append(gr.update(label=_loc("bucket_resolution_label", "分桶分辨率（像素）")))
+    # 21. aspect_bucket_params - no update needed for Column visibility
+    updates.append(gr.update())
+    # 22. profile_checkbox
+    updates.append(gr.update(label=_loc("profile_run_label", "生成性能分析报告")))
+    # 23. profile_table
+    updates.append(gr.update(label=_loc("profile_table_label", "阶段耗时")))
+    # 24. pack_output_checkbox
+    updates.append(gr.update(label=_loc("pack_output_label", "打包输出为内存映射图片库")))
+    # 25. smart_crop_checkbox
+    updates.append(gr.update(label=_loc("smart_crop_label", "智能裁剪（按显著区域和人脸定位）")))
+    # 26. variants_input
+    updates.append(gr.update(label=_loc("variants_label", "尺寸变体（如 512, 768:webp, 1024，留空则只输出一份）")))
     
     return updates
@@ -0,0 +1,340 @@
+"""Headless REST service for Dataset Cat.
+
+This module exposes crawl jobs, post-processing jobs and batch tag translation
+as a FastAPI application, so other services can drive Dataset Cat over HTTP
+without the Gradio UI. Jobs run on the shared job manager with the same kinds,
+parameters and resource budget as jobs queued from the web UI; translation
+requests are awaited on the translator's event loop without holding a worker
+thread.
+
+Routes:
+    GET    /health                 -> liveness check
+    GET    /sources                -> crawl sources and translator formatting rules
+    POST   /jobs/crawl             -> queue a crawl, process and export job
+    POST   /jobs/process           -> queue a post-processing job over a directory
+    GET    /jobs                   -> most recent jobs
+    GET    /jobs/{job_id}          -> job state and progress
+    GET    /jobs/{job_id}/events   -> job state streamed as server-sent events until it finishes
+    DELETE /jobs/{job_id}          -> cancel a job
+    POST   /translate              -> translate and format a batch of descriptions
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from dataset_cat import __version__
+from dataset_cat.core.config import config
+from dataset_cat.core.derivatives import parse_variants
+from dataset_cat.core.jobs import FINISHED_STATES, QUEUED, Job, JobContext, JobManager, get_job_manager
+from dataset_cat.postprocessing_ui import _build_processing_pipeline, _process_directory
+from dataset_cat.tag_translator_api import TagTranslatorAPI, get_translator_api
+from dataset_cat.webui import (
+    DEFAULT_SIZE_MAP,
+    MAX_CRAWL_LIMIT,
+    SOURCE_LIST,
+    _create_crawl_job,
+    check_tags,
+    load_locales,
+)
+
+logger = logging.getLogger(__name__)
+
+ProcessActionName = Literal[
+    "resize_min",
+    "resize_max",
+    "mode_convert",
+    "compress_image",
+    "crop_to_divisible",
+    "filter_filesize",
+    "aspect_bucket",
+]
+
+
+class CrawlRequest(BaseModel):
+    """Parameters of a crawl job, mirroring the web UI's crawl tab."""
+
+    source_name: str
+    tags: str = ""
+    limit: int = Field(10, ge=1, le=MAX_CRAWL_LIMIT)
+    size: Optional[str] = None
+    strict: bool = False
+    actions: List[Literal["NoMonochrome", "FilterSimilar"]] = []
+    output_dir: str = "./output"
+    save_meta: bool = False
+    save_author: bool = True
+    exporter_type: str = "SaveExporter"
+    hf_repo: str = ""
+    hf_token: Optional[str] = None
+    lang: str = "en"
+
+
+class ProcessRequest(BaseModel):
+    """Parameters of a post-processing job, mirroring the post-processing tab."""
+
+    input_dir: str
+    output_dir: str
+    actions: List[ProcessActionName]
+    min_size: Optional[int] = None
+    max_size: Optional[int] = None
+    mode: Optional[str] = None
+    quality: Optional[int] = None
+    divisible_by: Optional[int] = None
+    min_filesize: Optional[int] = None
+    max_filesize: Optional[int] = None
+    bucket_resolution: Optional[int] = None
+    smart_crop: bool = False
+    variants: List[str] = []
+    pack_output: bool = False
+
+
+class TranslateRequest(BaseModel):
+    """A batch of Chinese descriptions to translate into tags for one source."""
+
+    descriptions: List[str] = Field(..., min_length=1)
+    source_type: str
+    method: Literal["googletrans", "jikan"] = "googletrans"
+
+
+def run_process_job(params: Dict[str, Any], context: JobContext) -> str:
+    """Run a post-processing job.
+
+    Args:
+        params: Fields of a :class:`ProcessRequest`.
+        context: Job context receiving progress and checked for cancellation.
+
+    Returns:
+        Result message with the processed image count.
+    """
+    actions = params["actions"]
+    pipeline = _build_processing_pipeline(actions, {action: action for action in actions}, params)
+    variants = parse_variants(params.get("variants"))
+    processed_count = total = 0
+    last_update = 0.0
+    results = _process_directory(
+        params["input_dir"],
+        params["output_dir"],
+        pipeline,
+        context.progress,
+        params.get("pack_output", False),
+        variants,
+    )
+    with closing(results):
+        for index, total, processed_count in results:
+            if context.cancelled:
+                break
+            if time.perf_counter() - last_update >= 1.0:
+                last_update = time.perf_counter()
+                context.set_message(f"Processing {index}/{total}...")
+    return f"Processed {processed_count} of {total} images."
+
+
+def register_job_handlers(manager: JobManager) -> None:
+    """Register the crawl and post-processing job kinds served by the REST API.
+
+    Args:
+        manager: Job manager to register the handlers with.
+    """
+    manager.register("crawl", _create_crawl_job(load_locales()), cost={"network": 1, "cpu": 1})
+    manager.register("process", run_process_job, cost={"cpu": 1})
+
+
+def _job_view(manager: JobManager, job: Job) -> Dict[str, Any]:
+    """Describe a job with its queue position and progress counters."""
+    view = job.to_dict()
+    if job.status == QUEUED:
+        view["position"] = manager.queue_position(job.job_id)
+    progress = manager.get_progress(job.job_id)
+    view["progress"] = progress.snapshot() if progress is not None else None
+    return view
+
+
+def _submit(
+    manager: JobManager, kind: str, params: Dict[str, Any], secrets: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Queue a job and describe it."""
+    job = manager.get(manager.submit(kind, params, secrets=secrets))
+    assert job is not None
+    return _job_view(manager, job)
+
+
+def _find_job(manager: JobManager, job_id: str) -> Job:
+    """Look up a job, answering 404 if it is unknown."""
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+def _add_status_routes(
+    app: FastAPI, get_manager: Callable[[], JobManager], get_api: Callable[[], TagTranslatorAPI]
+) -> None:
+    """Add the liveness and source listing routes."""
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        jobs = get_manager()
+        return {"status": "ok", "queued": jobs.queue_depth(), "running": jobs.running_count()}
+
+    @app.get("/sources")
+    async def sources() -> Dict[str, Any]:
+        return {"crawl_sources": SOURCE_LIST, "translation": get_api().get_supported_sources()}
+
+
+def _add_submit_routes(app: FastAPI, get_manager: Callable[[], JobManager]) -> None:
+    """Add the routes that queue crawl and post-processing jobs."""
+
+    @app.post("/jobs/crawl", status_code=202)
+    def create_crawl_job(request: CrawlRequest) -> Dict[str, Any]:
+        if request.source_name not in SOURCE_LIST:
+            raise HTTPException(status_code=400, detail=f"Unknown source: {request.source_name}")
+        params = request.model_dump(exclude={"hf_token"})
+        if params["size"] is None:
+            params["size"] = DEFAULT_SIZE_MAP.get(request.source_name)
+        # The token stays in memory so it is never written to the job queue on disk
+        view = _submit(get_manager(), "crawl", params, secrets={"hf_token": request.hf_token})
+        # Unknown tags are reported but do not block the crawl
+        tag_problem = check_tags(request.source_name, request.tags)
+        view["warnings"] = [tag_problem] if tag_problem else []
+        return view
+
+    @app.post("/jobs/process", status_code=202)
+    def create_process_job(request: ProcessRequest) -> Dict[str, Any]:
+        if not os.path.isdir(request.input_dir):
+            raise HTTPException(status_code=400, detail=f"Input directory not found: {request.input_dir}")
+        try:
+            parse_variants(request.variants)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        return _submit(get_manager(), "process", request.model_dump())
+
+
+def _add_job_routes(app: FastAPI, get_manager: Callable[[], JobManager]) -> None:
+    """Add the routes that list, watch and cancel jobs."""
+
+    @app.get("/jobs")
+    def list_jobs(limit: int = 50) -> List[Dict[str, Any]]:
+        jobs = get_manager()
+        return [_job_view(jobs, job) for job in jobs.list_jobs(limit)]
+
+    @app.get("/jobs/{job_id}")
+    def get_job(job_id: str) -> Dict[str, Any]:
+        jobs = get_manager()
+        return _job_view(jobs, _find_job(jobs, job_id))
+
+    @app.get("/jobs/{job_id}/events")
+    async def job_events(job_id: str, request: Request, interval: float = 1.0) -> StreamingResponse:
+        jobs = get_manager()
+        _find_job(jobs, job_id)
+        interval = max(interval, 0.1)
+
+        async def events() -> AsyncIterator[str]:
+            while True:
+                job = _find_job(jobs, job_id)
+                yield f"data: {json.dumps(_job_view(jobs, job))}\n\n"
+                if job.status in FINISHED_STATES or await request.is_disconnected():
+                    return
+                await asyncio.sleep(interval)
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    @app.delete("/jobs/{job_id}")
+    def cancel_job(job_id: str) -> Dict[str, Any]:
+        jobs = get_manager()
+        job = _find_job(jobs, job_id)
+        if not jobs.cancel(job_id):
+            raise HTTPException(status_code=409, detail=f"Job {job_id} already {job.status}")
+        return _job_view(jobs, job)
+
+
+def _add_translation_routes(app: FastAPI, get_api: Callable[[], TagTranslatorAPI]) -> None:
+    """Add the batch tag translation route."""
+
+    @app.post("/translate")
+    async def translate(request: TranslateRequest) -> Dict[str, Any]:
+        descriptions = [description.strip() for description in request.descriptions]
+        if not all(descriptions):
+            raise HTTPException(status_code=400, detail="Descriptions must be non-empty strings")
+        translator = get_api().translator
+        translations = await translator.translate_batch(descriptions, request.method)
+        return {
+            "success": True,
+            "results": [
+                {
+                    "description": description,
+                    "translated": translated,
+                    "formatted_tag": translator.format_tag(translated, request.source_type),
+                }
+                for description, translated in zip(descriptions, translations)
+            ],
+        }
+
+
+def create_app(manager: Optional[JobManager] = None, api: Optional[TagTranslatorAPI] = None) -> FastAPI:
+    """Create the REST application.
+
+    Args:
+        manager: Job manager to queue work on, defaults to ``get_job_manager``. It must
+            have the ``crawl`` and ``process`` kinds registered and be started.
+        api: Translator service, defaults to ``get_translator_api``.
+
+    Returns:
+        The FastAPI application.
+    """
+    app = FastAPI(title="Dataset Cat", version=__version__)
+
+    def get_manager() -> JobManager:
+        return manager if manager is not None else get_job_manager()
+
+    def get_api() -> TagTranslatorAPI:
+        return api if api is not None else get_translator_api()
+
+    _add_status_routes(app, get_manager, get_api)
+    _add_submit_routes(app, get_manager)
+    _add_job_routes(app, get_manager)
+    _add_translation_routes(app, get_api)
+    return app
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    """Serve the REST API until interrupted.
+
+    Args:
+        args: Command line arguments (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Dataset Cat REST API")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to bind to (default: 127.0.0.1)")
+    parser.add_argument("-p", "--port", type=int, default=7862, help="Port to listen on (default: 7862)")
+    parsed_args = parser.parse_args(args)
+
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise ImportError("The REST API requires uvicorn; install it with `pip install dataset-cat[server]`") from e
+
+    # Its own queue file, since a manager requeues every unfinished job in its file
+    manager = get_job_manager(config.get("jobs.server_db_path") or Path(config.get_cache_dir()) / "server-jobs.sqlite3")
+    register_job_handlers(manager)
+    manager.start()
+    try:
+        uvicorn.run(create_app(manager), host=parsed_args.host, port=parsed_args.port)
+    finally:
+        manager.shutdown(wait=False)
+
+
+__all__ = ["CrawlRequest", "ProcessRequest", "TranslateRequest", "create_app", "main", "register_job_handlers"]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
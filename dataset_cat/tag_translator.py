@@ -5,9 +5,80 @@ This module provides functionality to translate Chinese descriptions into Englis
 and format them according to different data source types (e.g., Booru platforms).
 """
 
-from typing import List
+import asyncio
+import inspect
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+import httpx
 from googletrans import Translator
 
+from dataset_cat.core.async_bridge import get_async_bridge
+from dataset_cat.core.cache import TwoLevelCache
+from dataset_cat.core.config import config
+from dataset_cat.core.metrics import CACHE_REQUESTS, REGISTRY, httpx_event_hooks, observe_http_failure
+from dataset_cat.core.tag_dictionary import TagDictionary, get_local_dictionary
+from dataset_cat.core.tag_index import TagVocabulary, get_tag_vocabulary
+
+logger = logging.getLogger(__name__)
+
+# Supported translation backends
+TRANSLATION_METHODS: List[str] = ["jikan", "googletrans"]
+
+_shared_cache: Optional[TwoLevelCache] = None
+_shared_translator: Optional["TagTranslator"] = None
+_shared_lock = threading.Lock()
+
+
+def get_translation_cache() -> Optional[TwoLevelCache]:
+    """
+    Get the process-wide translation cache configured under ``translator.*``.
+
+    Returns:
+        Optional[TwoLevelCache]: The shared cache, or None if caching is disabled.
+    """
+    global _shared_cache
+    if not config.get("translator.cache_enabled", True):
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = TwoLevelCache(
+                db_path=os.path.join(config.get_cache_dir(), "translations.sqlite3"),
+                max_memory_items=config.get("translator.memory_cache_size", 2048),
+                ttl=config.get("translator.cache_ttl", 30 * 24 * 3600),
+                negative_ttl=config.get("translator.negative_cache_ttl", 24 * 3600),
+            )
+        return _shared_cache
+
+
+def _collect_cache_metrics() -> None:
+    """Mirror the shared translation cache's hit and miss totals into the metrics registry."""
+    cache = _shared_cache
+    if cache is not None:
+        CACHE_REQUESTS.set_total(cache.hits, cache="translation", result="hit")
+        CACHE_REQUESTS.set_total(cache.misses, cache="translation", result="miss")
+
+
+REGISTRY.add_collector(_collect_cache_metrics)
+
+
+def get_default_translator() -> "TagTranslator":
+    """
+    Get a shared TagTranslator instance so callers reuse its client and cache.
+
+    Returns:
+        TagTranslator: The process-wide translator.
+    """
+    global _shared_translator
+    if _shared_translator is None:
+        translator = TagTranslator()
+        with _shared_lock:
+            if _shared_translator is None:
+                _shared_translator = translator
+    return _shared_translator
+
 
 class TagTranslator:
     """
@@ -24,82 +95,413 @@ class TagTranslator:
         "yande.re"
     ]
     
-    def __init__(self) -> None:
-        """Initialize the TagTranslator with a Google Translator instance."""
+    def __init__(
+        self,
+        cache: Optional[TwoLevelCache] = None,
+        dictionary: Optional[TagDictionary] = None,
+        vocabulary: Optional[TagVocabulary] = None,
+    ) -> None:
+        """
+        Initialize the TagTranslator with a Google Translator instance.
+
+        Args:
+            cache (Optional[TwoLevelCache]): Cache for translation results. Defaults to the
+                shared cache from ``get_translation_cache``.
+            dictionary (Optional[TagDictionary]): Offline dictionary consulted before any
+                remote backend. Defaults to ``get_local_dictionary``.
+            vocabulary (Optional[TagVocabulary]): Booru tag vocabulary used by ``format_tag``
+                to correct tags on request. Defaults to ``get_tag_vocabulary``.
+        """
         self.translator = Translator()
-    
+        self.cache = cache if cache is not None else get_translation_cache()
+        self.dictionary = dictionary if dictionary is not None else get_local_dictionary()
+        self.vocabulary = vocabulary if vocabulary is not None else get_tag_vocabulary()
+        self._bridge = get_async_bridge()
+        self._http: Optional[httpx.AsyncClient] = None
+        # Requests currently being fetched, keyed by (method, description); only touched on the bridge loop
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future[str]"] = {}
+        # Jikan rate limiting state; the lock is created lazily on the bridge loop
+        self._jikan_lock: Optional[asyncio.Lock] = None
+        self._jikan_next = 0.0
+
+    async def translate(self, description: str, method: str) -> str:
+        """
+        Asynchronously translate Chinese description to English using the specified method.
+
+        Network I/O always runs on the shared bridge loop, so this coroutine can be
+        awaited from any event loop while clients and connection pools are reused.
+
+        Args:
+            description (str): Chinese description to translate.
+            method (str): The translation method ('jikan' or 'googletrans').
+
+        Returns:
+            str: The translated result.
+
+        Raises:
+            ValueError: If the translation method is not supported.
+        """
+        return await self._bridge.run_async(self._translate(description, method))
+
+    async def translate_batch(
+        self, descriptions: List[str], method: str, max_concurrency: Optional[int] = None
+    ) -> List[str]:
+        """
+        Asynchronously translate a batch of Chinese descriptions.
+
+        Args:
+            descriptions (List[str]): Chinese descriptions to translate.
+            method (str): The translation method ('jikan' or 'googletrans').
+            max_concurrency (Optional[int]): Maximum concurrent requests, defaults to
+                ``translator.max_concurrency``.
+
+        Returns:
+            List[str]: Translated results in the same order as ``descriptions``.
+
+        Raises:
+            ValueError: If the translation method is not supported.
+        """
+        return await self._bridge.run_async(self._translate_batch(descriptions, method, max_concurrency))
+
     def translate_to_english(self, description: str, method: str) -> str:
         """
         Translate Chinese description to English using the specified method.
 
+        Descriptions fully covered by the local tag dictionary are answered offline.
+        Otherwise results are served from the translation cache when available.
+        Descriptions with no match are cached for a shorter period; errors are never cached.
+
         Args:
             description (str): Chinese description to translate.
             method (str): The translation method ('jikan' or 'googletrans').
 
         Returns:
             str: The translated result.
+
+        Raises:
+            ValueError: If the translation method is not supported.
+        """
+        if method not in TRANSLATION_METHODS:
+            raise ValueError("Invalid translation method. Choose 'jikan' or 'googletrans'.")
+
+        # Local and cache hits are answered without a round-trip through the bridge loop
+        cached = self._get_cached(description, method)
+        if cached is not None:
+            return cached
+        return self._bridge.run(self._translate(description, method))
+
+    def translate_many(self, descriptions: List[str], method: str, max_workers: Optional[int] = None) -> List[str]:
         """
-        import requests
+        Translate a batch of Chinese descriptions using the specified method.
 
-        if method == "jikan":
-            try:
-                # Step 1: Use zhconvert to convert to Traditional Chinese
-                zhconvert_url = f"https://api.zhconvert.org/convert?converter=Traditional&text={description}"
-                zhconvert_response = requests.get(zhconvert_url)
-                zhconvert_data = zhconvert_response.json()
+        Duplicate descriptions are translated once and cache hits are resolved
+        before any request is made. Remaining misses are sent in one bulk call
+        for googletrans, or concurrently with bounded concurrency for jikan.
 
-                if zhconvert_data.get("code") == 0:
-                    traditional_text = zhconvert_data["data"].get("text", description)
-                else:
-                    traditional_text = description
+        Args:
+            descriptions (List[str]): Chinese descriptions to translate.
+            method (str): The translation method ('jikan' or 'googletrans').
+            max_workers (Optional[int]): Maximum concurrent requests, defaults to
+                ``translator.max_concurrency``.
+
+        Returns:
+            List[str]: Translated results in the same order as ``descriptions``.
+
+        Raises:
+            ValueError: If the translation method is not supported.
+        """
+        return self._bridge.run(self._translate_batch(descriptions, method, max_workers))
+
+    async def _translate(self, description: str, method: str) -> str:
+        """
+        Translate a single description on the bridge loop.
+
+        Args:
+            description (str): Chinese description to translate.
+            method (str): The translation method.
+
+        Returns:
+            str: The translated result.
+        """
+        if method not in TRANSLATION_METHODS:
+            raise ValueError("Invalid translation method. Choose 'jikan' or 'googletrans'.")
+
+        cached = self._get_cached(description, method)
+        if cached is not None:
+            return cached
+
+        # Identical requests already in flight share one upstream call
+        key = (method, description)
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch(description, method))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so a cancelled caller does not cancel the request for the others
+        return await asyncio.shield(pending)
+
+    async def _fetch(self, description: str, method: str) -> str:
+        """
+        Translate a description with its backend and cache the result.
+
+        Args:
+            description (str): Chinese description to translate.
+            method (str): The translation method.
+
+        Returns:
+            str: The translated result, or an error message.
+        """
+        try:
+            if method == "jikan":
+                translated, found = await self._translate_jikan(description)
+            else:
+                translated, found = await self._translate_googletrans(description)
+        except Exception as e:
+            if isinstance(e, httpx.TransportError):
+                observe_http_failure(e)
+            return f"Error: {e}"
+
+        self._store_cached(description, method, translated, found)
+        return translated
+
+    async def _translate_batch(
+        self, descriptions: List[str], method: str, max_concurrency: Optional[int] = None
+    ) -> List[str]:
+        """
+        Translate a batch of descriptions on the bridge loop.
+
+        Args:
+            descriptions (List[str]): Chinese descriptions to translate.
+            method (str): The translation method.
+            max_concurrency (Optional[int]): Maximum concurrent jikan requests.
+
+        Returns:
+            List[str]: Translated results in input order.
+        """
+        if method not in TRANSLATION_METHODS:
+            raise ValueError("Invalid translation method. Choose 'jikan' or 'googletrans'.")
 
-                # Step 2: Use jikan to search for anime character information
-                jikan_url = f"https://api.jikan.moe/v4/characters?q={traditional_text}"
-                jikan_response = requests.get(jikan_url)
-                jikan_data = jikan_response.json()
+        results: Dict[str, str] = {}
+        misses: List[str] = []
+        for description in dict.fromkeys(descriptions):
+            cached = self._get_cached(description, method)
+            if cached is not None:
+                results[description] = cached
+            else:
+                misses.append(description)
 
-                if "data" in jikan_data and len(jikan_data["data"]) > 0:
-                    # Use the first result's English name
-                    character_info = jikan_data["data"][0]
-                    return character_info.get("name", description)
+        if misses and method == "googletrans":
+            outcomes = await self._translate_googletrans_bulk(misses)
+            for description, outcome in zip(misses, outcomes):
+                if isinstance(outcome, BaseException):
+                    results[description] = f"Error: {outcome}"
                 else:
-                    return f"{traditional_text} (no match found)"
+                    translated, found = outcome
+                    self._store_cached(description, method, translated, found)
+                    results[description] = translated
+        elif misses:
+            if max_concurrency is None:
+                max_concurrency = config.get("translator.max_concurrency", 8)
+            # Jikan rejects bursts, so cap concurrency below its rate limit
+            max_concurrency = min(max_concurrency, config.get("translator.jikan_max_concurrency", 3))
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+            async def bounded(description: str) -> str:
+                async with semaphore:
+                    return await self._translate(description, method)
+
+            translations = await asyncio.gather(*(bounded(d) for d in misses))
+            results.update(zip(misses, translations))
+
+        return [results[description] for description in descriptions]
+
+    def _get_cached(self, description: str, method: str) -> Optional[str]:
+        """
+        Look up a translation in the local dictionary, then the cache.
+
+        Args:
+            description (str): Chinese description.
+            method (str): The translation method.
+
+        Returns:
+            Optional[str]: The cached translation, or None on a miss.
+        """
+        local = self._lookup_local(description)
+        if local is not None:
+            return local
+        if self.cache is None:
+            return None
+        entry = self.cache.get(f"{method}:{description}")
+        return entry.value if entry is not None else None
+
+    def _lookup_local(self, description: str) -> Optional[str]:
+        """
+        Translate a description from the offline tag dictionary.
+
+        Args:
+            description (str): Chinese description.
+
+        Returns:
+            Optional[str]: Comma-separated English tags, or None if the dictionary
+            does not cover the whole description.
+        """
+        if self.dictionary is None:
+            return None
+        tags = self.dictionary.translate(description)
+        if tags is None:
+            return None
+        # Dictionary values are booru tags; return plain English so format_tag can style them per source
+        return ", ".join(tag.replace("_", " ") for tag in tags)
+
+    def _store_cached(self, description: str, method: str, translated: str, found: bool) -> None:
+        """
+        Store a translation in the cache.
+
+        Args:
+            description (str): Chinese description.
+            method (str): The translation method.
+            translated (str): The translated text.
+            found (bool): Whether the backend found a match.
+        """
+        if self.cache is not None:
+            self.cache.set(f"{method}:{description}", translated, negative=not found)
 
-            except Exception as e:
-                return f"Error: {e}"
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Get the HTTP client used for zhconvert and Jikan, creating it on first use.
+
+        Returns:
+            httpx.AsyncClient: Client bound to the bridge loop.
+        """
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=config.get("fetcher.timeout", 30),
+                http2=True,
+                follow_redirects=True,
+                event_hooks=httpx_event_hooks(),
+            )
+        return self._http
+
+    async def _wait_for_jikan(self) -> None:
+        """
+        Space Jikan requests at least ``translator.jikan_min_interval`` seconds apart.
+        """
+        interval = config.get("translator.jikan_min_interval", 0.4)
+        if interval <= 0:
+            return
+        if self._jikan_lock is None:
+            self._jikan_lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+        async with self._jikan_lock:
+            delay = self._jikan_next - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._jikan_next = loop.time() + interval
 
-        elif method == "googletrans":
-            try:
-                # Use googletrans for translation
-                result = self.translator.translate(description, src="zh-cn", dest="en")
+    async def _translate_jikan(self, description: str) -> Tuple[str, bool]:
+        """
+        Translate a description via zhconvert and a Jikan character search.
+
+        Args:
+            description (str): Chinese description to translate.
 
-                # Handle coroutine case for googletrans 4.0.2+
-                if hasattr(result, '__await__'):
-                    import asyncio
-                    result = asyncio.run(result)
+        Returns:
+            Tuple[str, bool]: The translated text and whether a match was found.
 
-                return result.text
+        Raises:
+            httpx.HTTPStatusError: If either service answers with an error status, so
+                outages and rate limiting are reported instead of cached as misses.
+        """
+        client = self._get_http_client()
 
-            except Exception as e:
-                return f"Error: {e}"
+        # Step 1: Use zhconvert to convert to Traditional Chinese
+        zhconvert_response = await client.get(
+            "https://api.zhconvert.org/convert", params={"converter": "Traditional", "text": description}
+        )
+        zhconvert_response.raise_for_status()
+        zhconvert_data = zhconvert_response.json()
 
+        if zhconvert_data.get("code") == 0:
+            traditional_text = zhconvert_data["data"].get("text", description)
         else:
-            raise ValueError("Invalid translation method. Choose 'jikan' or 'googletrans'.")
-    
-    def format_tag(self, tag: str, source_type: str) -> str:
+            traditional_text = description
+
+        # Step 2: Use jikan to search for anime character information
+        await self._wait_for_jikan()
+        jikan_response = await client.get("https://api.jikan.moe/v4/characters", params={"q": traditional_text})
+        jikan_response.raise_for_status()
+        jikan_data = jikan_response.json()
+
+        if "data" in jikan_data and len(jikan_data["data"]) > 0:
+            # Use the first result's English name
+            character_info = jikan_data["data"][0]
+            return character_info.get("name", description), True
+        return f"{traditional_text} (no match found)", False
+
+    async def _translate_googletrans(self, description: str) -> Tuple[str, bool]:
+        """
+        Translate a description via googletrans.
+
+        Args:
+            description (str): Chinese description to translate.
+
+        Returns:
+            Tuple[str, bool]: The translated text and whether a match was found.
+        """
+        result = self.translator.translate(description, src="zh-cn", dest="en")
+
+        # googletrans 4.0.2+ is async; older releases return the result directly
+        if inspect.isawaitable(result):
+            result = await result
+
+        return result.text, True
+
+    async def _translate_googletrans_bulk(
+        self, descriptions: List[str]
+    ) -> List[Union[Tuple[str, bool], BaseException]]:
+        """
+        Translate several descriptions with a single googletrans bulk request.
+
+        Args:
+            descriptions (List[str]): Chinese descriptions to translate.
+
+        Returns:
+            List[Union[Tuple[str, bool], BaseException]]: One outcome per description.
+        """
+        try:
+            results = self.translator.translate(descriptions, src="zh-cn", dest="en")
+
+            # googletrans 4.0.2+ is async; older releases return the result directly
+            if inspect.isawaitable(results):
+                results = await results
+
+            return [(result.text, True) for result in results]
+        except Exception as e:
+            return [e for _ in descriptions]
+
+    def format_tag(self, tag: str, source_type: str, correct: bool = False) -> str:
         """
         Format tag based on source type requirements.
         
         Args:
             tag (str): Translated English tag.
             source_type (str): Data source type (e.g., "Danbooru", "Zerochan").
+            correct (bool): Replace booru tags with the closest tag in the vocabulary.
+                Off by default so tags are only changed when the caller opts in.
             
         Returns:
-            str: Formatted tag according to source requirements.
+            str: Formatted tag according to source requirements. For booru sources,
+            comma-separated input is formatted per tag and joined with commas.
         """
         if source_type.lower() in self.BOORU_SOURCES:
+            if "," in tag:
+                parts = [part.strip() for part in tag.split(",") if part.strip()]
+                return ",".join(self.format_tag(part, source_type, correct) for part in parts)
             # Booru platforms use lowercase with underscores
-            return tag.replace(" ", "_").lower()
+            formatted = tag.replace(" ", "_").lower()
+            if correct and self.vocabulary is not None:
+                formatted = self.vocabulary.correct(formatted)
+            return formatted
         else:
             # Other platforms keep original capitalization and spaces
             return tag
@@ -161,5 +563,5 @@ def translate_and_format(description: str, source_type: str, method: str = "goog
     Returns:
         str: Formatted English tag.
     """
-    translator = TagTranslator()
+    translator = get_default_translator()
     return translator.get_formatted_tag(description, source_type, method)
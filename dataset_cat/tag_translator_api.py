@@ -1,21 +1,71 @@
 """
 Tag Translator API
 
-This module provides API interfaces for the Tag Translator functionality.
+This module provides API interfaces for the Tag Translator functionality,
+either in-process through a shared TagTranslatorAPI service or over a local
+JSON HTTP endpoint.
 """
 
-from typing import Dict, Any
-from .tag_translator import TagTranslator
+import argparse
+import asyncio
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+
+from .core.async_bridge import run_sync
+from .tag_translator import TagTranslator, get_default_translator
+
+logger = logging.getLogger(__name__)
 
 
 class TagTranslatorAPI:
     """
     API interface for Tag Translator functionality.
+
+    Instances are meant to be long-lived: they share the process-wide translator,
+    its HTTP clients and cache, and identical concurrent requests are coalesced
+    into a single upstream call.
     """
     
-    def __init__(self) -> None:
-        """Initialize the API with a TagTranslator instance."""
-        self.translator = TagTranslator()
+    def __init__(self, translator: Optional[TagTranslator] = None) -> None:
+        """
+        Initialize the API with a TagTranslator instance.
+
+        Args:
+            translator (Optional[TagTranslator]): Translator to use, defaults to the
+                shared translator from ``get_default_translator``.
+        """
+        self.translator = translator if translator is not None else get_default_translator()
+
+    def translate_both(self, description: str) -> Dict[str, str]:
+        """
+        Translate a description with both backends concurrently.
+
+        Args:
+            description (str): Chinese description to translate.
+
+        Returns:
+            Dict[str, str]: Results keyed by ``zhconvert_jikan`` and ``googletrans``.
+        """
+        return run_sync(self._translate_both(description))
+
+    async def _translate_both(self, description: str) -> Dict[str, str]:
+        """
+        Fan a description out to both backends and wait for both results.
+
+        Args:
+            description (str): Chinese description to translate.
+
+        Returns:
+            Dict[str, str]: Results keyed by ``zhconvert_jikan`` and ``googletrans``.
+        """
+        jikan_result, googletrans_result = await asyncio.gather(
+            self.translator.translate(description, "jikan"),
+            self.translator.translate(description, "googletrans"),
+        )
+        return {"zhconvert_jikan": jikan_result, "googletrans": googletrans_result}
     
     def translate_tag(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -64,8 +114,8 @@ class TagTranslatorAPI:
                     "error": "Source type must be a non-empty string"
                 }
 
-            # Get translation results
-            translation_results = self.translator.translate_to_english(description)
+            # Get translation results from both backends concurrently
+            translation_results = self.translate_both(description.strip())
 
             # Format tags for both results
             formatted_tags = {
@@ -86,6 +136,75 @@ class TagTranslatorAPI:
                 "error": str(e)
             }
     
+    def translate_tags(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        API endpoint to translate and format a batch of descriptions in one call.
+
+        Args:
+            request_data (Dict[str, Any]): Request containing:
+                - descriptions (List[str]): Chinese descriptions
+                - source_type (str): Data source type
+                - method (str, optional): Translation method, defaults to "googletrans"
+
+        Returns:
+            Dict[str, Any]: Response containing:
+                - results (List[Dict[str, str]]): One entry per description with
+                  ``description``, ``translated`` and ``formatted_tag``, in request order.
+                - success (bool): Operation status.
+                - error (str, optional): Error message if failed.
+        """
+        try:
+            if "descriptions" not in request_data:
+                return {
+                    "success": False,
+                    "error": "Missing required field: descriptions"
+                }
+
+            if "source_type" not in request_data:
+                return {
+                    "success": False,
+                    "error": "Missing required field: source_type"
+                }
+
+            descriptions = request_data["descriptions"]
+            source_type = request_data["source_type"]
+            method = request_data.get("method", "googletrans")
+
+            if not isinstance(descriptions, list) or not all(
+                isinstance(description, str) and description.strip() for description in descriptions
+            ):
+                return {
+                    "success": False,
+                    "error": "Descriptions must be a list of non-empty strings"
+                }
+
+            if not isinstance(source_type, str) or not source_type.strip():
+                return {
+                    "success": False,
+                    "error": "Source type must be a non-empty string"
+                }
+
+            descriptions = [description.strip() for description in descriptions]
+            translations = self.translator.translate_many(descriptions, method)
+
+            return {
+                "success": True,
+                "results": [
+                    {
+                        "description": description,
+                        "translated": translated,
+                        "formatted_tag": self.translator.format_tag(translated, source_type)
+                    }
+                    for description, translated in zip(descriptions, translations)
+                ]
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
     def get_supported_sources(self) -> Dict[str, Any]:
         """
         Get list of supported data sources and their formatting rules.
@@ -103,6 +222,24 @@ class TagTranslatorAPI:
         }
 
 
+_api: Optional[TagTranslatorAPI] = None
+_api_lock = threading.Lock()
+
+
+def get_translator_api() -> TagTranslatorAPI:
+    """
+    Get the process-wide TagTranslatorAPI service.
+
+    Returns:
+        TagTranslatorAPI: The shared service instance.
+    """
+    global _api
+    with _api_lock:
+        if _api is None:
+            _api = TagTranslatorAPI()
+        return _api
+
+
 # Convenience functions for direct API usage
 def translate_tag_request(description: str, source_type: str) -> Dict[str, Any]:
     """
@@ -115,7 +252,7 @@ def translate_tag_request(description: str, source_type: str) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: API response with formatted tag or error.
     """
-    api = TagTranslatorAPI()
+    api = get_translator_api()
     request_data = {
         "description": description,
         "source_type": source_type
@@ -123,6 +260,27 @@ def translate_tag_request(description: str, source_type: str) -> Dict[str, Any]:
     return api.translate_tag(request_data)
 
 
+def translate_tags_request(descriptions: List[str], source_type: str, method: str = "googletrans") -> Dict[str, Any]:
+    """
+    Convenience function for batch tag translation requests.
+
+    Args:
+        descriptions (List[str]): Chinese descriptions to translate.
+        source_type (str): Target data source type.
+        method (str): Translation method, defaults to "googletrans".
+
+    Returns:
+        Dict[str, Any]: API response with formatted tags or error.
+    """
+    api = get_translator_api()
+    request_data = {
+        "descriptions": descriptions,
+        "source_type": source_type,
+        "method": method
+    }
+    return api.translate_tags(request_data)
+
+
 def get_supported_sources() -> Dict[str, Any]:
     """
     Convenience function to get supported data sources.
@@ -130,5 +288,108 @@ def get_supported_sources() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Information about supported sources.
     """
-    api = TagTranslatorAPI()
+    api = get_translator_api()
     return api.get_supported_sources()
+
+
+class _TranslatorRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON request handler exposing a TagTranslatorAPI over HTTP.
+
+    Routes:
+        GET  /sources          -> get_supported_sources
+        POST /translate        -> translate_tag
+        POST /translate/batch  -> translate_tags
+    """
+
+    api: TagTranslatorAPI
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") == "/sources":
+            self._send_json(200, self.api.get_supported_sources())
+        else:
+            self._send_json(404, {"success": False, "error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self) -> None:
+        routes = {
+            "/translate": self.api.translate_tag,
+            "/translate/batch": self.api.translate_tags,
+        }
+        endpoint = routes.get(self.path.rstrip("/"))
+        if endpoint is None:
+            self._send_json(404, {"success": False, "error": f"Unknown endpoint: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request_data = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_json(400, {"success": False, "error": f"Invalid JSON body: {e}"})
+            return
+        if not isinstance(request_data, dict):
+            self._send_json(400, {"success": False, "error": "Request body must be a JSON object"})
+            return
+
+        response = endpoint(request_data)
+        self._send_json(200 if response.get("success") else 400, response)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+def create_http_server(
+    host: str = "127.0.0.1", port: int = 7861, api: Optional[TagTranslatorAPI] = None
+) -> ThreadingHTTPServer:
+    """
+    Create a threaded HTTP server that serves the translator API.
+
+    All request threads share one TagTranslatorAPI, so concurrent callers reuse
+    the same clients, cache and in-flight requests.
+
+    Args:
+        host (str): Host address to bind to.
+        port (int): Port to listen on; 0 picks a free port.
+        api (Optional[TagTranslatorAPI]): Service to expose, defaults to ``get_translator_api``.
+
+    Returns:
+        ThreadingHTTPServer: The server, not yet serving.
+    """
+    handler = type("TranslatorRequestHandler", (_TranslatorRequestHandler,), {"api": api or get_translator_api()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    """
+    Serve the translator API over HTTP until interrupted.
+
+    Args:
+        args: Command line arguments (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Dataset Cat tag translator HTTP API")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to bind to (default: 127.0.0.1)")
+    parser.add_argument("-p", "--port", type=int, default=7861, help="Port to listen on (default: 7861)")
+    parsed_args = parser.parse_args(args)
+
+    server = create_http_server(parsed_args.host, parsed_args.port)
+    logger.info(f"Tag translator API listening on http://{parsed_args.host}:{parsed_args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
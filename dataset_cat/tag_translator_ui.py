@@ -6,8 +6,8 @@ This module provides Gradio UI components for the Tag Translator functionality.
 
 import gradio as gr
 from typing import Dict, Any, List, Optional, Tuple
-from .tag_translator_api import TagTranslatorAPI
-from .tag_translator import TagTranslator
+from .tag_translator_api import get_translator_api
+from .tag_translator import get_default_translator
 
 
 def _get_supported_sources() -> Tuple[List[str], str]:
@@ -17,7 +17,7 @@ def _get_supported_sources() -> Tuple[List[str], str]:
     Returns:
         Tuple of (all_sources list, default_source).
     """
-    api = TagTranslatorAPI()
+    api = get_translator_api()
     sources_info = api.get_supported_sources()
     booru_sources = sources_info.get("booru_sources", [])
     all_sources = booru_sources + ["Zerochan", "Pixiv", "DeviantArt", "ArtStation"]
@@ -41,7 +41,7 @@ def _create_translation_handler(locale: Dict[str, str]):
             return locale.get("error_empty_description", "请输入要翻译的中文描述")
         
         try:
-            translator = TagTranslator()
+            translator = get_default_translator()
             formatted_tag = translator.translate_to_english(description.strip(), method)
             formatted_tag = translator.format_tag(formatted_tag, source_type)
             return formatted_tag
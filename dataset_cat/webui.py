@@ -1,12 +1,29 @@
 import logging
 import os
 import json
+import tempfile
+import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, Tuple
 
 import gradio as gr
 
+from dataset_cat.core.config import config
+from dataset_cat.core.exporters import (
+    PackedExporter,
+    PackedStoreExporter,
+    ParquetExporter,
+    WebDatasetExporter,
+    export_passthrough,
+)
+from dataset_cat.core.jobs import FINISHED_STATES, QUEUED, JobContext, get_job_manager
+from dataset_cat.core.metrics import IMAGES_EXPORTED, start_metrics_server
+from dataset_cat.core.profiling import RunProfiler
+from dataset_cat.core.progress import ProgressTracker
+from dataset_cat.core.tag_index import get_tag_vocabulary
 from dataset_cat.crawler import Crawler
+from dataset_cat.gallery_dl_backend import GALLERY_DL_SOURCE
 from dataset_cat.postprocessing_ui import create_postprocessing_tab_content, update_postprocessing_ui_language
 from dataset_cat.tag_translator_ui import create_tag_translator_tab_content, update_tag_translator_ui_language
 from waifuc.action import FilterSimilarAction, NoMonochromeAction
@@ -44,6 +61,7 @@ SIZE_OPTIONS_MAP = {
     "Duitang": ["Original", "Large", "Medium", "Small"],  # Duitang is more about collections
     "Pixiv": ["original", "large", "medium", "square_medium"],
     "Derpibooru": ["full", "large", "medium", "small", "thumb"],
+    GALLERY_DL_SOURCE: [],  # gallery-dl downloads the files the gallery links to
 }
 
 DEFAULT_SIZE_MAP = {
@@ -63,6 +81,7 @@ DEFAULT_SIZE_MAP = {
     "Duitang": "Original",
     "Pixiv": "large",
     "Derpibooru": "large",
+    GALLERY_DL_SOURCE: None,
 }
 
 # 数据源列表
@@ -83,8 +102,25 @@ SOURCE_LIST = [
     "Duitang",
     "Pixiv",
     "Derpibooru",
+    GALLERY_DL_SOURCE,
 ]
 
+# Largest crawl the UI and the REST API accept per job
+MAX_CRAWL_LIMIT = 350
+
+# Sources whose search tags follow the Danbooru vocabulary and can be validated locally
+BOORU_TAG_SOURCES = {
+    "Danbooru",
+    "Safebooru",
+    "Gelbooru",
+    "Konachan",
+    "KonachanNet",
+    "Lolibooru",
+    "Yande",
+    "Rule34",
+    "HypnoHub",
+}
+
 
 # 更新数据源选择函数
 def get_sources():
@@ -92,17 +128,121 @@ def get_sources():
 
 
 # 更新爬取任务函数
-def start_crawl(source_name, tags, limit, size, strict):
-    return Crawler.start_crawl(source_name, tags, limit, size, strict)
+def start_crawl(
+    source_name,
+    tags,
+    limit,
+    size,
+    strict,
+    progress: Optional[ProgressTracker] = None,
+    download_dir: Optional[str] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+):
+    return Crawler.start_crawl(
+        source_name, tags, limit, size, strict, progress=progress, download_dir=download_dir, cancelled=cancelled
+    )
 
 
 # 数据处理函数
-def apply_actions(source, actions):
-    if "NoMonochrome" in actions and hasattr(source, "attach"):
-        source = source.attach(NoMonochromeAction())
-    if "FilterSimilar" in actions and hasattr(source, "attach"):
-        source = source.attach(FilterSimilarAction())
-    return source
+def apply_actions(source, actions, progress: Optional[ProgressTracker] = None):
+    selected = []
+    if "NoMonochrome" in actions:
+        selected.append(NoMonochromeAction())
+    if "FilterSimilar" in actions:
+        selected.append(FilterSimilarAction())
+    if not selected:
+        return source
+    if hasattr(source, "attach"):
+        return source.attach(*selected)
+    # Crawled items arrive as a list, so run the actions item by item
+    return _iter_actions(source, selected, progress)
+
+
+def _iter_actions(items, actions, progress: Optional[ProgressTracker] = None):
+    """Run waifuc actions over crawled items, timing each action as its own stage."""
+    for item in items:
+        outputs = [item]
+        for action in actions:
+            start = time.perf_counter()
+            outputs = [result for output in outputs for result in action.iter(output)]
+            if progress is not None:
+                progress.record(f"action:{type(action).__name__}", time.perf_counter() - start)
+            if not outputs:
+                if progress is not None:
+                    progress.count(f"filtered:{type(action).__name__}")
+                break
+        yield from outputs
+
+
+def check_tags(source_name: str, tags: str, locale: Optional[dict] = None) -> Optional[str]:
+    """Validate search tags against the local tag vocabulary.
+
+    Args:
+        source_name: Selected data source.
+        tags: Comma-separated search tags.
+        locale: Localization dictionary.
+
+    Returns:
+        A message describing unknown tags and suggested corrections, or None if
+        all tags are known, the source does not use booru tags, or no vocabulary is loaded.
+    """
+    if locale is None:
+        locale = {}
+    vocabulary = get_tag_vocabulary()
+    if vocabulary is None or source_name not in BOORU_TAG_SOURCES:
+        return None
+
+    problems = []
+    for result in vocabulary.validate(tags.split(",")):
+        if result.valid:
+            continue
+        if result.suggestions:
+            suggestions = ", ".join(suggestion.tag for suggestion in result.suggestions)
+            problems.append(
+                locale.get("unknown_tag_suggest", "{tag} (did you mean: {suggestions}?)").format(
+                    tag=result.tag.strip(), suggestions=suggestions
+                )
+            )
+        else:
+            problems.append(result.tag.strip())
+
+    if not problems:
+        return None
+    return locale.get("unknown_tags", "Unknown tags: {tags}").format(tags="; ".join(problems))
+
+
+def _create_tag_hint_handler(locales: dict):
+    """
+    Create the callback that shows tag completions and corrections while typing.
+
+    Args:
+        locales: Dictionary of locale data.
+
+    Returns:
+        Callable: The tag_hint function.
+    """
+    def tag_hint(source_name: str, tags: str, lang: str) -> str:
+        """Return a Markdown hint for the tags typed so far."""
+        vocabulary = get_tag_vocabulary()
+        if vocabulary is None or source_name not in BOORU_TAG_SOURCES or not tags.strip():
+            return ""
+        locale_data = locales.get(lang, locales.get("zh", {}))
+
+        *finished, current = tags.split(",")
+        lines = []
+        problem = check_tags(source_name, ",".join(finished), locale_data)
+        if problem:
+            lines.append(problem)
+        if current.strip():
+            completions = vocabulary.complete(current, limit=5)
+            if completions:
+                lines.append(
+                    locale_data.get("tag_completions", "Suggestions: {tags}").format(
+                        tags=", ".join(f"`{c.tag}` ({c.post_count})" for c in completions)
+                    )
+                )
+        return "\n\n".join(lines)
+    return tag_hint
 
 
 # Author extractor functions for different data sources
@@ -284,48 +424,104 @@ def extract_author_info(item) -> str:
     return "Unknown"
 
 
-# 导出函数
-def export_data(source, output_dir, save_meta, save_author, exporter_type, hf_repo=None, hf_token=None, locale=None):
-    if locale is None:
-        locale = {}
-    if exporter_type == "SaveExporter":
-        exporter = SaveExporter(
+def _create_exporter(exporter_type, output_dir, save_meta, hf_repo=None, hf_token=None):
+    """Create the exporter of a type offered in the UI, or None if the type is unknown."""
+    exporters = {
+        "SaveExporter": lambda: SaveExporter(
             output_dir=output_dir,
             no_meta=not save_meta,
             save_params={"format": "PNG"},
-        )
-    elif exporter_type == "TextualInversionExporter":
-        exporter = TextualInversionExporter(
+        ),
+        "TextualInversionExporter": lambda: TextualInversionExporter(
             output_dir=output_dir,
             clear=True,
-        )
-    elif exporter_type == "HuggingFaceExporter":
-        if not hf_repo or not hf_token:
-            return locale.get("hf_exporter_requires", "HuggingFaceExporter requires 'hf_repo' and 'hf_token'.")
-        exporter = HuggingFaceExporter(
+        ),
+        "HuggingFaceExporter": lambda: HuggingFaceExporter(
             repository=hf_repo,
             hf_token=hf_token,
             repo_type="dataset",
-        )
+        ),
+        "WebDatasetExporter": lambda: WebDatasetExporter(output_dir=output_dir, no_meta=not save_meta),
+        "ParquetExporter": lambda: ParquetExporter(output_dir=output_dir),
+        "PackedStoreExporter": lambda: PackedStoreExporter(output_dir=output_dir, no_meta=not save_meta),
+    }
+    create = exporters.get(exporter_type)
+    return create() if create is not None else None
+
+
+def _export_item(exporter, item, output_dir, save_meta, passthrough: bool) -> None:
+    """Export an item, copying it as downloaded when ``passthrough`` allows and its pixels were never touched."""
+    if passthrough and export_passthrough(item, output_dir, save_meta):
+        # Release the file handle of the never decoded image
+        item.image.close()
     else:
+        exporter.export_item(item)
+
+
+def _close_packed_exporter(exporter: PackedExporter, reported: int, progress=None) -> None:
+    """Close a packed exporter, recording the bytes not yet reported per item as export time."""
+    start = time.perf_counter()
+    exporter.close()
+    if progress is not None:
+        # Bytes written by background writers after their item was handed over
+        progress.record("export", time.perf_counter() - start, exporter.bytes_written - reported, items=0)
+
+
+def _save_author_file(item, output_dir) -> None:
+    """Write the author of an exported item to ``<image name>_author.txt`` next to it."""
+    author = extract_author_info(item)
+    image_name = item.meta.get("filename", "unknown")
+    if "." in image_name:
+        image_name_no_ext = image_name.rsplit(".", 1)[0]
+    else:
+        image_name_no_ext = image_name
+    author_file_path = f"{output_dir}/{image_name_no_ext}_author.txt"
+    try:
+        with open(author_file_path, "w", encoding="utf-8") as author_file:
+            author_file.write(f"Author: {author}\n")
+        logger.info(f"Saved author info to: {author_file_path}")
+    except Exception as e:
+        logger.error(f"Failed to save author info: {e}")
+
+
+# 导出函数
+def export_data(
+    source, output_dir, save_meta, save_author, exporter_type, hf_repo=None, hf_token=None, locale=None, progress=None
+):
+    if locale is None:
+        locale = {}
+    if exporter_type == "HuggingFaceExporter" and (not hf_repo or not hf_token):
+        return locale.get("hf_exporter_requires", "HuggingFaceExporter requires 'hf_repo' and 'hf_token'.")
+    exporter = _create_exporter(exporter_type, output_dir, save_meta, hf_repo, hf_token)
+    if exporter is None:
         return locale.get("unsupported_exporter", "Unsupported exporter type: {exporter_type}").format(exporter_type=exporter_type)
     logger.info(f"Exporting data, save_author={save_author}")
-    for item in source:
-        exporter.export_item(item)
-        if save_author:
-            author = extract_author_info(item)
-            image_name = item.meta.get("filename", "unknown")
-            if "." in image_name:
-                image_name_no_ext = image_name.rsplit(".", 1)[0]
-            else:
-                image_name_no_ext = image_name
-            author_file_path = f"{output_dir}/{image_name_no_ext}_author.txt"
-            try:
-                with open(author_file_path, "w", encoding="utf-8") as author_file:
-                    author_file.write(f"Author: {author}\n")
-                logger.info(f"Saved author info to: {author_file_path}")
-            except Exception as e:
-                logger.error(f"Failed to save author info: {e}")
+    # Packed exporters keep the author in the item metadata instead of a loose sidecar file
+    packed = isinstance(exporter, PackedExporter)
+    # Items whose pixels were never touched are copied as downloaded instead of re-encoded
+    passthrough = exporter_type == "SaveExporter" and config.get("export.passthrough", True)
+    # Packed exporters report their own byte count since items share output files
+    reported = 0
+    try:
+        for item in source:
+            start = time.perf_counter()
+            if save_author and packed:
+                item.meta["author"] = extract_author_info(item)
+            _export_item(exporter, item, output_dir, save_meta, passthrough)
+            IMAGES_EXPORTED.inc(exporter=exporter_type)
+            if progress is not None:
+                if packed:
+                    written = exporter.bytes_written
+                    nbytes, reported = written - reported, written
+                else:
+                    saved_path = os.path.join(output_dir, item.meta.get("filename", ""))
+                    nbytes = os.path.getsize(saved_path) if os.path.isfile(saved_path) else 0
+                progress.record("export", time.perf_counter() - start, nbytes)
+            if save_author and not packed:
+                _save_author_file(item, output_dir)
+    finally:
+        if packed:
+            _close_packed_exporter(exporter, reported, progress)
     return locale.get("data_exported_success", "Data exported successfully.")
 
 
@@ -360,9 +556,67 @@ def load_locales() -> dict:
     return locales
 
 
+def _until_cancelled(items, context: JobContext):
+    """Yield items until the job is asked to cancel, so actions and export stop at the next item."""
+    for item in items:
+        if context.cancelled:
+            return
+        yield item
+
+
+def _create_crawl_job(locales: dict):
+    """
+    Create the background job that runs a crawl, its actions and the export.
+
+    Args:
+        locales: Dictionary of locale data.
+
+    Returns:
+        Callable: Job handler taking (params, context).
+    """
+    def run_crawl_job(params: dict, context: JobContext) -> str:
+        """Crawl, process and export data described by the job parameters."""
+        locale_data = locales.get(params.get("lang"), locales.get("zh", {}))
+        if config.get("profiling.enabled", False):
+            context.progress = RunProfiler.from_config(f"crawl-{context.job_id}", params["limit"])
+        progress = context.progress
+        progress.total = params["limit"]
+        # Downloads stay on disk until the export so untouched files can be copied as downloaded
+        download_dir = tempfile.TemporaryDirectory(prefix="crawl-", dir=config.get_temp_dir())
+        with progress if isinstance(progress, RunProfiler) else nullcontext(), download_dir:
+            context.set_message(f"Crawling {params['source_name']}...")
+            source, message = start_crawl(
+                params["source_name"], params["tags"], params["limit"], params["size"], params["strict"], progress,
+                download_dir.name, lambda: context.cancelled,
+            )
+            if context.cancelled:
+                return locale_data.get("job_cancelled", "Cancelled.")
+            if source is None:
+                logger.error(f"Crawl failed: {message}")
+                return message
+            source = apply_actions(_until_cancelled(source, context), params["actions"], progress)
+            context.set_message("Exporting...")
+            result = export_data(
+                source, params["output_dir"], params["save_meta"], params["save_author"],
+                params["exporter_type"], params["hf_repo"], context.secrets.get("hf_token"), locale_data, progress
+            )
+        if isinstance(progress, RunProfiler):
+            report_path = progress.write_report()
+            logger.info(f"Profiling report written to {report_path}")
+            result = f"{result}\n" + locale_data.get("profile_report_saved", "Profiling report: {path}").format(
+                path=report_path
+            )
+        logger.info(f"Process finished: {result}")
+        return result
+    return run_crawl_job
+
+
 def _create_process_data_handler(locales: dict):
     """
     Create the data processing callback function.
+
+    The callback only validates the request and queues a crawl job, so the
+    Gradio worker is released immediately.
     
     Args:
         locales: Dictionary of locale data.
@@ -384,24 +638,102 @@ def _create_process_data_handler(locales: dict):
         hf_repo: str,
         hf_token: str,
         lang: str
-    ) -> str:
-        """Process data from the selected source."""
-        logger.info("Start processing data...")
+    ) -> Tuple[str, Optional[str]]:
+        """Queue a crawl job and return its status message and ID."""
         locale_data = locales.get(lang, locales.get("zh", {}))
-        source, message = start_crawl(source_name, tags, limit, size, strict)
-        if source is None:
-            logger.error(f"Crawl failed: {message}")
-            return message
-        source = apply_actions(source, actions)
-        result = export_data(
-            source, output_dir, save_meta, save_author,
-            exporter_type, hf_repo, hf_token, locale_data
+        # Unknown tags only warn: the vocabulary may be stale or miss niche tags
+        tag_problem = check_tags(source_name, tags, locale_data)
+        if tag_problem:
+            logger.warning(f"Crawling with unrecognized tags: {tag_problem}")
+        params = {
+            "source_name": source_name,
+            "tags": tags,
+            "limit": limit,
+            "size": size,
+            "strict": strict,
+            "actions": actions or [],
+            "output_dir": output_dir,
+            "save_meta": save_meta,
+            "save_author": save_author,
+            "exporter_type": exporter_type,
+            "hf_repo": hf_repo,
+            "lang": lang,
+        }
+        # The token stays in memory so it is never written to the job queue on disk
+        manager = get_job_manager()
+        job_id = manager.submit("crawl", params, secrets={"hf_token": hf_token})
+        position = manager.queue_position(job_id)
+        message = locale_data.get("job_queued", "Job {job_id} queued at position {position}.").format(
+            job_id=job_id, position=(position or 0) + 1
         )
-        logger.info(f"Process finished: {result}")
-        return result
+        if tag_problem:
+            message = f"{tag_problem}\n{message}"
+        return message, job_id
     return process_data
 
 
+def _create_job_status_handler(locales: dict):
+    """
+    Create the callback that reports the status of the session's crawl job.
+
+    Args:
+        locales: Dictionary of locale data.
+
+    Returns:
+        Callable: The job_status function.
+    """
+    def job_status(job_id: Optional[str], lang: str):
+        """Describe the current state of a job."""
+        if not job_id:
+            return gr.update()
+        locale_data = locales.get(lang, locales.get("zh", {}))
+        manager = get_job_manager()
+        job = manager.get(job_id)
+        if job is None:
+            return locale_data.get("job_not_found", "Job {job_id} not found.").format(job_id=job_id)
+        if job.status == QUEUED:
+            position = manager.queue_position(job_id)
+            return locale_data.get("job_queued", "Job {job_id} queued at position {position}.").format(
+                job_id=job_id, position=(position or 0) + 1
+            )
+        status = locale_data.get("job_status", "Job {job_id} {status}: {message}").format(
+            job_id=job_id, status=job.status, message=job.message
+        )
+        progress = manager.get_progress(job_id)
+        if progress is None:
+            return status
+        progress.queue_depth = manager.queue_depth()
+        return f"{status}\n{progress.format(locale_data)}"
+    return job_status
+
+
+def _create_job_stream_handler(locales: dict, interval: float = 0.5):
+    """
+    Create the generator that streams a crawl job's progress to the crawl tab.
+
+    Args:
+        locales: Dictionary of locale data.
+        interval: Seconds between updates.
+
+    Returns:
+        Callable: The stream_job generator function.
+    """
+    job_status = _create_job_status_handler(locales)
+
+    def stream_job(job_id: Optional[str], lang: str):
+        """Yield the job's status and per-stage throughput until it finishes."""
+        if not job_id:
+            return
+        manager = get_job_manager()
+        while True:
+            job = manager.get(job_id)
+            yield job_status(job_id, lang)
+            if job is None or job.status in FINISHED_STATES:
+                return
+            time.sleep(interval)
+    return stream_job
+
+
 def _create_crawl_tab_components() -> dict:
     """
     Create UI components for the crawl tab.
@@ -419,7 +751,8 @@ def _create_crawl_tab_components() -> dict:
             label="数据源"
         ),
         "tags_input": gr.Textbox(label="标签（逗号分隔）"),
-        "limit_slider": gr.Slider(1, 350, value=10, step=1, label="数量限制"),
+        "tag_hint": gr.Markdown(""),
+        "limit_slider": gr.Slider(1, MAX_CRAWL_LIMIT, value=10, step=1, label="数量限制"),
         "size_dropdown": gr.Dropdown(
             choices=SIZE_OPTIONS_MAP.get(default_source, []),
             value=None,
@@ -431,13 +764,20 @@ def _create_crawl_tab_components() -> dict:
         "save_meta_checkbox": gr.Checkbox(label="保存元数据"),
         "save_author_checkbox": gr.Checkbox(label="保存作者信息", value=True),
         "exporter_dropdown": gr.Dropdown(
-            ["SaveExporter", "TextualInversionExporter", "HuggingFaceExporter"],
+            [
+                "SaveExporter",
+                "TextualInversionExporter",
+                "HuggingFaceExporter",
+                "WebDatasetExporter",
+                "ParquetExporter",
+                "PackedStoreExporter",
+            ],
             value="SaveExporter",
             label="导出器类型"
         ),
         "hf_repo_input": gr.Textbox(label="HuggingFace 仓库（可选）"),
         "hf_token_input": gr.Textbox(label="HuggingFace Token（可选）", type="password"),
-        "result_output": gr.Textbox(label="结果", interactive=False),
+        "result_output": gr.Textbox(label="结果", interactive=False, lines=6),
         "start_button": gr.Button("开始"),
     }
     return components
@@ -468,6 +808,7 @@ def _get_crawl_tab_language_updates(locale_data: dict) -> list:
         gr.update(label=locale_data.get("hf_token_label", "HuggingFace Token（可选）")),
         gr.update(value=locale_data.get("start_button", "开始")),
         gr.update(label=locale_data.get("result_label", "结果")),
+        gr.update(),
     ]
 
 
@@ -581,6 +922,7 @@ def _get_language_switch_outputs(
         crawl_components["hf_token_input"],
         crawl_components["start_button"],
         crawl_components["result_output"],
+        crawl_components["tag_hint"],
     ] + list(postproc_components.values()) + list(tag_translator_components.values())
 
 
@@ -589,7 +931,8 @@ def launch_webui(
     host: str = "0.0.0.0",
     port: int = 7860,
     debug: bool = False,
-    share: bool = False
+    share: bool = False,
+    metrics_port: Optional[int] = None
 ) -> None:
     """Launch the Dataset Cat WebUI application.
     
@@ -598,12 +941,24 @@ def launch_webui(
         port: Port number to run the server on.
         debug: Whether to enable debug mode.
         share: Whether to create a public Gradio share link.
+        metrics_port: Port for the Prometheus ``/metrics`` endpoint. When None the
+            endpoint is started only if ``metrics.enabled`` is set in the config.
     """
+    if metrics_port is not None or config.get("metrics.enabled", False):
+        start_metrics_server(port=metrics_port)
     locales = load_locales()
     process_data = _create_process_data_handler(locales)
+    stream_job = _create_job_stream_handler(locales)
+    tag_hint = _create_tag_hint_handler(locales)
+
+    # Crawls run on the shared job manager instead of Gradio's request workers
+    job_manager = get_job_manager()
+    job_manager.register("crawl", _create_crawl_job(locales), cost={"network": 1, "cpu": 1})
+    job_manager.start()
     
     with gr.Blocks(css="footer {visibility: hidden}") as demo:
         current_lang = gr.State("zh")
+        current_job = gr.State(None)
         title = gr.Markdown("# 数据猫 WebUI")
         language_selector = gr.Radio(
             choices=list(locales.keys()),
@@ -615,10 +970,23 @@ def launch_webui(
             # Crawl tab
             with gr.TabItem("数据抓取"):
                 crawl_components = _create_crawl_tab_components()
-                crawl_components["start_button"].click(
+                # The crawl, download, action and export stages stream into the result box until the job ends
+                streaming = crawl_components["start_button"].click(
                     process_data,
                     inputs=_get_crawl_tab_inputs(crawl_components, current_lang),
+                    outputs=[crawl_components["result_output"], current_job],
+                ).then(
+                    stream_job,
+                    inputs=[current_job, current_lang],
                     outputs=crawl_components["result_output"],
+                    show_progress="hidden",
+                )
+                # A new crawl replaces the stream of the previous one
+                crawl_components["start_button"].click(None, cancels=[streaming])
+                crawl_components["tags_input"].change(
+                    tag_hint,
+                    inputs=[crawl_components["src_dropdown"], crawl_components["tags_input"], current_lang],
+                    outputs=crawl_components["tag_hint"],
                 )
             
             # Post-processing tab
@@ -0,0 +1,94 @@
+"""Shared fixtures for the benchmark suite.
+
+Benchmarks run on a synthetic image corpus generated locally from a fixed seed.
+Timings are normalized by a calibration workload measured in the same session,
+so the baselines in ``baselines.json`` carry across machines of different speed.
+
+Environment variables:
+    DATASET_CAT_BENCH_SCALE: Multiplier for the corpus size (default 1).
+    DATASET_CAT_BENCH_UPDATE: Set to 1 to record the current results as baselines.
+"""
+
+import io
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+import pytest
+from PIL import Image
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+SCALE = float(os.environ.get("DATASET_CAT_BENCH_SCALE", "1"))
+UPDATE_BASELINES = os.environ.get("DATASET_CAT_BENCH_UPDATE") == "1"
+
+# Sizes and formats cycled through when generating the corpus
+CORPUS_SIZES = [(512, 768), (1000, 1000), (1920, 1080), (777, 1333)]
+CORPUS_FORMATS = [("png", "PNG"), ("jpg", "JPEG"), ("webp", "WEBP")]
+
+
+def make_image(seed: int, size) -> Image.Image:
+    """Generate a deterministic RGB image with gradients and noise, which compresses like a real illustration."""
+    width, height = size
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    noise = rng.normal(0, 12, (height, width, 3)).astype(np.float32)
+    pixels = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1) + noise
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+
+
+@pytest.fixture(scope="session")
+def image_corpus(tmp_path_factory) -> List[Path]:
+    """Synthetic images spread over nested directories in several formats."""
+    root = tmp_path_factory.mktemp("corpus")
+    paths = []
+    for index in range(max(1, int(24 * SCALE))):
+        extension, image_format = CORPUS_FORMATS[index % len(CORPUS_FORMATS)]
+        directory = root / f"set{index % 4}" / ("nested" if index % 2 else "")
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"image_{index:04d}.{extension}"
+        make_image(index, CORPUS_SIZES[index % len(CORPUS_SIZES)]).save(path, format=image_format)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture(scope="session")
+def calibration() -> float:
+    """Median time of a fixed resize-and-encode workload on this machine, in seconds."""
+    image = make_image(0, (1024, 1024))
+    timings = []
+    for _ in range(7):
+        start = time.perf_counter()
+        image.resize((512, 512), Image.LANCZOS).save(io.BytesIO(), format="JPEG", quality=90)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+@pytest.fixture
+def check_regression(request, calibration) -> Callable:
+    """Compare a finished benchmark against its stored, calibration-relative baseline."""
+
+    def check(benchmark) -> None:
+        if benchmark.stats is None:
+            # Benchmarks are disabled, e.g. with --benchmark-disable
+            return
+        name = request.node.name
+        relative = benchmark.stats.stats.median / calibration
+        baselines = json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+        if UPDATE_BASELINES:
+            baselines["benchmarks"][name] = round(relative, 3)
+            BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+            return
+        baseline = baselines["benchmarks"].get(name)
+        if baseline is None:
+            return
+        limit = baseline * (1 + baselines["tolerance"])
+        assert relative <= limit, (
+            f"{name} regressed: {relative:.2f}x calibration vs baseline {baseline:.2f}x (limit {limit:.2f}x)"
+        )
+
+    return check
@@ -0,0 +1,339 @@
+"""Local stand-in for booru APIs used to benchmark crawling offline.
+
+The server answers the Danbooru (``/posts.json``), Gelbooru
+(``/index.php?page=dapi``) and Zerochan (``/<tag>?json``, ``/<id>?json``) API
+shapes with deterministic synthetic posts, and serves generated images under
+``/images/``. Latency, a global rate limit and random server errors can be
+injected to exercise concurrency and retry behavior.
+
+Run it standalone to point a crawler at it manually::
+
+    python tests/benchmarks/mock_booru.py --port 8765 --latency 0.05 --error-rate 0.02
+"""
+
+import argparse
+import io
+import json
+import random
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from PIL import Image
+
+ARTISTS = ["artist_a", "artist_b", "artist_c", "artist_d"]
+GENERAL_TAGS = ["1girl", "solo", "smile", "long_hair", "outdoors", "sky", "flower", "school_uniform"]
+
+
+def _int(value: Optional[str], default: int) -> int:
+    """Parse a numeric query parameter, falling back for missing or cursor-style values."""
+    return int(value) if value and value.isdigit() else default
+
+
+@lru_cache(maxsize=256)
+def render_image(post_id: int, width: int, height: int, image_format: str) -> bytes:
+    """Encode a deterministic gradient-and-noise image for a post."""
+    rng = np.random.default_rng(post_id)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    pixels = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1) + rng.normal(0, 12, (height, width, 3))
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, quality=90)
+    return buffer.getvalue()
+
+
+class MockBooruServer:
+    """Threaded HTTP server emulating booru APIs with configurable faults."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        post_count: int = 500,
+        image_size: Tuple[int, int] = (768, 1024),
+        latency: float = 0.0,
+        rate_limit: Optional[float] = None,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the server without starting it.
+
+        Args:
+            host: Bind address.
+            port: Port, 0 to pick a free one.
+            post_count: Number of posts every tag search returns in total.
+            image_size: Width and height of served images.
+            latency: Delay added to every response in seconds.
+            rate_limit: Maximum requests per second across all clients; excess requests get HTTP 429.
+            error_rate: Probability that a request fails with HTTP 500 or 503.
+            seed: Seed for error injection.
+        """
+        self.post_count = post_count
+        self.image_size = image_size
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rate_limit or 0.0
+        self._last_refill = time.monotonic()
+        handler = type("Handler", (_MockBooruHandler,), {"server_state": self})
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockBooruServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-booru", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockBooruServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def admit(self, route: str) -> Optional[int]:
+        """Account for a request and decide whether to fault it.
+
+        Args:
+            route: Route name for request statistics.
+
+        Returns:
+            An HTTP error status to return instead of the response, or None.
+        """
+        with self._lock:
+            self.requests[route] += 1
+            if self.rate_limit:
+                now = time.monotonic()
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._last_refill) * self.rate_limit)
+                self._last_refill = now
+                if self._tokens < 1:
+                    return 429
+                self._tokens -= 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self._random.choice([500, 503])
+        return None
+
+    def post(self, post_id: int) -> Dict[str, Any]:
+        """Source-neutral description of a synthetic post."""
+        width, height = self.image_size
+        extension = "png" if post_id % 3 == 0 else "jpg"
+        return {
+            "id": post_id,
+            "width": width,
+            "height": height,
+            "ext": extension,
+            "md5": f"{post_id:032x}",
+            "artist": ARTISTS[post_id % len(ARTISTS)],
+            "tags": [GENERAL_TAGS[(post_id + offset) % len(GENERAL_TAGS)] for offset in range(4)],
+            "url": f"{self.url}/images/{post_id}.{extension}",
+            "sample_url": f"{self.url}/images/{post_id}_sample.jpg",
+        }
+
+    def page(self, page: int, limit: int) -> List[Dict[str, Any]]:
+        """Posts on a 1-based result page, newest first."""
+        start = (page - 1) * limit
+        ids = range(self.post_count - start, max(self.post_count - start - limit, 0), -1)
+        return [self.post(post_id) for post_id in ids]
+
+
+class _MockBooruHandler(BaseHTTPRequestHandler):
+    server_state: MockBooruServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        state = self.server_state
+        parsed = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query, keep_blank_values=True).items()}
+        route = self._route_name(parsed.path, query)
+        if state.latency:
+            time.sleep(state.latency)
+        status = state.admit(route)
+        if status is not None:
+            self._send(status, b"{}", "application/json", {"Retry-After": "1"} if status == 429 else None)
+            return
+
+        if route == "image":
+            self._serve_image(parsed.path)
+        elif route == "danbooru":
+            page = _int(query.get("page"), 1)
+            limit = _int(query.get("limit"), 20)
+            self._send_json([self._danbooru_post(post) for post in state.page(page, limit)])
+        elif route == "gelbooru":
+            # Gelbooru pages are 0-based
+            page = _int(query.get("pid"), 0) + 1
+            limit = _int(query.get("limit"), 100)
+            posts = [self._gelbooru_post(post) for post in state.page(page, limit)]
+            attributes = {"limit": limit, "offset": (page - 1) * limit, "count": state.post_count}
+            self._send_json({"@attributes": attributes, "post": posts})
+        elif route == "zerochan_post":
+            self._send_json(self._zerochan_post(state.post(int(parsed.path.strip("/")))))
+        elif route == "zerochan_search":
+            page = _int(query.get("p"), 1)
+            limit = _int(query.get("l"), 24)
+            self._send_json({"items": [self._zerochan_item(post) for post in state.page(page, limit)]})
+        else:
+            self._send(404, b"{}", "application/json")
+
+    @staticmethod
+    def _route_name(path: str, query: Dict[str, str]) -> str:
+        if path.startswith("/images/"):
+            return "image"
+        if path.rstrip("/") == "/posts.json":
+            return "danbooru"
+        if path.rstrip("/") == "/index.php" and query.get("page") == "dapi":
+            return "gelbooru"
+        if "json" in query and path.strip("/").isdigit():
+            return "zerochan_post"
+        if "json" in query and path.strip("/"):
+            return "zerochan_search"
+        return "unknown"
+
+    def _serve_image(self, path: str) -> None:
+        name = path.rsplit("/", 1)[-1]
+        stem, _, extension = name.partition(".")
+        post_id = int(stem.split("_", 1)[0])
+        width, height = self.server_state.image_size
+        if stem.endswith("_sample"):
+            width, height = width // 2, height // 2
+        image_format = "PNG" if extension == "png" else "JPEG"
+        self._send(200, render_image(post_id, width, height, image_format), f"image/{extension.replace('jpg', 'jpeg')}")
+
+    @staticmethod
+    def _danbooru_post(post: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": post["id"],
+            "md5": post["md5"],
+            "file_ext": post["ext"],
+            "file_url": post["url"],
+            "large_file_url": post["sample_url"],
+            "preview_file_url": post["sample_url"],
+            "image_width": post["width"],
+            "image_height": post["height"],
+            "rating": "g",
+            "score": post["id"] % 100,
+            "tag_string": " ".join(post["tags"] + [post["artist"]]),
+            "tag_string_general": " ".join(post["tags"]),
+            "tag_string_artist": post["artist"],
+            "tag_string_character": "",
+            "tag_string_copyright": "original",
+            "media_asset": {
+                "variants": [
+                    {
+                        "type": "original",
+                        "url": post["url"],
+                        "width": post["width"],
+                        "height": post["height"],
+                        "file_ext": post["ext"],
+                    },
+                    {
+                        "type": "sample",
+                        "url": post["sample_url"],
+                        "width": post["width"] // 2,
+                        "height": post["height"] // 2,
+                        "file_ext": "jpg",
+                    },
+                ]
+            },
+        }
+
+    @staticmethod
+    def _gelbooru_post(post: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": post["id"],
+            "md5": post["md5"],
+            "file_url": post["url"],
+            "sample_url": post["sample_url"],
+            "image": f"{post['md5']}.{post['ext']}",
+            "width": post["width"],
+            "height": post["height"],
+            "rating": "general",
+            "score": post["id"] % 100,
+            "tags": " ".join(post["tags"] + [f"artist:{post['artist']}"]),
+        }
+
+    @staticmethod
+    def _zerochan_item(post: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": post["id"],
+            "width": post["width"],
+            "height": post["height"],
+            "thumbnail": post["sample_url"],
+            "source": "",
+            "tag": post["tags"][0],
+            "tags": post["tags"] + [post["artist"]],
+        }
+
+    @staticmethod
+    def _zerochan_post(post: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": post["id"],
+            "width": post["width"],
+            "height": post["height"],
+            "md5": post["md5"],
+            "full": post["url"],
+            "large": post["sample_url"],
+            "medium": post["sample_url"],
+            "primary": post["tags"][0],
+            "tags": post["tags"] + [post["artist"]],
+        }
+
+    def _send_json(self, payload: Any) -> None:
+        self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        with self.server_state._lock:
+            self.server_state.statuses[status] += 1
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve mock booru APIs for offline crawl benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--posts", type=int, default=500, help="Posts returned per tag search")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay added to each response in seconds")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second before HTTP 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of HTTP 500/503 responses")
+    args = parser.parse_args()
+
+    server = MockBooruServer(
+        args.host, args.port, args.posts, latency=args.latency, rate_limit=args.rate_limit, error_rate=args.error_rate
+    ).start()
+    print(f"Mock booru listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
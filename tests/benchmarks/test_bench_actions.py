@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("waifuc")
+
+from PIL import Image
+from waifuc.model import ImageItem
+
+from dataset_cat.core.actions import CropToDivisibleAction, FileSizeFilterAction, ImageCompressionAction
+from dataset_cat.core.cache import TwoLevelCache
+from dataset_cat.postprocessing_ui import _discover_image_files
+
+
+@pytest.fixture(scope="module")
+def image_items(image_corpus):
+    items = []
+    for path in image_corpus:
+        with Image.open(path) as image:
+            image.load()
+            items.append(ImageItem(image, {"filename": path.name}))
+    return items
+
+
+def test_crop_to_divisible(benchmark, check_regression, image_items):
+    action = CropToDivisibleAction(64)
+    results = benchmark(lambda: [action.process(item) for item in image_items])
+    assert all(item.image.width % 64 == 0 and item.image.height % 64 == 0 for item in results)
+    check_regression(benchmark)
+
+
+def test_smart_crop_to_divisible_cached(benchmark, check_regression, image_items):
+    pytest.importorskip("cv2")
+    from dataset_cat.core.smart_crop import SmartCropper
+
+    action = CropToDivisibleAction(64, smart_crop=False)
+    action.cropper = SmartCropper(cache=TwoLevelCache(), face_model="")
+    # Warm the focus map cache; later runs at any divisor only place crops
+    [action.process(item) for item in image_items]
+    analyzed = action.cropper.cache.misses
+    results = benchmark(lambda: [action.process(item) for item in image_items])
+    assert all(item.image.width % 64 == 0 and item.image.height % 64 == 0 for item in results)
+    assert action.cropper.cache.misses == analyzed
+    check_regression(benchmark)
+
+
+@pytest.mark.parametrize("formats", [["JPEG"], ["JPEG", "WEBP", "AVIF"]], ids=["jpeg", "all"])
+def test_image_compression(benchmark, check_regression, image_items, formats):
+    # Target below every PNG in the corpus so each one goes through the quality search
+    action = ImageCompressionAction(target_size_mb=0.1, formats=formats)
+    items = [item for item in image_items if item.image.format == "PNG"][:6]
+    results = benchmark.pedantic(lambda: [action.process(item) for item in items], rounds=3, iterations=1)
+    assert all(item.meta["save_cfg"]["format"] in formats for item in results)
+    check_regression(benchmark)
+
+
+def test_file_size_filter(benchmark, check_regression, image_items):
+    action = FileSizeFilterAction(max_size_mb=2.0, min_size_mb=0.01)
+    results = benchmark(lambda: [action.check(item) for item in image_items])
+    assert len(results) == len(image_items)
+    check_regression(benchmark)
+
+
+def test_discover_image_files(benchmark, check_regression, image_corpus):
+    root = image_corpus[0].parents[1]
+    files = benchmark(_discover_image_files, str(root))
+    assert len(files) == len(image_corpus)
+    check_regression(benchmark)
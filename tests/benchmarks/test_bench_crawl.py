@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("waifuc")
+
+from mock_booru import MockBooruServer
+
+from dataset_cat.core.config import config
+from dataset_cat.crawler import Crawler
+
+CRAWL_LIMIT = 20
+
+
+@pytest.fixture(scope="module")
+def mock_booru():
+    # A little latency makes request concurrency and connection reuse visible in the timings
+    with MockBooruServer(post_count=200, image_size=(512, 512), latency=0.01) as server:
+        yield server
+
+
+@pytest.fixture
+def site_urls(monkeypatch, mock_booru):
+    urls = {name: mock_booru.url for name in ("Danbooru", "Gelbooru", "Zerochan")}
+    monkeypatch.setitem(config._config["fetcher"], "site_urls", urls)
+    return urls
+
+
+@pytest.mark.parametrize("source_name", ["Danbooru", "Gelbooru", "Zerochan"])
+def test_start_crawl(benchmark, check_regression, site_urls, source_name):
+    def crawl():
+        return Crawler.start_crawl(source_name, "1girl", CRAWL_LIMIT, "Original", False)
+
+    source, message = benchmark.pedantic(crawl, rounds=3, iterations=1)
+    assert source is not None, message
+    assert len(source) == CRAWL_LIMIT
+    check_regression(benchmark)
+
+
+def test_download_images(benchmark, check_regression, mock_booru, tmp_path):
+    posts = [mock_booru.post(post_id) for post_id in range(1, CRAWL_LIMIT + 1)]
+    items = [(post["id"], post["url"], {"filename": f"{post['id']}.{post['ext']}"}) for post in posts]
+
+    result = benchmark.pedantic(Crawler.download_images, args=(items, str(tmp_path)), rounds=3, iterations=1)
+    assert result == f"Images downloaded to {tmp_path}"
+    assert len(list(tmp_path.iterdir())) == CRAWL_LIMIT
+    check_regression(benchmark)
@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("waifuc")
+
+from PIL import Image
+from waifuc.model import ImageItem
+
+from dataset_cat.webui import export_data, extract_author_info
+
+# Metadata shapes produced by the supported sources, one per author extractor
+SOURCE_METAS = [
+    {"danbooru": {"tag_string_artist": "artist_a artist_b"}},
+    {"safebooru": {"tag_string_artist": "artist_c"}},
+    {"zerochan": {"tags": ["Hatsune Miku", "vocaloid", "artistname"]}},
+    {"pixiv": {"user": {"name": "pixiv_user"}}},
+    {"gelbooru": {"tags": "1girl artist:someone solo"}},
+    {"tags": {"artist:generic": 1.0}},
+    {"unknown_source": {"id": 1}},
+]
+
+
+@pytest.fixture(scope="module")
+def export_items(image_corpus):
+    items = []
+    for index, path in enumerate(image_corpus):
+        with Image.open(path) as image:
+            image.load()
+            meta = dict(SOURCE_METAS[index % len(SOURCE_METAS)], filename=f"{path.stem}.png")
+            items.append(ImageItem(image, meta))
+    return items
+
+
+def test_export_data_save_exporter(benchmark, check_regression, export_items, tmp_path):
+    output_dir = str(tmp_path / "export")
+    result = benchmark.pedantic(
+        export_data,
+        args=(export_items, output_dir, True, True, "SaveExporter"),
+        rounds=3,
+        iterations=1,
+    )
+    assert result == "Data exported successfully."
+    check_regression(benchmark)
+
+
+def test_extract_author_info(benchmark, check_regression, export_items):
+    # Metadata-only workload, so repeat the items to get a measurable batch
+    items = export_items * 50
+    authors = benchmark(lambda: [extract_author_info(item) for item in items])
+    assert "artist_a, artist_b" in authors and "Unknown" in authors
+    check_regression(benchmark)
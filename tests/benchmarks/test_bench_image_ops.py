@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("cv2")
+
+from PIL import Image
+
+from dataset_cat.core.image_ops import get_image_ops
+
+BACKENDS = ["pil", "opencv"]
+
+
+@pytest.fixture(scope="module")
+def images(image_corpus):
+    loaded = []
+    for path in image_corpus:
+        with Image.open(path) as image:
+            loaded.append(image.convert("RGB"))
+    return loaded
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_resize(benchmark, check_regression, images, backend):
+    ops = get_image_ops(backend)
+
+    sizes = [(image.width * 512 // max(image.size), image.height * 512 // max(image.size)) for image in images]
+    results = benchmark(lambda: [ops.resize(image, size) for image, size in zip(images, sizes)])
+    assert all(max(image.size) == 512 for image in results)
+    check_regression(benchmark)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_crop(benchmark, check_regression, images, backend):
+    ops = get_image_ops(backend)
+    results = benchmark(lambda: [ops.crop(image, (7, 5, image.width - 9, image.height - 3)) for image in images])
+    assert len(results) == len(images)
+    check_regression(benchmark)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_convert(benchmark, check_regression, images, backend):
+    ops = get_image_ops(backend)
+    rgba = [image.convert("RGBA") for image in images]
+    results = benchmark(lambda: [ops.convert(image, "RGB", "white") for image in rgba])
+    assert all(image.mode == "RGB" for image in results)
+    check_regression(benchmark)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_derivative_chain(benchmark, check_regression, images, backend):
+    from dataset_cat.core.derivatives import generate_derivatives, parse_variants
+
+    ops = get_image_ops(backend)
+    variants = parse_variants("512, 768, 1024")
+    results = benchmark(lambda: [list(generate_derivatives(image, variants, ops)) for image in images])
+    assert all(len(derivatives) == 3 for derivatives in results)
+    check_regression(benchmark)
@@ -0,0 +1,12 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from dataset_cat.core.utils import calculate_image_statistics
+
+
+def test_calculate_image_statistics(benchmark, check_regression, image_corpus):
+    paths = [str(path) for path in image_corpus]
+    result = benchmark(calculate_image_statistics, paths)
+    assert result["count"] == len(paths)
+    check_regression(benchmark)
@@ -0,0 +1,53 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+from mock_booru import MockBooruServer
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def test_api_shapes_and_images():
+    with MockBooruServer(post_count=30) as server:
+        status, body = _get(f"{server.url}/posts.json?tags=1girl&page=2&limit=10")
+        posts = json.loads(body)
+        assert status == 200
+        assert [post["id"] for post in posts] == list(range(20, 10, -1))
+        assert posts[0]["tag_string_artist"]
+
+        _, body = _get(f"{server.url}/index.php?page=dapi&s=post&q=index&json=1&tags=1girl&pid=0&limit=5")
+        assert len(json.loads(body)["post"]) == 5
+
+        _, body = _get(f"{server.url}/1girl?json&p=1&l=4")
+        assert len(json.loads(body)["items"]) == 4
+        _, body = _get(f"{server.url}/7?json")
+        assert json.loads(body)["full"].endswith("/images/7.jpg")
+
+        status, body = _get(posts[0]["file_url"])
+        assert status == 200 and len(body) > 1000
+        assert server.requests["image"] == 1
+
+
+def test_fault_injection():
+    with MockBooruServer(rate_limit=2, error_rate=0.0) as server:
+        statuses = [_get(f"{server.url}/posts.json")[0] for _ in range(5)]
+        assert 429 in statuses
+
+    with MockBooruServer(error_rate=1.0) as server:
+        assert _get(f"{server.url}/posts.json")[0] in (500, 503)
+
+
+@pytest.mark.parametrize("latency", [0.05])
+def test_latency(latency):
+    with MockBooruServer(latency=latency) as server:
+        start = time.perf_counter()
+        _get(f"{server.url}/posts.json")
+        assert time.perf_counter() - start >= latency
@@ -0,0 +1,109 @@
+import json
+
+import numpy as np
+from PIL import Image
+from waifuc.model import ImageItem
+
+from dataset_cat.core.actions import AspectRatioBucketAction
+from dataset_cat.core.bucketing import (
+    MANIFEST_NAME,
+    BucketAssignment,
+    candidate_buckets,
+    crop_plan,
+    nearest_buckets,
+    select_buckets,
+)
+from dataset_cat.core.progress import ProgressTracker
+from dataset_cat.postprocessing_ui import _process_directory
+
+
+def _dataset(count=500, seed=0):
+    rng = np.random.default_rng(seed)
+    ratios = np.exp(rng.normal(0, 0.4, count))
+    widths = np.round(800 * np.sqrt(ratios)).astype(int)
+    heights = np.round(800 / np.sqrt(ratios)).astype(int)
+    return widths, heights
+
+
+def test_candidate_buckets_have_similar_area():
+    buckets = candidate_buckets(1024, 64)
+    assert (buckets % 64 == 0).all()
+    areas = buckets.prod(axis=1)
+    assert (areas <= 1024 * 1024).all() and (areas >= 0.9 * 1024 * 1024).all()
+    assert [1024, 1024] in buckets.tolist()
+    ratios = buckets[:, 0] / buckets[:, 1]
+    assert (np.diff(ratios) > 0).all()
+    # Portrait and landscape buckets mirror each other
+    assert sorted(map(tuple, buckets[:, ::-1].tolist())) == sorted(map(tuple, buckets.tolist()))
+
+
+def test_nearest_buckets_matches_brute_force():
+    widths, heights = _dataset()
+    buckets = candidate_buckets(512, 32)
+    indices = nearest_buckets(widths, heights, buckets)
+    distances = np.abs(np.log(widths / heights)[:, None] - np.log(buckets[:, 0] / buckets[:, 1])[None, :])
+    assert np.allclose(distances[np.arange(len(widths)), indices], distances.min(axis=1))
+
+
+def test_select_buckets_respects_limits():
+    widths, heights = _dataset()
+    candidates = candidate_buckets(1024, 64)
+    selected = select_buckets(widths, heights, candidates, max_buckets=5, min_bucket_size=20)
+    assert 1 <= len(selected) <= 5
+    counts = np.bincount(nearest_buckets(widths, heights, selected), minlength=len(selected))
+    assert counts.sum() == len(widths) and counts.min() >= 20
+    assert len(select_buckets([], [], candidates)) == 0
+
+
+def test_crop_plan_covers_bucket():
+    widths, heights = _dataset(100)
+    buckets = candidate_buckets(256, 32)
+    sizes = buckets[nearest_buckets(widths, heights, buckets)]
+    scaled, crops = crop_plan(widths, heights, sizes)
+    assert (scaled >= sizes).all()
+    assert (crops[:, 2:] - crops[:, :2] == sizes).all()
+    assert (crops[:, :2] >= 0).all() and (crops[:, 2:] <= scaled).all()
+
+
+def test_write_manifests(tmp_path):
+    widths, heights = _dataset(50)
+    keys = [f"{i}.png" for i in range(50)]
+    buckets = select_buckets(widths, heights, candidate_buckets(512, 64), min_bucket_size=5)
+    assignment = BucketAssignment(keys, widths, heights, buckets)
+    path = assignment.write_manifests(tmp_path, keys[:40])
+    index = json.loads(path.read_text())
+    assert sum(bucket["count"] for bucket in index["buckets"]) == 40
+    listed = []
+    for bucket in index["buckets"]:
+        lines = (tmp_path / bucket["manifest"]).read_text().splitlines()
+        assert len(lines) == bucket["count"]
+        listed += [json.loads(line)["file"] for line in lines]
+    assert sorted(listed) == sorted(keys[:40])
+
+
+def test_action_outputs_bucket_size():
+    action = AspectRatioBucketAction(256, step=32, max_buckets=0, min_bucket_size=1, backend="pil")
+    action.fit(["wide.png", "tall.png"], [400, 150], [200, 300])
+    wide = action.process(ImageItem(Image.new("RGB", (400, 200)), {"filename": "wide.png"}))
+    assert wide.image.size == tuple(wide.meta["bucket"])
+    assert wide.image.width > wide.image.height
+    # Unplanned images go to the nearest fitted bucket
+    other = action.process(ImageItem(Image.new("RGB", (90, 200)), {}))
+    assert list(other.image.size) == other.meta["bucket"]
+    assert other.meta["bucket"] in action.buckets.tolist()
+
+
+def test_process_directory_writes_manifests(tmp_path):
+    source = tmp_path / "in"
+    source.mkdir()
+    for i, size in enumerate([(300, 200), (310, 190), (200, 300), (190, 320)]):
+        Image.new("RGB", size, (i * 40, 0, 0)).save(source / f"{i}.png")
+    action = AspectRatioBucketAction(128, step=16, min_bucket_size=2, backend="pil")
+    results = list(_process_directory(str(source), str(tmp_path / "out"), [action], ProgressTracker()))
+    assert results[-1] == (4, 4, 4)
+    index = json.loads((tmp_path / "out" / MANIFEST_NAME).read_text())
+    assert [bucket["count"] for bucket in index["buckets"]] == [2, 2]
+    for bucket in index["buckets"]:
+        for line in (tmp_path / "out" / bucket["manifest"]).read_text().splitlines():
+            with Image.open(tmp_path / "out" / json.loads(line)["file"]) as image:
+                assert image.size == (bucket["width"], bucket["height"])
@@ -0,0 +1,102 @@
+import io
+import json
+
+import numpy as np
+import pytest
+from PIL import Image, features
+from waifuc.model import ImageItem
+
+from dataset_cat.core.actions import AspectRatioBucketAction, ImageCompressionAction
+from dataset_cat.core.compression import CODECS, TargetSizeCompressor, available_formats
+from dataset_cat.core.progress import ProgressTracker
+from dataset_cat.postprocessing_ui import _process_directory
+
+
+def _image(size=(400, 300), seed=0, alpha=False):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, size[0])[None, :, None]
+    y = np.linspace(0, 255, size[1])[:, None, None]
+    pixels = np.concatenate([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1) + rng.normal(0, 20, (size[1], size[0], 3))
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+    if alpha:
+        mask = np.zeros((size[1], size[0]), dtype=np.uint8)
+        mask[size[1] // 4 : -size[1] // 4, size[0] // 4 : -size[0] // 4] = 255
+        image.putalpha(Image.fromarray(mask))
+    return image
+
+
+def test_available_formats():
+    assert available_formats(["jpg", "png", "JPEG"]) == ["JPEG"]
+    expected = ["JPEG"] + [name for name, feature in [("WEBP", "webp"), ("AVIF", "avif")] if features.check(feature)]
+    assert available_formats(["JPEG", "WEBP", "AVIF"]) == expected
+    with pytest.raises(ValueError):
+        TargetSizeCompressor(1000, ["GIF"])
+
+
+@pytest.mark.parametrize("formats", [["JPEG"], ["JPEG", "WEBP", "AVIF"]])
+def test_compressor_fits_target_within_budget(formats):
+    compressor = TargetSizeCompressor(20_000, formats, max_encodes=9)
+    for seed in range(3):
+        encodes = compressor.encodes
+        result = compressor.compress(_image(seed=seed))
+        assert result.size <= 20_000
+        assert result.image_format in formats
+        assert compressor.encodes - encodes <= 9
+        with Image.open(io.BytesIO(result.data)) as decoded:
+            assert decoded.format == result.image_format and decoded.size == (400, 300)
+
+
+def test_search_beats_lower_qualities():
+    compressor = TargetSizeCompressor(20_000, ["JPEG"], max_encodes=20)
+    result = compressor.compress(_image())
+    # The next quality up would no longer fit
+    assert len(CODECS["JPEG"].encode(result.image, result.quality + 1)) > 20_000
+
+
+def test_alpha_is_kept_where_the_format_allows():
+    image = _image(alpha=True)
+    formats = available_formats(["JPEG", "WEBP", "AVIF"])
+    if len(formats) > 1:
+        result = TargetSizeCompressor(30_000, formats).compress(image)
+        assert CODECS[result.image_format].alpha and result.image.mode == "RGBA"
+    # Without an alpha-capable format, transparency is flattened onto the background
+    result = TargetSizeCompressor(30_000, ["JPEG"]).compress(image)
+    assert result.image.mode == "RGB" and result.image.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_unreachable_target_returns_smallest_encoding():
+    result = TargetSizeCompressor(100, ["JPEG"], quality_range=(20, 95), max_encodes=8).compress(_image())
+    assert result.size > 100 and result.quality == 20
+
+
+def test_action_records_choice_in_meta():
+    action = ImageCompressionAction(target_size_mb=20_000 / 1024 / 1024, formats=["JPEG"])
+    item = action.process(ImageItem(_image(), {"filename": "a.png", "save_cfg": {"exif": b""}}))
+    assert item.meta["filename"] == "a.jpg"
+    assert item.meta["save_cfg"]["format"] == "JPEG" and item.meta["save_cfg"]["exif"] == b""
+    small = ImageItem(_image((16, 16)), {"filename": "b.png"})
+    assert ImageCompressionAction(target_size_mb=1.0).process(small) is small
+
+
+def test_process_directory_saves_compressed_format(tmp_path):
+    source = tmp_path / "in"
+    source.mkdir()
+    for index in range(3):
+        _image(seed=index).save(source / f"{index}.png")
+    pipeline = [
+        AspectRatioBucketAction(256, step=32, min_bucket_size=1, backend="pil"),
+        ImageCompressionAction(target_size_mb=15_000 / 1024 / 1024, formats=["JPEG"]),
+    ]
+    results = list(_process_directory(str(source), str(tmp_path / "out"), pipeline, ProgressTracker()))
+    assert results[-1] == (3, 3, 3)
+    outputs = sorted(path.name for path in (tmp_path / "out").glob("*.jpg"))
+    assert outputs == ["0.jpg", "1.jpg", "2.jpg"]
+    assert all((tmp_path / "out" / name).stat().st_size <= 15_000 for name in outputs)
+    # Bucket manifests list the files under the names they were saved as
+    index = json.loads((tmp_path / "out" / "buckets.json").read_text())
+    listed = [
+        json.loads(line)["file"]
+        for bucket in index["buckets"]
+        for line in (tmp_path / "out" / bucket["manifest"]).read_text().splitlines()
+    ]
+    assert sorted(listed) == outputs
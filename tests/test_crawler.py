@@ -1,5 +1,14 @@
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
-from dataset_cat.crawler import Crawler
+from PIL import Image
+
+from dataset_cat.core.config import config
+from dataset_cat.crawler import Crawler, _iter_listing
+from waifuc.source import WebDataSource
 
 def mock_source_generator():
     yield {"id": 1, "url": "http://example.com/image1.jpg"}
@@ -41,4 +50,87 @@ def test_limit_exceeds(mock_sources):
     source, message = Crawler.start_crawl("Danbooru", "tag1,tag2", 10, "large", False)
     assert source is not None
     assert len(source) == 2  # Mock source only has 2 items
-    assert message == "Crawl task initialized."
\ No newline at end of file
+    assert message == "Crawl task initialized."
+
+@pytest.fixture
+def image_site(tmp_path):
+    root = tmp_path / "site"
+    root.mkdir()
+    for index in range(4):
+        Image.new("RGB", (8, 8), (index * 60, 0, 0)).save(root / f"{index}.png")
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(root))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_failed_downloads_do_not_count_toward_limit(tmp_path, image_site, monkeypatch):
+    class ListingSource(WebDataSource):
+        def __init__(self, names):
+            self.names = names
+
+        def _iter_data(self):
+            for index, name in enumerate(self.names):
+                yield index, f"{image_site}/{name}", {"filename": name}
+
+    temp_dir = tmp_path / "temp"
+    temp_dir.mkdir()
+    monkeypatch.setattr(config, "get_temp_dir", lambda: str(temp_dir))
+    monkeypatch.setitem(config._config["fetcher"], "retry_count", 0)
+    source = ListingSource(["missing.png", "0.png", "gone.png", "1.png", "2.png", "3.png"])
+    items, message = Crawler._crawl_with_httpx(source, _iter_listing(source), "Test", 3)
+    assert sorted(item.meta["filename"] for item in items) == ["0.png", "1.png", "2.png"]
+    assert message.endswith("2 downloads failed.")
+    assert items[0].image.getpixel((0, 0))[1:] == (0, 0)
+    # The temporary download directory is removed once the images are loaded
+    assert list(temp_dir.iterdir()) == []
+    assert _iter_listing(object()) is None
+
+
+def test_cancelled_crawl_stops_fetching(tmp_path, image_site, monkeypatch):
+    class ListingSource(WebDataSource):
+        def __init__(self):
+            pass
+
+        def _iter_data(self):
+            for index in range(4):
+                yield index, f"{image_site}/{index}.png", {"filename": f"{index}.png"}
+
+    monkeypatch.setattr(config, "get_temp_dir", lambda: str(tmp_path))
+    source = ListingSource()
+    # Cancelled after the first post was issued
+    checks = iter([False])
+    items, _ = Crawler._crawl_with_httpx(source, _iter_listing(source), "Test", 4, cancelled=lambda: next(checks, True))
+    assert [item.meta["filename"] for item in items] == ["0.png"]
+    items, _ = Crawler._crawl_with_httpx(source, _iter_listing(source), "Test", 4, cancelled=lambda: True)
+    assert items == []
+
+
+def test_crawl_into_download_dir_defers_decoding(tmp_path, image_site, monkeypatch):
+    from PIL import ImageFile
+
+    from dataset_cat.core.exporters import export_passthrough
+    from dataset_cat.core.file_items import FileItems
+
+    class ListingSource(WebDataSource):
+        def __init__(self):
+            pass
+
+        def _iter_data(self):
+            for index in range(3):
+                yield index, f"{image_site}/{index}.png", {"filename": f"{index}.png"}
+
+    source = ListingSource()
+    download_dir = tmp_path / "downloads"
+    items, _ = Crawler._crawl_with_httpx(source, _iter_listing(source), "Test", 2, download_dir=str(download_dir))
+    assert isinstance(items, FileItems) and len(items) == 2
+    # Without actions the downloaded files are copied to the output as they are
+    monkeypatch.setattr(ImageFile.ImageFile, "load", lambda self: pytest.fail("decoded a passthrough item"))
+    for item in items:
+        assert export_passthrough(item, str(tmp_path / "out"), save_meta=False)
+        item.image.close()
+    for name in items.paths():
+        exported = tmp_path / "out" / os.path.basename(name)
+        assert exported.read_bytes() == (download_dir / os.path.basename(name)).read_bytes()
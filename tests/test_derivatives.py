@@ -0,0 +1,83 @@
+import pytest
+from PIL import Image
+
+from dataset_cat.core.derivatives import VariantSpec, generate_derivatives, parse_variants
+from dataset_cat.core.image_ops import PILImageOps
+from dataset_cat.core.packed_store import PackedImageStore
+from dataset_cat.core.progress import ProgressTracker
+from dataset_cat.postprocessing_ui import _process_directory
+
+
+def test_parse_variants():
+    variants = parse_variants("512, 768:webp 1024:JPG")
+    assert [(v.size, v.image_format, v.name) for v in variants] == [
+        (512, None, "512"),
+        (768, "webp", "768_webp"),
+        (1024, "jpg", "1024_jpg"),
+    ]
+    assert parse_variants(["256", "256:png"])[1].name == "256_png"
+    assert parse_variants("") == []
+    for invalid in ["512px", "512:gif", "0", "512, 512"]:
+        with pytest.raises(ValueError):
+            parse_variants(invalid)
+
+
+def test_variant_target_size_and_names():
+    variant = VariantSpec(512, "webp")
+    assert variant.target_size(2048, 1024) == (512, 256)
+    assert variant.target_size(300, 200) == (300, 200)
+    assert variant.output_name("a.b.png") == "a.b.webp"
+    assert VariantSpec(512).output_name("a.png") == "a.png"
+
+
+def test_derivatives_follow_downscale_chain():
+    sources = []
+
+    class RecordingOps(PILImageOps):
+        def resize(self, image, size, resample=Image.BICUBIC):
+            sources.append(image.size)
+            return super().resize(image, size, resample)
+
+    image = Image.new("RGB", (2000, 1000))
+    results = list(generate_derivatives(image, parse_variants("512, 1024, 768"), RecordingOps()))
+    assert [(variant.size, derivative.size) for variant, derivative in results] == [
+        (1024, (1024, 512)),
+        (768, (768, 384)),
+        (512, (512, 256)),
+    ]
+    # Every step resizes the previous derivative rather than the source
+    assert sources == [(2000, 1000), (1024, 512), (768, 384)]
+
+
+def test_jpeg_variant_flattens_alpha():
+    image, params = VariantSpec(64, "jpg").save_params(Image.new("RGBA", (8, 8), (0, 0, 0, 0)))
+    assert image.mode == "RGB" and image.getpixel((0, 0)) == (255, 255, 255)
+    assert params["format"] == "JPEG"
+    image, params = VariantSpec(64, "webp").save_params(Image.new("LA", (8, 8)))
+    assert image.mode == "RGBA" and params["format"] == "WEBP"
+
+
+@pytest.mark.parametrize("pack_output", [False, True])
+def test_process_directory_writes_variants(tmp_path, pack_output):
+    source = tmp_path / "in"
+    source.mkdir()
+    for index in range(3):
+        Image.new("RGBA", (1200, 900), (index * 60, 0, 0, 128)).save(source / f"{index}.png")
+    progress = ProgressTracker()
+    variants = parse_variants("256, 512:jpg")
+    results = list(_process_directory(str(source), str(tmp_path / "out"), [], progress, pack_output, variants))
+    assert results[-1] == (3, 3, 3)
+    # One decode per source image serves every variant
+    stages = {stage["stage"]: stage for stage in progress.snapshot()["stages"]}
+    assert stages["decode"]["items"] == 3 and stages["variant:256"]["items"] == 3
+    if pack_output:
+        with PackedImageStore(tmp_path / "out" / "512_jpg") as store:
+            assert sorted(store.keys()) == ["0", "1", "2"]
+            assert store.format("0") == "jpg"
+            assert store.open_image("0").size == (512, 384)
+        return
+    assert not list((tmp_path / "out").glob("*.png"))
+    with Image.open(tmp_path / "out" / "256" / "1.png") as image:
+        assert image.size == (256, 192) and image.mode == "RGBA"
+    with Image.open(tmp_path / "out" / "512_jpg" / "1.jpg") as image:
+        assert image.size == (512, 384) and image.format == "JPEG"
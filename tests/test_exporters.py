@@ -0,0 +1,152 @@
+import hashlib
+import json
+import tarfile
+
+import pytest
+from PIL import Image
+from waifuc.model import ImageItem
+
+from dataset_cat.core.exporters import (
+    PackedStoreExporter,
+    ParquetExporter,
+    WebDatasetExporter,
+    export_passthrough,
+    passthrough_path,
+)
+from dataset_cat.core.packed_store import PackedImageStore
+from dataset_cat.core.progress import ProgressTracker
+from dataset_cat.webui import export_data
+
+
+def _item(index):
+    image = Image.new("RGB", (32, 32), (index * 10 % 256, 0, 0))
+    return ImageItem(image, {"filename": f"{index}.png", "tags": {"1girl": 0.9, "solo": 0.8}, "id": index})
+
+
+def test_webdataset_shards_group_files_per_key(tmp_path):
+    with WebDatasetExporter(str(tmp_path), max_count=3, workers=2) as exporter:
+        for index in range(10):
+            exporter.export_item(_item(index))
+
+    shards = sorted(tmp_path.glob("shard-*.tar"))
+    # Two writers with five items each, three items per shard
+    assert len(shards) == len(exporter.shard_paths) == 4
+    members = {}
+    for shard in shards:
+        with tarfile.open(shard) as tar:
+            names = tar.getnames()
+            assert len(names) <= 3 * 3
+            for name in names:
+                members[name] = tar.extractfile(name).read()
+
+    keys = sorted({name.split(".", 1)[0] for name in members})
+    assert keys == [f"{index:09d}" for index in range(10)]
+    assert members["000000004.txt"] == b"1girl, solo"
+    assert json.loads(members["000000004.json"])["id"] == 4
+    assert members["000000004.png"].startswith(b"\x89PNG")
+
+
+def test_webdataset_respects_save_cfg_and_no_meta(tmp_path):
+    item = _item(1)
+    item.meta["save_cfg"] = {"format": "JPEG", "quality": 80}
+    with WebDatasetExporter(str(tmp_path), no_meta=True, workers=1) as exporter:
+        exporter.export_item(item)
+
+    with tarfile.open(tmp_path / "shard-000000.tar") as tar:
+        assert sorted(tar.getnames()) == ["000000000.jpg", "000000000.txt"]
+
+
+def test_parquet_rows_are_partitioned_by_source(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    with ParquetExporter(str(tmp_path), row_group_size=2) as exporter:
+        for index in range(5):
+            item = _item(index)
+            item.meta["danbooru" if index % 2 else "gelbooru"] = {"id": index, "rating": "g", "md5": f"{index:032x}"}
+            item.meta["author"] = "artist_a"
+            exporter.export_item(item)
+
+    danbooru = pq.ParquetFile(tmp_path / "data" / "source=danbooru" / "part-00000.parquet")
+    assert danbooru.metadata.num_rows == 2
+    table = pq.read_table(tmp_path / "data" / "source=gelbooru" / "part-00000.parquet")
+    assert pq.ParquetFile(tmp_path / "data" / "source=gelbooru" / "part-00000.parquet").metadata.num_row_groups == 2
+    rows = table.to_pylist()
+    assert [row["post_id"] for row in rows] == ["0", "2", "4"]
+    assert rows[0]["tags"] == ["1girl", "solo"]
+    assert rows[0]["author"] == "artist_a"
+    stored = (tmp_path / rows[0]["path"]).read_bytes()
+    assert rows[0]["md5"] == hashlib.md5(stored).hexdigest() and rows[0]["file_size"] == len(stored)
+    assert rows[0]["source_md5"] == f"{0:032x}"
+    assert rows[0]["image"] is None
+    assert (tmp_path / rows[0]["path"]).read_bytes().startswith(b"\x89PNG")
+
+
+def test_parquet_can_embed_image_bytes(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    with ParquetExporter(str(tmp_path), include_bytes=True, partition_by=None) as exporter:
+        exporter.export_item(_item(1))
+
+    row = pq.read_table(tmp_path / "data" / "part-00000.parquet").to_pylist()[0]
+    assert row["source"] is None
+    assert row["path"] is None
+    assert row["image"].startswith(b"\x89PNG")
+    assert row["file_size"] == len(row["image"])
+
+
+def test_parquet_dataset_scans_and_keeps_same_named_images_apart(tmp_path):
+    ds = pytest.importorskip("pyarrow.dataset")
+    with ParquetExporter(str(tmp_path)) as exporter:
+        for index in range(2):
+            item = _item(index)
+            item.meta["filename"] = "same.png"
+            item.meta["danbooru"] = {"id": index}
+            exporter.export_item(item)
+
+    table = ds.dataset(tmp_path / "data", partitioning="hive").to_table()
+    rows = sorted(table.to_pylist(), key=lambda row: row["post_id"])
+    assert [row["source"] for row in rows] == ["danbooru", "danbooru"]
+    assert rows[0]["path"] != rows[1]["path"]
+    for index, row in enumerate(rows):
+        with Image.open(tmp_path / row["path"]) as image:
+            assert image.getpixel((0, 0)) == _item(index).image.getpixel((0, 0))
+
+
+def test_packed_store_round_trip(tmp_path):
+    with PackedStoreExporter(str(tmp_path)) as exporter:
+        for index in range(3):
+            exporter.export_item(_item(index))
+
+    with PackedImageStore(tmp_path) as store:
+        assert store.keys() == ["0", "1", "2"]
+        assert "1" in store and "9" not in store
+        view = store["2"]
+        assert bytes(view[:4]) == b"\x89PNG"
+        view.release()
+        assert store.format("2") == "png"
+        assert store.meta("2")["tags"] == {"1girl": 0.9, "solo": 0.8}
+        assert store.open_image("2").getpixel((0, 0)) == (20, 0, 0)
+
+
+@pytest.mark.parametrize("exporter_type", ["WebDatasetExporter", "PackedStoreExporter"])
+def test_export_progress_counts_packed_bytes(tmp_path, exporter_type):
+    progress = ProgressTracker()
+    export_data([_item(index) for index in range(4)], str(tmp_path), True, False, exporter_type, progress=progress)
+    stats = progress.stages()[0]
+    assert stats.items == 4
+    # Everything written lands in the packed files, plus tar headers and the store index
+    packed_size = sum(path.stat().st_size for path in tmp_path.iterdir())
+    assert 0 < stats.bytes <= packed_size
+
+
+def test_passthrough_copies_untouched_files_only(tmp_path):
+    source = tmp_path / "download.jpg"
+    Image.new("RGB", (8, 8)).save(source, quality=70)
+    item = ImageItem(Image.open(source), {"filename": "post.jpg", "id": 1})
+
+    path = export_passthrough(item, str(tmp_path / "out"))
+    assert (tmp_path / "out" / "post.jpg").read_bytes() == source.read_bytes()
+    assert path == str(tmp_path / "out" / "post.jpg")
+    assert json.loads((tmp_path / "out" / ".post.jpg_meta.json").read_text())["id"] == 1
+
+    resized = ImageItem(item.image.resize((4, 4)), item.meta)
+    assert passthrough_path(resized) is None
+    assert export_passthrough(resized, str(tmp_path / "out")) is None
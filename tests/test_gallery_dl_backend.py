@@ -0,0 +1,74 @@
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from dataset_cat.core.config import config
+from dataset_cat.gallery_dl_backend import GalleryDLBackend, parse_urls
+
+
+@pytest.fixture
+def image_server(tmp_path):
+    root = tmp_path / "site"
+    root.mkdir()
+    for index in range(3):
+        Image.new("RGB", (16, 16), (index * 80, 0, 0)).save(root / f"image{index}.png")
+    (root / "clip.mp4").write_bytes(b"\x00" * 64)
+    (root / "broken.png").write_bytes(b"not an image")
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(root))
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_urls_ignores_non_urls():
+    assert parse_urls("https://a.example/1, rem\nhttp://b.example/2") == ["https://a.example/1", "http://b.example/2"]
+
+
+def test_fetch_downloads_and_archive_skips_known_files(tmp_path, image_server, monkeypatch):
+    monkeypatch.setitem(config._config["fetcher"], "wait_time", 0)
+    urls = [f"{image_server}/image{index}.png" for index in range(3)]
+    backend = GalleryDLBackend(str(tmp_path / "downloads"), str(tmp_path / "archive.sqlite3"), max_workers=2)
+
+    items, errors = backend.fetch(urls, limit=2)
+    assert errors == []
+    assert len(items) == 2
+    assert all(os.path.isfile(path) for path in items.paths())
+    items = items.load()
+    assert all(item.image.size == (16, 16) for item in items)
+    assert items[0].meta["gallery_dl"]["category"] == "directlink"
+
+    items, errors = backend.fetch(urls, limit=10)
+    assert len(items) == 1
+
+
+def test_fetch_reports_unsupported_urls(tmp_path):
+    backend = GalleryDLBackend(str(tmp_path), "")
+    items, errors = backend.fetch(["https://unsupported.invalid/page"], limit=1)
+    assert len(items) == 0
+    assert len(errors) == 1
+
+
+def test_fetch_skips_files_that_are_not_images(tmp_path, image_server, monkeypatch):
+    monkeypatch.setitem(config._config["fetcher"], "wait_time", 0)
+    urls = [f"{image_server}/clip.mp4", f"{image_server}/broken.png"] + [
+        f"{image_server}/image{index}.png" for index in range(2)
+    ]
+    backend = GalleryDLBackend(str(tmp_path / "downloads"), "", max_workers=1)
+    items, errors = backend.fetch(urls, limit=2)
+    assert errors == []
+    assert sorted(item.meta["url"].rsplit("/", 1)[1] for item in items) == ["image0.png", "image1.png"]
+    assert not list((tmp_path / "downloads").rglob("clip.mp4"))
+
+
+def test_cancelled_fetch_downloads_nothing(tmp_path, image_server):
+    backend = GalleryDLBackend(str(tmp_path / "downloads"), "")
+    items, errors = backend.fetch([f"{image_server}/image0.png"], limit=2, cancelled=lambda: True)
+    assert len(items) == 0 and errors == []
+    assert not list((tmp_path / "downloads").rglob("*.png"))
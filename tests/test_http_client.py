@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import os
+
+import httpx
+
+from dataset_cat.core.config import config
+from dataset_cat.core.http_client import DownloadTask, download_files, download_many
+from dataset_cat.core.metrics import HTTP_RESPONSES
+
+
+def _client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_download_many_streams_files_and_retries(tmp_path):
+    attempts = {}
+
+    def handler(request):
+        name = request.url.path.strip("/")
+        attempts[name] = attempts.get(name, 0) + 1
+        if name == "flaky.png" and attempts[name] == 1:
+            return httpx.Response(503)
+        if name == "missing.png":
+            return httpx.Response(404)
+        return httpx.Response(200, content=name.encode() * 1000)
+
+    async def run():
+        async with _client(handler) as client:
+            tasks = [DownloadTask(f"https://img.invalid/{name}", str(tmp_path / name)) for name in names]
+            return await download_many(tasks, concurrency=2, client=client)
+
+    names = ["a.png", "flaky.png", "missing.png"]
+    results = asyncio.run(run())
+
+    assert [result.ok for result in results] == [True, True, False]
+    assert results[0].nbytes == len(b"a.png") * 1000
+    assert (tmp_path / "flaky.png").read_bytes().startswith(b"flaky.png")
+    assert attempts == {"a.png": 1, "flaky.png": 2, "missing.png": 1}
+    assert results[2].error == "HTTP 404"
+    assert not (tmp_path / "missing.png").exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.png", "flaky.png"]
+
+
+def test_download_many_bounds_concurrency(tmp_path):
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return httpx.Response(200, content=b"x")
+
+    async def run():
+        async with _client(handler) as client:
+            tasks = [DownloadTask(f"https://img.invalid/{index}", str(tmp_path / str(index))) for index in range(12)]
+            return await download_many(tasks, concurrency=3, client=client)
+
+    assert all(result.ok for result in asyncio.run(run()))
+    assert in_flight["max"] == 3
+
+
+def test_download_files_runs_on_the_bridge_loop(tmp_path, monkeypatch):
+    monkeypatch.setitem(config._config["fetcher"], "retry_count", 0)
+    results = download_files([DownloadTask("http://127.0.0.1:9/none.png", str(tmp_path / "none.png"))])
+    assert not results[0].ok
+
+
+def test_md5_mismatch_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setitem(config._config["fetcher"], "retry_count", 0)
+    body = b"image-bytes"
+    good = hashlib.md5(body).hexdigest()
+
+    async def run():
+        async with _client(lambda request: httpx.Response(200, content=body)) as client:
+            tasks = [
+                DownloadTask("https://img.invalid/good.png", str(tmp_path / "good.png"), expected_md5=good),
+                DownloadTask("https://img.invalid/bad.png", str(tmp_path / "bad.png"), expected_md5="0" * 32),
+            ]
+            return await download_many(tasks, client=client)
+
+    good_result, bad_result = asyncio.run(run())
+    assert good_result.md5 == good
+    assert good_result.sha256 == hashlib.sha256(body).hexdigest()
+    assert bad_result.error.startswith("ChecksumMismatch")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["good.png"]
+
+
+def test_download_many_consumes_lazy_tasks(tmp_path):
+    started = []
+
+    def tasks():
+        for index in range(6):
+            # The listing is only advanced as download slots free up
+            assert len(started) <= index
+            yield DownloadTask(f"https://img.invalid/{index}", str(tmp_path / str(index)))
+
+    def handler(request):
+        started.append(request.url.path)
+        return httpx.Response(200, content=b"x")
+
+    async def run():
+        async with _client(handler) as client:
+            return await download_many(tasks(), concurrency=2, client=client)
+
+    results = asyncio.run(run())
+    assert [result.task.url for result in results] == [f"https://img.invalid/{index}" for index in range(6)]
+    assert all(result.ok for result in results)
+
+
+def test_transport_failures_are_counted_with_status_zero(tmp_path, monkeypatch):
+    monkeypatch.setitem(config._config["fetcher"], "retry_count", 1)
+    monkeypatch.setitem(config._config["fetcher"], "wait_time", 0)
+
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    async def run():
+        async with _client(handler) as client:
+            task = DownloadTask("https://down.invalid/a.png", str(tmp_path / "a.png"))
+            return await download_many([task], client=client)
+
+    before = HTTP_RESPONSES.value(host="down.invalid", code=0)
+    (result,) = asyncio.run(run())
+    assert result.error.startswith("ConnectError")
+    assert HTTP_RESPONSES.value(host="down.invalid", code=0) == before + 2
+
+
+def test_one_bad_task_does_not_fail_the_batch(tmp_path):
+    (tmp_path / "blocked").write_text("a file, not a directory")
+
+    async def run():
+        async with _client(lambda request: httpx.Response(200, content=request.url.path.encode())) as client:
+            tasks = [
+                DownloadTask("https://img.invalid/a.png", str(tmp_path / "a.png")),
+                DownloadTask("not a url", str(tmp_path / "b.png")),
+                DownloadTask("https://img.invalid/c.png", str(tmp_path / "blocked" / "c.png")),
+            ]
+            return await download_many(tasks, client=client)
+
+    results = asyncio.run(run())
+    assert [result.ok for result in results] == [True, False, False]
+    assert results[1].error and results[2].error
+
+
+def test_duplicate_paths_get_numbered(tmp_path):
+    async def run():
+        async with _client(lambda request: httpx.Response(200, content=request.url.path.encode())) as client:
+            tasks = [DownloadTask(f"https://img.invalid/{index}", str(tmp_path / "post.jpg")) for index in range(3)]
+            return await download_many(tasks, concurrency=3, client=client)
+
+    results = asyncio.run(run())
+    assert [os.path.basename(result.task.path) for result in results] == ["post.jpg", "post-1.jpg", "post-2.jpg"]
+    assert sorted(path.read_bytes() for path in tmp_path.iterdir()) == [b"/0", b"/1", b"/2"]
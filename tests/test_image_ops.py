@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from dataset_cat.core.config import config
+from dataset_cat.core.image_ops import OpenCVImageOps, PILImageOps, get_image_ops
+
+pytest.importorskip("cv2")
+
+
+def _image(mode="RGB", size=(120, 80)):
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, size[0])[None, :, None]
+    y = np.linspace(0, 255, size[1])[:, None, None]
+    pixels = np.concatenate([x + 0 * y, y + 0 * x, (x + y) / 2, rng.integers(0, 256, (size[1], size[0], 1))], axis=-1)
+    image = Image.fromarray(pixels.astype(np.uint8), "RGBA")
+    return image if mode == "RGBA" else image.convert(mode)
+
+
+def _difference(a, b):
+    return np.abs(np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16)).mean()
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB", "RGBA"])
+def test_opencv_resize_matches_pil(mode):
+    image = _image(mode)
+    for size in [(60, 40), (33, 97), (240, 160)]:
+        expected = PILImageOps().resize(image, size)
+        result = OpenCVImageOps().resize(image, size)
+        assert result.size == size and result.mode == mode
+        if mode != "RGBA":
+            assert _difference(result, expected) < 4
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "LA"])
+def test_opencv_resize_does_not_bleed_transparent_colors(mode):
+    # Opaque white next to fully transparent red
+    pixels = np.zeros((60, 60, 4), dtype=np.uint8)
+    pixels[..., 0] = 255
+    pixels[:, :30] = 255
+    image = Image.fromarray(pixels).convert(mode)
+    for size in [(17, 17), (120, 120)]:
+        expected = PILImageOps().resize(image, size)
+        result = OpenCVImageOps().resize(image, size)
+        assert result.mode == mode
+        visible = np.asarray(result)[..., -1] > 0
+        assert (np.asarray(result)[..., :-1][visible] >= 250).all()
+        assert np.abs(np.asarray(result, dtype=np.int16)[..., -1] - np.asarray(expected)[..., -1]).mean() < 4
+
+
+def test_opencv_crop_matches_pil():
+    image = _image()
+    box = (10, 5, 74, 69)
+    assert np.array_equal(np.asarray(OpenCVImageOps().crop(image, box)), np.asarray(image.crop(box)))
+    # Boxes reaching outside the image are padded like Pillow does
+    assert OpenCVImageOps().crop(image, (-10, 0, 50, 50)).size == (60, 50)
+
+
+@pytest.mark.parametrize(
+    "source, mode, background",
+    [
+        ("RGBA", "RGB", "white"),
+        ("RGBA", "RGB", (0, 128, 255)),
+        ("RGBA", "L", "black"),
+        ("RGB", "L", None),
+        ("L", "RGB", None),
+    ],
+)
+def test_opencv_convert_matches_pil(source, mode, background):
+    image = _image(source)
+    expected = PILImageOps().convert(image, mode, background)
+    result = OpenCVImageOps().convert(image, mode, background)
+    assert result.mode == mode
+    assert _difference(result, expected) < 1
+
+
+def test_unsupported_modes_fall_back_to_pil():
+    image = _image().convert("P")
+    ops = OpenCVImageOps()
+    assert ops.resize(image, (30, 20)).mode == "P"
+    assert ops.convert(image, "RGB").mode == "RGB"
+
+
+def test_get_image_ops_follows_config(monkeypatch):
+    monkeypatch.setitem(config._config["processing"], "image_backend", "pil")
+    assert get_image_ops().name == "pil"
+    assert get_image_ops("opencv").name == "opencv"
+    with pytest.raises(ValueError):
+        get_image_ops("vips")
+
+
+def test_actions_route_through_backend():
+    pytest.importorskip("waifuc")
+    from waifuc.model import ImageItem
+
+    from dataset_cat.core import actions
+
+    item = ImageItem(_image("RGBA", (300, 200)), {"filename": "a.png"})
+    for backend in ["pil", "opencv"]:
+        assert actions.AlignMinSizeAction(100, backend=backend).process(item).image.size == (150, 100)
+        assert actions.AlignMaxSizeAction(150, backend=backend).process(item).image.size == (150, 100)
+        assert actions.AlignMaxSizeAction(400, backend=backend).process(item) is item
+        assert actions.CropToDivisibleAction(64, backend=backend).process(item).image.size == (256, 192)
+        converted = actions.ModeConvertAction("RGB", backend=backend).process(item)
+        assert converted.image.mode == "RGB" and converted.meta == item.meta
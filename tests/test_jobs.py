@@ -0,0 +1,180 @@
+import threading
+import time
+
+import pytest
+
+from dataset_cat.core.jobs import CANCELLED, FAILED, QUEUED, SUCCEEDED, JobManager
+
+
+def _wait_for(manager, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job.status in (SUCCEEDED, FAILED, CANCELLED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_job_runs_in_background_and_reports_result():
+    manager = JobManager(max_workers=2, budget={"network": 1})
+    manager.register("echo", lambda params, context: f"got {params['value']}", cost={"network": 1})
+    manager.start()
+    try:
+        job_id = manager.submit("echo", {"value": 3})
+        job = _wait_for(manager, job_id)
+        assert job.status == SUCCEEDED
+        assert job.message == "got 3"
+    finally:
+        manager.shutdown()
+
+
+def test_failed_job_records_error():
+    def fail(params, context):
+        raise RuntimeError("boom")
+
+    manager = JobManager()
+    manager.register("fail", fail)
+    manager.start()
+    try:
+        job = _wait_for(manager, manager.submit("fail", {}))
+        assert job.status == FAILED
+        assert "boom" in job.message
+    finally:
+        manager.shutdown()
+
+
+def test_budget_limits_concurrent_jobs():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(params, context):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return "done"
+
+    manager = JobManager(max_workers=4, budget={"network": 2})
+    manager.register("crawl", work, cost={"network": 1})
+    manager.start()
+    try:
+        job_ids = [manager.submit("crawl", {}) for _ in range(6)]
+        for job_id in job_ids:
+            assert _wait_for(manager, job_id).status == SUCCEEDED
+        assert peak == 2
+    finally:
+        manager.shutdown()
+
+
+def test_secrets_are_not_persisted(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    manager = JobManager(db_path=db_path)
+    manager.register("crawl", lambda params, context: context.secrets.get("token", ""))
+    manager.start()
+    try:
+        job = _wait_for(manager, manager.submit("crawl", {"tags": "cat"}, secrets={"token": "hunter2"}))
+        assert job.message == "hunter2"
+    finally:
+        manager.shutdown()
+    # The result message is persisted, but the secret never reaches the params column
+    params = manager._conn.execute("SELECT params FROM jobs").fetchone()[0]
+    assert "hunter2" not in params
+
+
+def test_unfinished_jobs_are_requeued_after_restart(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    manager = JobManager(db_path=db_path)
+    manager.register("crawl", lambda params, context: "done")
+    # Not started, so the job stays queued as if the process had stopped
+    job_id = manager.submit("crawl", {"tags": "cat"})
+
+    restarted = JobManager(db_path=db_path)
+    job = restarted.get(job_id)
+    assert job.status == QUEUED
+    assert job.params == {"tags": "cat"}
+    restarted.register("crawl", lambda params, context: f"resumed {params['tags']}")
+    restarted.start()
+    try:
+        assert _wait_for(restarted, job_id).message == "resumed cat"
+    finally:
+        restarted.shutdown()
+
+
+def test_cancel_queued_job():
+    manager = JobManager()
+    manager.register("crawl", lambda params, context: "done")
+    job_id = manager.submit("crawl", {})
+    assert manager.queue_position(job_id) == 0
+    assert manager.cancel(job_id)
+    assert manager.get(job_id).status == CANCELLED
+    assert manager.queue_depth() == 0
+
+
+def test_register_rejects_costs_outside_budget():
+    manager = JobManager(budget={"network": 1})
+    with pytest.raises(ValueError):
+        manager.register("crawl", lambda params, context: "done", cost={"gpu": 1})
+    with pytest.raises(ValueError):
+        manager.register("crawl", lambda params, context: "done", cost={"network": 2})
+    manager.register("crawl", lambda params, context: "done", cost={"network": 1})
+
+
+def test_jobs_with_secrets_fail_after_restart(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    manager = JobManager(db_path=db_path)
+    manager.register("crawl", lambda params, context: "done")
+    with_token = manager.submit("crawl", {}, secrets={"token": "hunter2"})
+    empty_token = manager.submit("crawl", {}, secrets={"token": ""})
+
+    restarted = JobManager(db_path=db_path)
+    assert restarted.get(with_token).status == FAILED
+    assert "submit it again" in restarted.get(with_token).message
+    assert restarted.get(empty_token).status == QUEUED
+    assert restarted.queue_depth() == 1
+
+
+def test_jobs_without_handler_wait_for_registration(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    manager = JobManager(db_path=db_path)
+    manager.register("crawl", lambda params, context: "done")
+    manager.register("process", lambda params, context: "done")
+    crawl_id = manager.submit("crawl", {})
+    process_id = manager.submit("process", {})
+
+    restarted = JobManager(db_path=db_path)
+    restarted.register("process", lambda params, context: "processed")
+    restarted.start()
+    try:
+        # The crawl job is skipped rather than failing for lack of a handler
+        assert _wait_for(restarted, process_id).message == "processed"
+        assert restarted.get(crawl_id).status == QUEUED
+        restarted.register("crawl", lambda params, context: "crawled")
+        assert _wait_for(restarted, crawl_id).message == "crawled"
+    finally:
+        restarted.shutdown()
+
+
+def test_old_finished_jobs_are_forgotten(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    manager = JobManager(db_path=db_path, max_finished=2)
+    manager.register("crawl", lambda params, context: "done")
+    manager.start()
+    try:
+        job_ids = []
+        for index in range(4):
+            job_ids.append(manager.submit("crawl", {"index": index}))
+            _wait_for(manager, job_ids[-1])
+    finally:
+        manager.shutdown()
+    assert [job.job_id for job in manager.list_jobs()] == job_ids[:1:-1]
+    assert manager.get_progress(job_ids[0]) is None
+    queued = manager.submit("crawl", {})
+
+    restarted = JobManager(db_path=db_path, max_finished=1)
+    assert {job.job_id for job in restarted.list_jobs()} == {job_ids[-1], queued}
+    assert restarted._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 2
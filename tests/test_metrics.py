@@ -0,0 +1,77 @@
+import asyncio
+import urllib.request
+
+import httpx
+import pytest
+
+from dataset_cat.core.http_client import DownloadResult, DownloadTask
+from dataset_cat.core.metrics import (
+    HTTP_RESPONSES,
+    IMAGES_DOWNLOADED,
+    MetricsRegistry,
+    httpx_event_hooks,
+    start_metrics_server,
+)
+
+
+def test_render_counters_gauges_and_histograms():
+    registry = MetricsRegistry()
+    crawled = registry.counter("test_images_total", "Images.", ["source"])
+    crawled.inc(source="Danbooru")
+    crawled.inc(2, source="Danbooru")
+    queued = registry.gauge("test_queued", "Queued jobs.")
+    registry.add_collector(lambda: queued.set(4))
+    latency = registry.histogram("test_seconds", "Latency.", ["stage"], buckets=(0.1, 1.0))
+    latency.observe(0.05, stage="export")
+    latency.observe(0.5, stage="export")
+
+    text = registry.render()
+    assert "# TYPE test_images_total counter" in text
+    assert 'test_images_total{source="Danbooru"} 3' in text
+    assert "test_queued 4" in text
+    assert 'test_seconds_bucket{stage="export",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="export",le="+Inf"} 2' in text
+    assert 'test_seconds_count{stage="export"} 2' in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("test_total", "Test.", ["path"]).inc(path='a"b\\c')
+    assert 'test_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_httpx_hooks_record_status_codes():
+    transport = httpx.MockTransport(lambda request: httpx.Response(429))
+
+    async def fetch():
+        async with httpx.AsyncClient(transport=transport, event_hooks=httpx_event_hooks()) as client:
+            await client.get("https://metrics-test.invalid/posts.json")
+
+    before = HTTP_RESPONSES.value(host="metrics-test.invalid", code=429)
+    asyncio.run(fetch())
+    assert HTTP_RESPONSES.value(host="metrics-test.invalid", code=429) == before + 1
+
+
+def test_download_metrics_are_labelled_by_source(tmp_path):
+    pytest.importorskip("waifuc")
+    from dataset_cat.crawler import _record_download
+
+    task = DownloadTask("https://cdn.donmai.invalid/a.png", str(tmp_path / "a.png"))
+    before = IMAGES_DOWNLOADED.value(source="Danbooru")
+    _record_download(DownloadResult(task, nbytes=10), "Danbooru")
+    assert IMAGES_DOWNLOADED.value(source="Danbooru") == before + 1
+    assert IMAGES_DOWNLOADED.value(source="cdn.donmai.invalid") == 0
+
+
+def test_metrics_endpoint_serves_registry():
+    registry = MetricsRegistry()
+    registry.counter("test_served_total", "Served.").inc()
+    server = start_metrics_server("127.0.0.1", 0, registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert "test_served_total 1" in response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
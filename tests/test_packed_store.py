@@ -0,0 +1,62 @@
+import pytest
+from PIL import Image
+
+from dataset_cat.core.packed_store import PackedImageStore, PackedStoreWriter
+
+
+def test_writer_index_keeps_last_value_per_key(tmp_path):
+    with PackedStoreWriter(tmp_path, "shard") as writer:
+        writer.add("a", b"first", "png")
+        writer.add("b", b"second", "jpg", {"id": 2})
+        writer.add("a", b"third", "png")
+
+    assert PackedImageStore.exists(tmp_path, "shard")
+    with PackedImageStore(tmp_path, "shard") as store:
+        assert len(store) == 2
+        assert bytes(store.get("a")) == b"third"
+        assert store.size("b") == 6
+        assert store.meta("b") == {"id": 2}
+        assert store.meta("a") == {}
+
+
+def test_add_image_and_empty_store(tmp_path):
+    with PackedStoreWriter(tmp_path / "empty"):
+        pass
+    with PackedImageStore(tmp_path / "empty") as store:
+        assert store.keys() == []
+
+    with PackedStoreWriter(tmp_path / "images") as writer:
+        writer.add_image("red", Image.new("RGB", (8, 8), (255, 0, 0)), "JPEG", quality=90)
+    with PackedImageStore(tmp_path / "images") as store:
+        assert store.format("red") == "jpg"
+        assert store.open_image("red").size == (8, 8)
+
+
+def test_rewriting_a_store_keeps_open_readers_intact(tmp_path):
+    with PackedStoreWriter(tmp_path) as writer:
+        writer.add("a", b"old data", "png")
+    with PackedImageStore(tmp_path) as store:
+        writer = PackedStoreWriter(tmp_path)
+        writer.add("b", b"new", "png")
+        # Neither the data nor the index change before the writer is closed
+        assert bytes(store.get("a")) == b"old data"
+        with PackedImageStore(tmp_path) as reopened:
+            assert reopened.keys() == ["a"]
+        writer.close()
+        assert bytes(store.get("a")) == b"old data"
+    with PackedImageStore(tmp_path) as store:
+        assert store.keys() == ["b"] and bytes(store.get("b")) == b"new"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["images.bin", "images.idx.json"]
+
+
+def test_process_directory_refuses_to_pack_over_its_input(tmp_path):
+    pytest.importorskip("gradio")
+    from dataset_cat.core.progress import ProgressTracker
+    from dataset_cat.postprocessing_ui import _process_directory
+
+    with PackedStoreWriter(tmp_path) as writer:
+        writer.add_image("red", Image.new("RGB", (8, 8), (255, 0, 0)))
+    with pytest.raises(ValueError):
+        list(_process_directory(str(tmp_path), str(tmp_path), [], ProgressTracker(), pack_output=True))
+    results = list(_process_directory(str(tmp_path), str(tmp_path / "out"), [], ProgressTracker(), pack_output=True))
+    assert results == [(1, 1, 1)]
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from dataset_cat.core.prefetch import Prefetcher
+
+
+def test_prefetcher_yields_items_in_order():
+    with Prefetcher(iter(range(500)), max_ahead=7) as prefetcher:
+        assert list(prefetcher) == list(range(500))
+        assert list(prefetcher) == []
+
+
+def test_prefetcher_bounds_read_ahead():
+    produced = []
+
+    def source():
+        for index in range(100):
+            produced.append(index)
+            yield index
+
+    prefetcher = Prefetcher(source(), max_ahead=5)
+    assert next(prefetcher) == 0
+    time.sleep(0.2)
+    # One consumed, five buffered and one held by the blocked producer
+    assert prefetcher.buffered == 5
+    assert len(produced) <= 7
+    prefetcher.close()
+
+
+def test_prefetcher_reraises_source_errors():
+    def source():
+        yield 1
+        raise RuntimeError("page 2 failed")
+
+    prefetcher = Prefetcher(source())
+    assert next(prefetcher) == 1
+    with pytest.raises(RuntimeError, match="page 2 failed"):
+        next(prefetcher)
+    prefetcher.close()
+
+
+def test_prefetcher_reraises_when_source_is_not_iterable():
+    prefetcher = Prefetcher(None)
+    with pytest.raises(TypeError):
+        next(prefetcher)
+    prefetcher.close()
+
+
+def test_prefetcher_close_stops_producer_and_closes_source():
+    closed = threading.Event()
+
+    def source():
+        try:
+            index = 0
+            while True:
+                yield index
+                index += 1
+        finally:
+            closed.set()
+
+    prefetcher = Prefetcher(source(), max_ahead=3, name="listing")
+    assert next(prefetcher) == 0
+    prefetcher.close()
+    assert closed.is_set()
+    assert not prefetcher._thread.is_alive()
+    with pytest.raises(StopIteration):
+        next(prefetcher)
@@ -0,0 +1,63 @@
+import json
+import tracemalloc
+
+from dataset_cat.core.profiling import SUMMARY_COLUMNS, RunProfiler
+
+
+def test_report_has_per_stage_distribution(tmp_path):
+    profiler = RunProfiler("unit", total=3)
+    with profiler:
+        for seconds in (0.01, 0.02, 0.03):
+            profiler.record("decode", seconds, nbytes=100)
+        profiler.record("save", 0.06)
+        profiler.count("filtered:FileSizeFilterAction")
+
+    report = profiler.report()
+    decode, save = report["stages"]
+    assert decode["stage"] == "decode"
+    assert decode["calls"] == 3
+    assert decode["bytes"] == 300
+    assert round(decode["p50_ms"]) == 20
+    assert round(decode["max_ms"]) == 30
+    assert round(save["share"], 2) == 0.5
+    assert report["counters"] == {"filtered:FileSizeFilterAction": 1}
+    assert "cprofile" not in report
+
+    path = profiler.write_report(tmp_path)
+    assert json.loads(path.read_text(encoding="utf-8"))["name"] == "unit"
+
+
+def test_summary_rows_sorted_by_total_time():
+    profiler = RunProfiler("unit")
+    profiler.record("action:CropToDivisibleAction", 0.01)
+    profiler.record("action:ImageCompressionAction", 0.5)
+
+    rows = profiler.summary_rows()
+    assert len(rows[0]) == len(SUMMARY_COLUMNS)
+    assert [row[0] for row in rows] == ["action:ImageCompressionAction", "action:CropToDivisibleAction"]
+
+
+def test_optional_samplers_are_included():
+    profiler = RunProfiler("unit", use_cprofile=True, use_tracemalloc=True, top_n=5)
+    with profiler:
+        data = [bytes(1024) for _ in range(100)]
+        sorted(range(1000), key=lambda value: -value)
+    del data
+
+    report = profiler.report()
+    assert 0 < len(report["cprofile"]) <= 5
+    assert report["tracemalloc"]["peak_bytes"] > 0
+
+
+def test_overlapping_runs_share_samplers():
+    first = RunProfiler("first", use_cprofile=True, use_tracemalloc=True)
+    second = RunProfiler("second", use_cprofile=True, use_tracemalloc=True)
+    with first:
+        with second:
+            sorted(range(1000), key=lambda value: -value)
+        # The inner run leaving must not stop tracing for the outer one
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+
+    assert "cprofile" in first.report() and "cprofile" not in second.report()
+    assert "tracemalloc" in first.report() and "tracemalloc" in second.report()
@@ -0,0 +1,43 @@
+import time
+
+from dataset_cat.core.progress import ProgressTracker
+
+
+def test_track_records_items_bytes_and_latency():
+    def slow_items():
+        for value in (b"ab", b"cde"):
+            time.sleep(0.01)
+            yield value
+
+    progress = ProgressTracker(total=2)
+    assert list(progress.track(slow_items(), "crawl", size_of=len)) == [b"ab", b"cde"]
+
+    (stats,) = progress.stages()
+    assert stats.name == "crawl"
+    assert stats.items == 2
+    assert stats.bytes == 5
+    assert stats.mean_latency >= 0.01
+    assert stats.items_per_second > 0
+
+
+def test_stages_keep_start_order_and_eta_counts_remaining_items():
+    progress = ProgressTracker(total=4)
+    progress.record("crawl", 1.0)
+    progress.record("crawl", 1.0)
+    with progress.time("export", nbytes=10):
+        pass
+
+    assert [stats.name for stats in progress.stages()] == ["crawl", "export"]
+    # Two crawl items remain at 1s each; export is close to free
+    assert 2.0 <= progress.eta() < 2.1
+
+
+def test_format_lists_every_stage():
+    progress = ProgressTracker()
+    progress.record("decode", 0.5, nbytes=1024 * 1024)
+    progress.queue_depth = 3
+    text = progress.format({"progress_queue_depth": "Queued jobs: {depth}"})
+
+    assert text.splitlines()[0].startswith("decode: 1 |")
+    assert "Queued jobs: 3" in text
+    assert "ETA" not in text
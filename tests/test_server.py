@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+pytest.importorskip("fastapi")
+pytest.importorskip("waifuc")
+
+from fastapi.testclient import TestClient
+
+from dataset_cat.core import jobs
+from dataset_cat.core.cache import TwoLevelCache
+from dataset_cat.core.config import config
+from dataset_cat.core.jobs import SUCCEEDED, JobManager
+from dataset_cat.server import create_app, main, run_process_job
+from dataset_cat.tag_translator import TagTranslator
+from dataset_cat.tag_translator_api import TagTranslatorAPI
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=2, budget={"network": 1, "cpu": 1})
+    manager.crawls = []
+    release = threading.Event()
+
+    def fake_crawl(params, context):
+        manager.crawls.append((params, context.secrets))
+        release.wait(5)
+        return f"Crawled {params['limit']} images."
+
+    manager.register("crawl", fake_crawl, cost={"network": 1, "cpu": 1})
+    manager.register("process", run_process_job, cost={"cpu": 1})
+    manager.release = release
+    manager.start()
+    yield manager
+    release.set()
+    manager.shutdown()
+
+
+@pytest.fixture
+def client(manager, monkeypatch):
+    async def fake_googletrans_bulk(self, descriptions):
+        await asyncio.sleep(0.01)
+        return [("Blue Sky", True) for _ in descriptions]
+
+    monkeypatch.setattr(TagTranslator, "_translate_googletrans_bulk", fake_googletrans_bulk)
+    api = TagTranslatorAPI(TagTranslator(cache=TwoLevelCache()))
+    with TestClient(create_app(manager, api)) as client:
+        yield client
+
+
+def _wait_for(client, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["finished_at"] is not None:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_crawl_job_keeps_token_out_of_params(client, manager):
+    response = client.post("/jobs/crawl", json={"source_name": "Zerochan", "tags": "miku", "hf_token": "secret"})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    manager.release.set()
+    assert _wait_for(client, job_id)["message"] == "Crawled 10 images."
+    params, secrets = manager.crawls[0]
+    assert "hf_token" not in params and secrets == {"hf_token": "secret"}
+    assert params["size"] == "large"
+
+    assert client.post("/jobs/crawl", json={"source_name": "Nowhere"}).status_code == 400
+    assert client.post("/jobs/crawl", json={"source_name": "Zerochan", "limit": 0}).status_code == 422
+    assert client.post("/jobs/crawl", json={"source_name": "Zerochan", "limit": 100000}).status_code == 422
+
+
+def test_unknown_tags_warn_without_blocking(client, manager, monkeypatch):
+    monkeypatch.setattr("dataset_cat.server.check_tags", lambda source, tags: "Unknown tags: mikuu")
+    response = client.post("/jobs/crawl", json={"source_name": "Danbooru", "tags": "mikuu"})
+    assert response.status_code == 202
+    assert response.json()["warnings"] == ["Unknown tags: mikuu"]
+    manager.release.set()
+    _wait_for(client, response.json()["job_id"])
+    assert manager.crawls[0][0]["tags"] == "mikuu"
+
+
+def test_process_job_runs_pipeline(client, tmp_path):
+    source = tmp_path / "in"
+    source.mkdir()
+    for index in range(3):
+        Image.new("RGB", (300, 200)).save(source / f"{index}.png")
+    request = {
+        "input_dir": str(source),
+        "output_dir": str(tmp_path / "out"),
+        "actions": ["resize_max", "crop_to_divisible"],
+        "max_size": 150,
+        "divisible_by": 32,
+    }
+    job = _wait_for(client, client.post("/jobs/process", json=request).json()["job_id"])
+    assert job["status"] == SUCCEEDED
+    assert job["message"] == "Processed 3 of 3 images."
+    assert job["progress"]["total"] == 3
+    with Image.open(tmp_path / "out" / "0.png") as image:
+        assert image.size == (128, 96)
+
+    assert client.post("/jobs/process", json=dict(request, actions=["explode"])).status_code == 422
+    assert client.post("/jobs/process", json=dict(request, input_dir=str(tmp_path / "none"))).status_code == 400
+    assert client.post("/jobs/process", json=dict(request, variants=["big"])).status_code == 400
+
+
+def test_job_events_stream_until_finished(client, manager):
+    job_id = client.post("/jobs/crawl", json={"source_name": "Zerochan"}).json()["job_id"]
+    threading.Timer(0.3, manager.release.set).start()
+    with client.stream("GET", f"/jobs/{job_id}/events", params={"interval": 0.1}) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [json.loads(line[len("data: "):]) for line in response.iter_lines() if line.startswith("data: ")]
+    assert len(events) >= 2
+    assert events[-1]["status"] == SUCCEEDED
+
+
+def test_cancel_and_missing_jobs(client, manager):
+    running = client.post("/jobs/crawl", json={"source_name": "Zerochan"}).json()["job_id"]
+    queued = client.post("/jobs/crawl", json={"source_name": "Zerochan"}).json()["job_id"]
+    assert client.get(f"/jobs/{queued}").json()["position"] == 0
+    assert client.delete(f"/jobs/{queued}").json()["status"] == "cancelled"
+    assert client.delete(f"/jobs/{queued}").status_code == 409
+    manager.release.set()
+    _wait_for(client, running)
+    assert client.get("/jobs/unknown").status_code == 404
+    assert [job["job_id"] for job in client.get("/jobs").json()] == [queued, running]
+
+
+def test_translate_batch(client):
+    response = client.post("/translate", json={"descriptions": ["蓝天", " 蓝天 "], "source_type": "danbooru"})
+    assert response.status_code == 200
+    assert [result["formatted_tag"] for result in response.json()["results"]] == ["blue_sky", "blue_sky"]
+    assert client.post("/translate", json={"descriptions": [], "source_type": "danbooru"}).status_code == 422
+    assert client.post("/translate", json={"descriptions": ["x"], "source_type": "a", "method": "x"}).status_code == 422
+
+
+def test_server_keeps_its_own_job_queue(tmp_path, monkeypatch):
+    uvicorn = pytest.importorskip("uvicorn")
+    monkeypatch.setitem(config._config, "cache_dir", str(tmp_path))
+    monkeypatch.setitem(config._config["jobs"], "db_path", "")
+    monkeypatch.setitem(config._config["jobs"], "server_db_path", "")
+    monkeypatch.setattr(jobs, "_manager", None)
+    monkeypatch.setattr(uvicorn, "run", lambda app, host, port: None)
+    main([])
+    # The web UI requeues everything in jobs.sqlite3, so the server must not share it
+    files = [row[2] for row in jobs._manager._conn.execute("PRAGMA database_list")]
+    assert files == [str(tmp_path / "server-jobs.sqlite3")]
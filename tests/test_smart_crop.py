@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from PIL import Image
+from waifuc.model import ImageItem
+
+from dataset_cat.core import smart_crop
+from dataset_cat.core.actions import AspectRatioBucketAction, CropToDivisibleAction
+from dataset_cat.core.cache import TwoLevelCache
+from dataset_cat.core.config import config
+from dataset_cat.core.smart_crop import FocusMap, SmartCropper, content_hash
+
+pytest.importorskip("cv2")
+
+
+def _subject_image(size=(600, 1200), subject=(350, 80, 550, 280)):
+    """Flat background with a textured subject in the given box."""
+    image = Image.new("RGB", size, (200, 200, 200))
+    rng = np.random.default_rng(0)
+    width, height = subject[2] - subject[0], subject[3] - subject[1]
+    image.paste(Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8)), subject[:2])
+    return image
+
+
+def _contains(box, inner):
+    return box[0] <= inner[0] and box[1] <= inner[1] and box[2] >= inner[2] and box[3] >= inner[3]
+
+
+@pytest.fixture
+def shared_cropper(tmp_path, monkeypatch):
+    monkeypatch.setitem(config._config, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(smart_crop, "_cropper", None)
+    yield
+    if smart_crop._cropper is not None and smart_crop._cropper.cache is not None:
+        smart_crop._cropper.cache.close()
+
+
+def test_crop_follows_salient_subject():
+    cropper = SmartCropper(face_model="")
+    image = _subject_image()
+    box = cropper.crop_box(image, (600, 600))
+    assert box == (0, 0, 600, 600)
+    box = cropper.crop_box(image, (400, 400))
+    assert box[2] - box[0] == 400 and box[3] - box[1] == 400
+    assert _contains(box, (350, 80, 550, 280))
+
+
+def test_faces_outweigh_saliency(monkeypatch):
+    cropper = SmartCropper(face_model="", face_weight=4.0)
+    # Face near the bottom, textured subject near the top
+    monkeypatch.setattr(cropper, "_detect_faces", lambda image: np.array([[0.3, 0.8, 0.2, 0.1]]))
+    box = cropper.crop_box(_subject_image(), (600, 600))
+    assert box[3] >= 0.9 * 1200
+
+
+def test_focus_map_is_cached_per_content(monkeypatch):
+    cropper = SmartCropper(cache=TwoLevelCache(), face_model="")
+    calls = []
+    analyze = cropper.analyze
+    monkeypatch.setattr(cropper, "analyze", lambda image: calls.append(1) or analyze(image))
+    image = _subject_image()
+    first = cropper.crop_box(image, (400, 400))
+    cropper.crop_box(image.copy(), (512, 512))
+    cropper.crop_box(image, (400, 400))
+    assert len(calls) == 1
+    assert cropper.crop_box(image, (400, 400)) == first
+    assert content_hash(image) != content_hash(image.transpose(Image.FLIP_LEFT_RIGHT))
+
+
+def test_focus_map_round_trip_and_bounds():
+    weights = np.zeros((8, 4))
+    weights[6:, 1:3] = 1
+    focus = FocusMap.decode(FocusMap(weights).encode())
+    assert np.allclose(focus.weights / focus.weights.max(), weights)
+    box = focus.crop_box((100, 200), (100, 100))
+    assert box == (0, 100, 100, 200)
+    # An empty map falls back to a center crop
+    assert FocusMap(np.zeros((4, 4))).crop_box((100, 100), (50, 50)) == (25, 25, 75, 75)
+
+
+def test_crop_to_divisible_uses_smart_crop(shared_cropper):
+    image = _subject_image((300, 700), (0, 0, 120, 120))
+    centered = CropToDivisibleAction(256, backend="pil", smart_crop=False).process(ImageItem(image, {}))
+    smart = CropToDivisibleAction(256, backend="pil", smart_crop=True).process(ImageItem(image, {}))
+    assert smart.image.size == centered.image.size == (256, 512)
+    assert smart.image.tobytes() == image.crop((0, 0, 256, 512)).tobytes()
+    assert smart_crop._cropper.cache.misses == 1
+
+
+def test_bucket_action_records_smart_crops(shared_cropper):
+    image = _subject_image((400, 1000), (0, 800, 150, 1000))
+    action = AspectRatioBucketAction(256, step=32, min_bucket_size=1, backend="pil", smart_crop=True)
+    assignment = action.fit(["a.png"], [400], [1000])
+    result = action.process(ImageItem(image, {"filename": "a.png"}))
+    assert list(result.image.size) == result.meta["bucket"]
+    left, top, right, bottom = assignment.crops[0]
+    assert bottom == assignment.scaled[0][1]
@@ -8,6 +8,8 @@ def test_source_integration(source_name):
     Integration test for each source to ensure it can fetch data correctly.
     """
     tags = "Rem"  # Example tag for testing
+    if source_name == "gallery-dl":
+        tags = "https://danbooru.donmai.us/posts?tags=rem_(re:zero)"  # gallery-dl takes gallery URLs
     limit = 2
     size = "large"
     strict = False
@@ -0,0 +1,73 @@
+import pytest
+
+from dataset_cat.core import tag_dictionary
+from dataset_cat.core.config import config
+from dataset_cat.core.tag_dictionary import BUNDLED_DICTIONARY_PATH, TagDictionary, TagEntry
+from dataset_cat.core.utils import convert_tag_for_source
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    entries = [
+        TagEntry("初音", "hatsune_miku", "character"),
+        TagEntry("初音未来", "hatsune_miku", "character"),
+        TagEntry("双马尾", "twintails", "general"),
+        TagEntry("原神", "genshin_impact", "series"),
+        TagEntry("胡桃", "hu_tao_(genshin_impact)", "character"),
+    ]
+    path = tmp_path / "dict.bin"
+    TagDictionary.compile(entries, path)
+    loaded = TagDictionary(path)
+    yield loaded
+    loaded.close()
+
+
+def test_lookup_and_mapping(dictionary):
+    assert dictionary.lookup("原神") == TagEntry("原神", "genshin_impact", "series")
+    assert dictionary.lookup("原") is None
+    assert dictionary["双马尾"] == "twintails"
+    assert "胡桃" in dictionary
+    assert len(dictionary) == 5
+
+
+def test_longest_match_prefers_longer_terms(dictionary):
+    end, entry = dictionary.longest_match("初音未来和胡桃")
+    assert end == 4
+    assert entry.source == "初音未来"
+    assert dictionary.longest_match("和胡桃") is None
+
+
+def test_segment_and_translate(dictionary):
+    segments = dictionary.segment("初音未来，双马尾 原神")
+    assert [text for text, _ in segments] == ["初音未来", "双马尾", "原神"]
+    assert dictionary.translate("初音未来，双马尾") == ["hatsune_miku", "twintails"]
+    assert dictionary.translate("初音未来和胡桃") is None
+
+
+def test_complete_prefix(dictionary):
+    assert [entry.source for entry in dictionary.complete("初音")] == ["初音", "初音未来"]
+    assert dictionary.complete("不存在") == []
+
+
+def test_bundled_dictionary_loads(tmp_path):
+    bundled = TagDictionary.from_tsv(BUNDLED_DICTIONARY_PATH, cache_dir=tmp_path)
+    assert bundled["初音未来"] == "hatsune_miku"
+    assert bundled.translate("樱花") == ["cherry_blossoms"]
+
+
+def test_convert_tag_for_source_uses_dictionary(dictionary):
+    tags = convert_tag_for_source(["初音未来", "long hair"], "danbooru", dictionary)
+    assert tags == ["hatsune_miku", "long_hair"]
+
+
+def test_convert_tag_for_source_honors_local_dictionary_flag(monkeypatch):
+    monkeypatch.setitem(config._config["translator"], "local_dictionary", False)
+    assert convert_tag_for_source(["初音未来"], "danbooru") == ["初音未来"]
+
+
+def test_convert_tag_for_source_survives_broken_dictionary(monkeypatch):
+    def broken():
+        raise OSError("unreadable")
+
+    monkeypatch.setattr(tag_dictionary, "get_tag_dictionary", broken)
+    assert convert_tag_for_source(["初音未来", "long hair"], "danbooru") == ["初音未来", "long_hair"]
@@ -0,0 +1,47 @@
+import pytest
+
+from dataset_cat.core.tag_index import TagVocabulary, edit_distance
+
+
+@pytest.fixture
+def vocabulary(tmp_path):
+    dump = tmp_path / "tags.csv"
+    dump.write_text(
+        "1girl,0,5000000,\"1girls,sole_female\"\n"
+        "long_hair,0,3500000,\n"
+        "hatsune_miku,4,120000,miku\n"
+        "twintails,0,900000,twin_tails\n"
+        "blue_eyes,0,1500000,\n"
+        "blue_hair,0,700000,\n",
+        encoding="utf-8",
+    )
+    return TagVocabulary.from_csv(dump)
+
+
+def test_edit_distance():
+    assert edit_distance("hatsune_miku", "hatsune_miku", 2) == 0
+    assert edit_distance("hatsnue_miku", "hatsune_miku", 2) == 1  # transposition
+    assert edit_distance("abc", "xyz", 2) == 3
+
+
+def test_complete_orders_by_post_count(vocabulary):
+    assert [s.tag for s in vocabulary.complete("blue")] == ["blue_eyes", "blue_hair"]
+
+
+def test_suggest_corrects_typos_and_aliases(vocabulary):
+    assert vocabulary.suggest("hatsune mku")[0].tag == "hatsune_miku"
+    assert vocabulary.correct("Long Hiar") == "long_hair"
+    assert vocabulary.correct("twin tails") == "twintails"
+    assert vocabulary.correct("qqqqqq") == "qqqqqq"
+
+
+def test_validate_search_tags(vocabulary):
+    results = vocabulary.validate(["1girl", " -long_hair", "rating:safe", "hatsne_miku", ""])
+    assert [r.valid for r in results] == [True, True, True, False]
+    assert results[3].suggestions[0].tag == "hatsune_miku"
+
+
+def test_add_extends_fuzzy_index(vocabulary):
+    vocabulary.suggest("warmup")  # build the delete index
+    vocabulary.add("hakurei_reimu", 80000)
+    assert vocabulary.correct("hakurei_reimo") == "hakurei_reimu"
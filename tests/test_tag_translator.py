@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from dataset_cat.core.cache import TwoLevelCache
+from dataset_cat.core.config import config
+from dataset_cat.core.tag_index import TagVocabulary
+from dataset_cat.tag_translator import TagTranslator
+
+
+def test_memory_lru_eviction():
+    cache = TwoLevelCache(max_memory_items=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a").value == "1"  # "a" becomes most recently used
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a").value == "1"
+    assert cache.get("c").value == "3"
+
+
+def test_entries_expire(monkeypatch):
+    cache = TwoLevelCache(ttl=10, negative_ttl=1)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.set("hit", "value")
+    cache.set("miss", "no match", negative=True)
+    monkeypatch.setattr(time, "time", lambda: now + 5)
+    assert cache.get("hit").value == "value"
+    assert cache.get("miss") is None
+
+
+def test_sqlite_layer_persists(tmp_path):
+    db_path = tmp_path / "cache.sqlite3"
+    cache = TwoLevelCache(db_path=db_path)
+    cache.set("jikan:某地", "Hatsune Miku")
+    cache.set("jikan:未知", "未知 (no match found)", negative=True)
+    cache.close()
+
+    reopened = TwoLevelCache(db_path=db_path)
+    assert reopened.get("jikan:某地").value == "Hatsune Miku"
+    entry = reopened.get("jikan:未知")
+    assert entry.negative
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    calls = []
+
+    async def fake_googletrans(self, description):
+        calls.append(description)
+        return f"translated {description}", True
+
+    async def fake_jikan(self, description):
+        calls.append(description)
+        return f"{description} (no match found)", False
+
+    monkeypatch.setattr(TagTranslator, "_translate_googletrans", fake_googletrans)
+    monkeypatch.setattr(TagTranslator, "_translate_jikan", fake_jikan)
+    instance = TagTranslator(cache=TwoLevelCache())
+    instance.calls = calls
+    return instance
+
+
+def test_translator_uses_cache(translator):
+    assert translator.translate_to_english("某物", "googletrans") == "translated 某物"
+    assert translator.translate_to_english("某物", "googletrans") == "translated 某物"
+    assert translator.calls == ["某物"]
+
+
+def test_translator_caches_negative_results(translator):
+    translator.translate_to_english("某人", "jikan")
+    assert translator.translate_to_english("某人", "jikan") == "某人 (no match found)"
+    assert translator.calls == ["某人"]
+    assert translator.cache.get("jikan:某人").negative
+
+
+def test_translator_does_not_cache_errors(translator, monkeypatch):
+    async def failing(self, description):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(TagTranslator, "_translate_googletrans", failing)
+    assert translator.translate_to_english("某物", "googletrans") == "Error: offline"
+    assert translator.cache.get("googletrans:某物") is None
+
+
+def test_jikan_http_errors_are_not_cached(monkeypatch):
+    def handler(request):
+        if request.url.host == "api.zhconvert.org":
+            return httpx.Response(200, json={"code": 0, "data": {"text": "某人"}})
+        return httpx.Response(429, json={"data": []})
+
+    instance = TagTranslator(cache=TwoLevelCache())
+    instance._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    assert instance.translate_to_english("某人", "jikan").startswith("Error: ")
+    assert instance.cache.get("jikan:某人") is None
+
+
+def test_jikan_requests_are_spaced(monkeypatch):
+    monkeypatch.setitem(config._config["translator"], "jikan_min_interval", 0.05)
+    sent = []
+
+    def handler(request):
+        if request.url.host == "api.jikan.moe":
+            sent.append(time.monotonic())
+            return httpx.Response(200, json={"data": [{"name": request.url.params["q"]}]})
+        return httpx.Response(200, json={"code": 1})
+
+    instance = TagTranslator(cache=TwoLevelCache())
+    instance._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    descriptions = ["某人", "某地", "某物", "某事"]
+    assert instance.translate_many(descriptions, "jikan") == descriptions
+    assert len(sent) == 4
+    assert min(b - a for a, b in zip(sent, sent[1:])) >= 0.04
+
+
+def test_translate_many_dedups_and_uses_cache(translator):
+    translator.translate_to_english("某物", "jikan")
+    translator.calls.clear()
+    results = translator.translate_many(["某物", "某人", "某人", "某物"], "jikan")
+    assert results == [
+        "某物 (no match found)",
+        "某人 (no match found)",
+        "某人 (no match found)",
+        "某物 (no match found)",
+    ]
+    assert translator.calls == ["某人"]
+
+
+def test_translate_many_googletrans_bulk(translator, monkeypatch):
+    batches = []
+
+    async def fake_bulk(self, descriptions):
+        batches.append(list(descriptions))
+        return [(f"bulk {d}", True) for d in descriptions]
+
+    monkeypatch.setattr(TagTranslator, "_translate_googletrans_bulk", fake_bulk)
+    results = translator.translate_many(["某物", "某地", "某物"], "googletrans")
+    assert results == ["bulk 某物", "bulk 某地", "bulk 某物"]
+    assert batches == [["某物", "某地"]]
+
+
+def test_async_translate_from_running_loop(translator):
+    async def main():
+        return await asyncio.gather(
+            translator.translate("某物", "googletrans"),
+            translator.translate_batch(["某地", "某物"], "jikan"),
+        )
+
+    single, batch = asyncio.run(main())
+    assert single == "translated 某物"
+    assert batch == ["某地 (no match found)", "某物 (no match found)"]
+
+
+def test_local_dictionary_answers_offline(translator):
+    assert translator.translate_to_english("初音未来", "googletrans") == "hatsune miku"
+    assert translator.translate_to_english("初音未来 双马尾", "jikan") == "hatsune miku, twintails"
+    assert translator.calls == []
+
+
+def test_format_tag_handles_tag_lists(translator):
+    assert translator.format_tag("hatsune miku, twintails", "Danbooru") == "hatsune_miku,twintails"
+    assert translator.format_tag("Hatsune Miku", "Zerochan") == "Hatsune Miku"
+    # Other sources keep the text as translated, commas and spaces included
+    assert translator.format_tag("Rem, Ram", "Zerochan") == "Rem, Ram"
+
+
+def test_format_tag_only_corrects_on_request(tmp_path):
+    dump = tmp_path / "tags.csv"
+    dump.write_text("hatsune_miku,4,120000,miku\n", encoding="utf-8")
+    instance = TagTranslator(cache=TwoLevelCache(), vocabulary=TagVocabulary.from_csv(dump))
+    assert instance.format_tag("hatsune mikku", "Danbooru") == "hatsune_mikku"
+    assert instance.format_tag("hatsune mikku", "Danbooru", correct=True) == "hatsune_miku"
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import threading
+import urllib.request
+
+import pytest
+
+from dataset_cat.core.cache import TwoLevelCache
+from dataset_cat.tag_translator import TagTranslator
+from dataset_cat.tag_translator_api import TagTranslatorAPI, create_http_server
+
+
+@pytest.fixture
+def api(monkeypatch):
+    calls = []
+
+    async def fake_googletrans(self, description):
+        calls.append(("googletrans", description))
+        await asyncio.sleep(0.05)
+        return "Some Thing", True
+
+    async def fake_jikan(self, description):
+        calls.append(("jikan", description))
+        await asyncio.sleep(0.05)
+        return "Some Character", True
+
+    monkeypatch.setattr(TagTranslator, "_translate_googletrans", fake_googletrans)
+    monkeypatch.setattr(TagTranslator, "_translate_jikan", fake_jikan)
+    instance = TagTranslatorAPI(TagTranslator(cache=TwoLevelCache()))
+    instance.calls = calls
+    return instance
+
+
+def test_translate_tag_fans_out_to_both_backends(api):
+    response = api.translate_tag({"description": "某物", "source_type": "danbooru"})
+    assert response["success"]
+    assert response["zhconvert_jikan"] == "Some Character"
+    assert response["googletrans"] == "Some Thing"
+    assert response["formatted_tags"] == {"zhconvert_jikan": "some_character", "googletrans": "some_thing"}
+
+
+def test_identical_requests_are_coalesced(api):
+    threads = [
+        threading.Thread(target=api.translator.translate_to_english, args=("某物", "googletrans")) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert api.calls == [("googletrans", "某物")]
+
+
+def test_http_endpoint(api):
+    server = create_http_server(port=0, api=api)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/translate"
+        body = json.dumps({"description": "某物", "source_type": "Zerochan"}).encode("utf-8")
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            payload = json.loads(response.read())
+        assert payload["formatted_tags"]["googletrans"] == "Some Thing"
+    finally:
+        server.shutdown()
+        server.server_close()